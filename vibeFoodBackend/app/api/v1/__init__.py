@@ -6,6 +6,7 @@ Vibe-Food backend API router version 1
 from fastapi import APIRouter
 from app.api.v1.endpoints import (
     health,
+    metrics,
     check_in,
     register,
     scan,
@@ -26,3 +27,4 @@ api_router.include_router(transcribe.router, prefix="/transcribe", tags=["mvp"])
 
 # Health check endpoint
 api_router.include_router(health.router, prefix="/healthz", tags=["health"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["health"])
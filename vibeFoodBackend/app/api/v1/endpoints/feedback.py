@@ -85,7 +85,9 @@ def calculate_price_estimate(picked_names: list, recommendations: dict) -> str:
     for rec in rec_list:
         if rec.get("dish_name") in picked_names:
             try:
-                price = float(rec.get("price", "0").replace("$", ""))
+                price = rec.get("price_value")
+                if price is None:
+                    price = float(rec.get("price", "0").replace("$", ""))
                 total_low += price
                 total_high += price + 2  # Add small variance
             except (ValueError, TypeError):
@@ -0,0 +1,93 @@
+"""
+Prometheus metrics endpoint for Vibe-Food API.
+"""
+from typing import List
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.intro_cache import get_intro_cache
+from app.services.ocr_cache import get_ocr_cache
+from app.services.openai_client import circuit_breaker_states, get_hedge_stats
+from app.services.openai_scheduler import get_openai_scheduler
+from app.services.recommendation_cache import get_recommendation_cache
+from app.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN
+from app.utils.metrics import CONTENT_TYPE, REGISTRY, render_samples
+from app.utils.singleflight import single_flight_stats
+
+router = APIRouter()
+
+BREAKER_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def _runtime_metrics() -> List[str]:
+    """Gauges and counters read from the resilience and cache components at scrape time."""
+    lines: List[str] = []
+
+    breakers = circuit_breaker_states()
+    lines += render_samples(
+        "vibefood_openai_circuit_state", "gauge", "Circuit breaker state (0 closed, 1 half-open, 2 open).",
+        (({"operation": op}, BREAKER_STATE_VALUES[s["state"]]) for op, s in breakers.items()),
+    )
+    lines += render_samples(
+        "vibefood_openai_circuit_rejected_total", "counter", "Calls rejected while the breaker was open.",
+        (({"operation": op}, s["rejected"]) for op, s in breakers.items()),
+    )
+
+    hedges = get_hedge_stats().to_dict()
+    lines += render_samples(
+        "vibefood_openai_hedges_total", "counter", "Hedged requests fired and won.",
+        [({"operation": op, "result": result}, counts[result]) for op, counts in hedges.items() for result in ("fired", "won")],
+    )
+
+    scheduler = get_openai_scheduler()
+    if scheduler is not None:
+        stats = scheduler.stats()
+        lines += render_samples(
+            "vibefood_openai_queue_depth", "gauge", "Calls waiting for rate-limit capacity.",
+            (({"operation": op}, depth) for op, depth in stats["queue_depth"].items()),
+        )
+        lines += render_samples(
+            "vibefood_openai_window_requests", "gauge", "Requests in the current 60s rate-limit window.",
+            [({}, stats["window_requests"])],
+        )
+        lines += render_samples(
+            "vibefood_openai_window_tokens", "gauge", "Tokens reserved in the current 60s rate-limit window.",
+            [({}, stats["window_tokens"])],
+        )
+        lines += render_samples(
+            "vibefood_openai_queue_wait_seconds_total", "counter", "Time spent waiting for rate-limit capacity.",
+            (({"operation": op}, w["total_seconds"]) for op, w in stats["wait"].items()),
+        )
+
+    flights = single_flight_stats()
+    lines += render_samples(
+        "vibefood_singleflight_calls_total", "counter", "Calls by single-flight group and outcome.",
+        [({"group": name, "result": result}, counts[result])
+         for name, counts in flights.items() for result in ("calls", "coalesced", "failures")],
+    )
+
+    # Only caches that are already in use: a scrape must not create them (or their SQLite files)
+    caches = [
+        cache
+        for cache in (get_ocr_cache(create=False), get_recommendation_cache(create=False), get_intro_cache(create=False))
+        if cache is not None
+    ]
+    lines += render_samples(
+        "vibefood_cache_requests_total", "counter", "Cache lookups by result.",
+        [({"cache": cache.name, "result": result}, getattr(cache.stats, result))
+         for cache in caches for result in ("memory_hits", "disk_hits", "misses")],
+    )
+    return lines
+
+
+@router.get("", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus scrape endpoint.
+
+    Exposes latency histograms, token, error and cost counters for every
+    upstream OpenAI call plus breaker, scheduler and cache state.
+    """
+    lines = REGISTRY.render() + _runtime_metrics()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=CONTENT_TYPE)
@@ -3,11 +3,13 @@ Recommendation endpoint for Vibe-Food MVP.
 Returns AI-powered dish recommendations based on vibe selection.
 """
 import logging
+from typing import AsyncIterator, Optional, Tuple
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
 from app.models.user_profile import UserProfile
 from app.models.enums import VibeType
 from app.schemas.mvp_recommendation import (
@@ -16,13 +18,94 @@ from app.schemas.mvp_recommendation import (
     MVPRecommendationData,
     DishRecommendation,
 )
-from app.services import llm_service
+from app.services import llm_service, speculative
+from app.utils.sse import SSE_HEADERS, format_sse
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _to_dish(rec: dict) -> DishRecommendation:
+    """Parse one recommendation dict into its schema object."""
+    return DishRecommendation(
+        dish_name=rec.get("dish_name", "Unknown"),
+        reasoning=rec.get("reasoning", ""),
+        story=rec.get("story", ""),
+        warnings=rec.get("warnings"),
+        price=str(rec.get("price", "Ask staff")),
+        emoji=rec.get("emoji"),
+        dish_id=rec.get("dish_id"),
+        price_value=rec.get("price_value"),
+    )
+
+
+def _prepare_request(
+    request: MVPRecommendationRequest, db: Session
+) -> Tuple[Optional[UserProfile], str, Optional[str]]:
+    """
+    Look up the profile, validate the vibe and record it as current.
+
+    Returns (user_profile, vibe, err_msg); err_msg is set when the request
+    cannot be served.
+    """
+    # Verify device is registered
+    user_profile = db.query(UserProfile).filter(
+        UserProfile.device_id == request.device_id
+    ).first()
+
+    if not user_profile:
+        return None, "", "Device not registered. Please register first."
+
+    # Check if menu has been scanned
+    if not user_profile.current_menu:
+        return None, "", "No menu found. Please scan a menu first."
+
+    # Validate vibe selection
+    vibe = request.vibe_selection.lower()
+    voice_prompt = request.voice_prompt
+
+    if vibe == "voice":
+        # Voice input mode — skip enum validation
+        if not voice_prompt or not voice_prompt.strip():
+            return None, vibe, "Voice prompt is empty. Please try again or select a vibe."
+        user_profile.current_vibe = {"vibe": "voice", "voice_prompt": voice_prompt}
+    else:
+        # Standard vibe mode
+        valid_vibes = [v.value for v in VibeType]
+        if vibe not in valid_vibes:
+            return None, vibe, f"Invalid vibe. Must be one of: {', '.join(valid_vibes)}"
+        user_profile.current_vibe = {"vibe": vibe}
+        speculative.record_vibe(request.device_id, vibe)
+
+    return user_profile, vibe, None
+
+
+def _llm_arguments(user_profile: UserProfile, vibe: str, voice_prompt: Optional[str]) -> dict:
+    menu_data = user_profile.current_menu
+    return dict(
+        menu_items=menu_data.get("items", []),
+        vibe=vibe,
+        preference=user_profile.preference or "no_restriction",
+        restaurant_info=menu_data.get("restaurant"),
+        menu_language=menu_data.get("menu_language"),
+        voice_prompt=voice_prompt,
+    )
+
+
+def _store_result(user_profile: UserProfile, result: dict, db: Session) -> MVPRecommendationData:
+    """Parse the generated result and save it on the profile."""
+    recommendation_data = MVPRecommendationData(
+        brief_summary=result.get("brief_summary", "Here are our recommendations for you."),
+        recommendations=[_to_dish(rec) for rec in result.get("recommendations", [])],
+    )
+
+    # Store recommendations in profile
+    user_profile.current_recommendations = recommendation_data.model_dump()
+    db.commit()
+    return recommendation_data
+
+
 @router.post("", response_model=MVPRecommendationResponse)
 async def get_recommendations(
     request: MVPRecommendationRequest,
@@ -41,82 +124,19 @@ async def get_recommendations(
     - **recommendation**: Object with brief_summary and recommendations list
     """
     try:
-        # Verify device is registered
-        user_profile = db.query(UserProfile).filter(
-            UserProfile.device_id == request.device_id
-        ).first()
-
-        if not user_profile:
+        user_profile, vibe, err_msg = _prepare_request(request, db)
+        if err_msg:
             return MVPRecommendationResponse(
                 is_success=False,
-                err_msg="Device not registered. Please register first.",
+                err_msg=err_msg,
                 recommendation=None
             )
 
-        # Check if menu has been scanned
-        if not user_profile.current_menu:
-            return MVPRecommendationResponse(
-                is_success=False,
-                err_msg="No menu found. Please scan a menu first.",
-                recommendation=None
-            )
-
-        # Validate vibe selection
-        vibe = request.vibe_selection.lower()
-        voice_prompt = request.voice_prompt
-
-        if vibe == "voice":
-            # Voice input mode — skip enum validation
-            if not voice_prompt or not voice_prompt.strip():
-                return MVPRecommendationResponse(
-                    is_success=False,
-                    err_msg="Voice prompt is empty. Please try again or select a vibe.",
-                    recommendation=None
-                )
-            user_profile.current_vibe = {"vibe": "voice", "voice_prompt": voice_prompt}
-        else:
-            # Standard vibe mode
-            valid_vibes = [v.value for v in VibeType]
-            if vibe not in valid_vibes:
-                return MVPRecommendationResponse(
-                    is_success=False,
-                    err_msg=f"Invalid vibe. Must be one of: {', '.join(valid_vibes)}",
-                    recommendation=None
-                )
-            user_profile.current_vibe = {"vibe": vibe}
-
         # Get AI-powered recommendations
-        menu_data = user_profile.current_menu
         result = await llm_service.generate_recommendations(
-            menu_items=menu_data.get("items", []),
-            vibe=vibe,
-            preference=user_profile.preference or "no_restriction",
-            restaurant_info=menu_data.get("restaurant"),
-            menu_language=menu_data.get("menu_language"),
-            voice_prompt=voice_prompt,
+            **_llm_arguments(user_profile, vibe, request.voice_prompt)
         )
-
-        # Parse into schema objects
-        recommendations = [
-            DishRecommendation(
-                dish_name=rec.get("dish_name", "Unknown"),
-                reasoning=rec.get("reasoning", ""),
-                story=rec.get("story", ""),
-                warnings=rec.get("warnings"),
-                price=str(rec.get("price", "Ask staff")),
-                emoji=rec.get("emoji"),
-            )
-            for rec in result.get("recommendations", [])
-        ]
-
-        recommendation_data = MVPRecommendationData(
-            brief_summary=result.get("brief_summary", "Here are our recommendations for you."),
-            recommendations=recommendations,
-        )
-
-        # Store recommendations in profile
-        user_profile.current_recommendations = recommendation_data.model_dump()
-        db.commit()
+        recommendation_data = _store_result(user_profile, result, db)
 
         return MVPRecommendationResponse(
             is_success=True,
@@ -132,3 +152,61 @@ async def get_recommendations(
             err_msg=f"Recommendation failed: {str(e)}",
             recommendation=None
         )
+
+
+@router.post("/stream")
+async def stream_recommendations(request: MVPRecommendationRequest):
+    """
+    Streaming variant of /recommendation using Server-Sent Events.
+
+    Emits a `summary` event with the brief_summary and a `dish` event for
+    each recommendation as soon as the model has finished it and it matched
+    a dish on the menu. The last event is `result`, carrying the same fields
+    as the /recommendation response; the stored recommendations are exactly
+    the dishes that were streamed.
+
+    - **device_id**: Unique device identifier
+    - **vibe_selection**: Selected vibe mood
+    """
+    async def events() -> AsyncIterator[str]:
+        # The generator outlives the endpoint call, so it owns its DB session
+        db = SessionLocal()
+        try:
+            user_profile, vibe, err_msg = _prepare_request(request, db)
+            if err_msg:
+                yield format_sse("result", MVPRecommendationResponse(
+                    is_success=False,
+                    err_msg=err_msg,
+                    recommendation=None
+                ))
+                return
+
+            result = None
+            async for kind, payload in llm_service.stream_recommendations(
+                **_llm_arguments(user_profile, vibe, request.voice_prompt)
+            ):
+                if kind == "summary":
+                    yield format_sse("summary", {"brief_summary": payload})
+                elif kind == "dish":
+                    yield format_sse("dish", _to_dish(payload))
+                else:
+                    result = payload
+
+            yield format_sse("result", MVPRecommendationResponse(
+                is_success=True,
+                err_msg=None,
+                recommendation=_store_result(user_profile, result, db)
+            ))
+
+        except Exception as e:
+            db.rollback()
+            logger.error("Recommendation stream error: %s", e)
+            yield format_sse("result", MVPRecommendationResponse(
+                is_success=False,
+                err_msg=f"Recommendation failed: {str(e)}",
+                recommendation=None
+            ))
+        finally:
+            db.close()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
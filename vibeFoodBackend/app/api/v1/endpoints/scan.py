@@ -2,17 +2,255 @@
 Scan endpoint for Vibe-Food MVP.
 Handles menu photo upload and OCR processing.
 """
+import asyncio
 import base64
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+from typing import AsyncIterator, Optional, Set
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.datastructures import FormData
+from starlette.formparsers import MultiPartParser
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
 from app.models.user_profile import UserProfile
-from app.schemas.scan import ScanRequest, ScanResponse
-from app.services import ocr_service, llm_service
+from app.schemas.scan import (
+    ScanRequest,
+    MultiScanRequest,
+    ScanResponse,
+    ScanIntroRequest,
+    ScanIntroResponse,
+    ScanJobResponse,
+    ScanJobStatusResponse,
+)
+from app.services import ocr_service, llm_service, speculative
+from app.services.dietary_conflicts import get_conflict_table
+from app.services.name_index import get_name_index
+from app.services.ocr_service import MenuData, MenuItem
+from app.services.scan_jobs import ScanJob, get_scan_job_queue
+from app.utils.errors import ScanQueueFullError
+from app.utils.metrics import REGISTRY
+from app.utils.sse import SSE_HEADERS, format_sse
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Denominator for OpenAI cost per scan
+MENU_SCANS = REGISTRY.counter("vibefood_menu_scans_total", "Menus scanned successfully.")
+
+
+def _item_to_json(item: MenuItem) -> dict:
+    """Convert a MenuItem to its stored/streamed JSON shape."""
+    return {
+        "id": item.id,
+        "name": item.name,
+        "description": item.description,
+        "price": item.price,
+        "currency": item.currency,
+        "category": item.category,
+        "tags": item.tags,
+        "allergens": item.allergens,
+        "spice_level": item.spice_level,
+        "is_vegetarian": item.is_vegetarian,
+        "is_vegan": item.is_vegan,
+    }
+
+
+def _menu_to_json(menu_data: MenuData) -> dict:
+    """Convert menu_data to the JSON-serializable dict stored on the profile."""
+    return {
+        "id": menu_data.id,
+        "items": menu_data.table.to_json(),
+        "restaurant": {
+            "name": menu_data.restaurant.name if menu_data.restaurant else None,
+            "cuisine_type": menu_data.restaurant.cuisine_type if menu_data.restaurant else None,
+        } if menu_data.restaurant else None,
+        "extraction_method": menu_data.extraction_method.value,
+        "confidence": menu_data.confidence,
+        "menu_language": menu_data.menu_language,
+    }
+
+
+def _intro_arguments(menu_json: dict) -> dict:
+    """Inputs of the restaurant intro, derived the same way for every request."""
+    restaurant_info = menu_json.get("restaurant") or {}
+    items = menu_json.get("items", [])
+    return {
+        "restaurant_name": restaurant_info.get("name"),
+        "cuisine_type": restaurant_info.get("cuisine_type"),
+        # Menu order, so the intro's single-flight key is stable
+        "categories": list(dict.fromkeys(item.get("category") for item in items if item.get("category"))),
+        "sample_items": [item.get("name", "") for item in items[:6]],
+        "menu_language": menu_json.get("menu_language"),
+    }
+
+
+# Deferred intro saves, referenced until they finish
+_intro_saves: Set["asyncio.Task"] = set()
+
+
+def _intro_fields(intro: Optional[str]) -> dict:
+    """Menu fields recording an intro, or that none could be generated (so polls stop retrying)."""
+    return {"restaurant_intro": intro} if intro else {"intro_unavailable": True}
+
+
+def _store_intro(device_id: str, menu_id: Optional[str], intro: Optional[str]) -> None:
+    """Store a deferred intro on the profile if that menu is still current (runs in a worker thread)."""
+    db = SessionLocal()
+    try:
+        user_profile = db.query(UserProfile).filter(UserProfile.device_id == device_id).first()
+        menu = user_profile.current_menu if user_profile else None
+        if menu and menu.get("id") == menu_id and not menu.get("restaurant_intro"):
+            user_profile.current_menu = dict(menu, **_intro_fields(intro))
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("Could not store restaurant intro for %s: %s", device_id, e)
+    finally:
+        db.close()
+
+
+async def _save_intro(task: "asyncio.Task", device_id: str, menu_id: Optional[str]) -> None:
+    """Wait for a deferred intro, then store it without blocking the event loop."""
+    try:
+        intro = await task
+    except Exception:
+        intro = None
+    await run_in_threadpool(_store_intro, device_id, menu_id, intro)
+
+
+async def _resolve_intro(user_profile: UserProfile, db: Session, budget_seconds: float):
+    """
+    The current menu's intro and whether it is still pending. Waits up to
+    budget_seconds for generation (started or joined here); an intro that
+    finishes later is stored by _save_intro, so each menu gets one. A menu
+    whose intro could not be generated is not retried.
+    """
+    menu = user_profile.current_menu or {}
+    if menu.get("restaurant_intro"):
+        return menu["restaurant_intro"], False
+    if menu.get("intro_unavailable"):
+        return None, False
+    try:
+        task = llm_service.start_restaurant_intro(**_intro_arguments(menu))
+        intro = await asyncio.wait_for(asyncio.shield(task), budget_seconds)
+    except asyncio.TimeoutError:
+        save = asyncio.get_running_loop().create_task(_save_intro(task, user_profile.device_id, menu.get("id")))
+        _intro_saves.add(save)
+        save.add_done_callback(_intro_saves.discard)
+        return None, True
+    except Exception:
+        intro = None  # Frontend handles None gracefully
+    user_profile.current_menu = dict(menu, **_intro_fields(intro))
+    db.commit()
+    return intro, False
+
+
+async def _store_menu_and_respond(
+    user_profile: UserProfile,
+    menu_data: MenuData,
+    db: Session,
+    page_count: Optional[int] = None,
+) -> ScanResponse:
+    """Save the scanned menu on the profile and build the intro response."""
+    menu_json = _menu_to_json(menu_data)
+
+    # Update user profile with current menu
+    user_profile.current_menu = menu_json
+    db.commit()
+    MENU_SCANS.inc()
+    # Built once here, reused by every recommendation for this menu
+    get_name_index(menu_json["items"])
+    get_conflict_table(menu_json["items"])
+
+    # Warm up likely vibes while the user reads the intro (opt-in)
+    speculative.schedule_recommendations(user_profile.device_id, menu_json, user_profile.preference)
+
+    # Warm restaurant intro: included if ready within a short budget,
+    # otherwise delivered by /scan/intro once the background generation ends
+    intro_arguments = _intro_arguments(menu_json)
+    restaurant_intro, intro_pending = await _resolve_intro(user_profile, db, settings.SCAN_INTRO_BUDGET_SECONDS)
+
+    categories = intro_arguments["categories"]
+    return ScanResponse(
+        is_success=True,
+        err_msg=None,
+        restaurant_name=intro_arguments["restaurant_name"],
+        cuisine_type=intro_arguments["cuisine_type"],
+        menu_item_count=len(menu_json.get("items", [])),
+        menu_categories=categories if categories else None,
+        restaurant_intro=restaurant_intro,
+        intro_pending=intro_pending,
+        menu_language=intro_arguments["menu_language"],
+        page_count=page_count,
+    )
+
+
+def _too_large_response() -> ScanResponse:
+    limit_mb = settings.SCAN_MAX_IMAGE_BYTES / (1024 * 1024)
+    return ScanResponse(
+        is_success=False,
+        err_msg=f"Image too large: maximum size is {limit_mb:g} MB"
+    )
+
+
+def _base64_too_large(image_base64: str) -> bool:
+    """Check the size limit before decoding (base64 is 4/3 of the raw size)."""
+    return len(image_base64) * 3 // 4 > settings.SCAN_MAX_IMAGE_BYTES
+
+
+# Room for the multipart boundaries and form fields around the image
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class _UploadTooLarge(Exception):
+    pass
+
+
+async def _limited_stream(request: Request, limit: int) -> AsyncIterator[bytes]:
+    """Request body chunks; raises _UploadTooLarge as soon as more than limit bytes arrived."""
+    total = 0
+    async for chunk in request.stream():
+        total += len(chunk)
+        if total > limit:
+            raise _UploadTooLarge()
+        yield chunk
+
+
+async def _read_raw_body(request: Request) -> Optional[bytes]:
+    """Read a raw image body, or None once it exceeds SCAN_MAX_IMAGE_BYTES."""
+    body = bytearray()
+    try:
+        async for chunk in _limited_stream(request, settings.SCAN_MAX_IMAGE_BYTES):
+            body += chunk
+    except _UploadTooLarge:
+        return None
+    return bytes(body)
+
+
+async def _read_multipart_form(request: Request) -> Optional[FormData]:
+    """
+    Parse a multipart upload, or None once the body exceeds the size limit.
+
+    request.form() only caps non-file parts, so the body is counted while the
+    parser consumes it. The image part spills to a temp file past
+    SCAN_UPLOAD_SPOOL_BYTES.
+    """
+    parser = MultiPartParser(
+        request.headers,
+        _limited_stream(request, settings.SCAN_MAX_IMAGE_BYTES + MULTIPART_OVERHEAD_BYTES),
+        max_files=1,
+    )
+    parser.spool_max_size = settings.SCAN_UPLOAD_SPOOL_BYTES
+    try:
+        return await parser.parse()
+    except _UploadTooLarge:
+        return None
+
 
 @router.post("", response_model=ScanResponse)
 async def scan_menu(request: ScanRequest, db: Session = Depends(get_db)):
@@ -24,6 +262,7 @@ async def scan_menu(request: ScanRequest, db: Session = Depends(get_db)):
 
     - **device_id**: Unique device identifier
     - **image_base64**: Base64 encoded menu image
+    - **tiled**: Opt-in tiled extraction for very large/dense menus
 
     Returns:
     - **is_success**: True if both upload and OCR succeeded
@@ -41,9 +280,13 @@ async def scan_menu(request: ScanRequest, db: Session = Depends(get_db)):
                 err_msg="Device not registered. Please register first."
             )
 
+        # Reject oversized images before decoding
+        if _base64_too_large(request.image_base64):
+            return _too_large_response()
+
         # Validate base64 image data
         try:
-            base64.b64decode(request.image_base64)
+            image_bytes = base64.b64decode(request.image_base64)
         except Exception:
             return ScanResponse(
                 is_success=False,
@@ -55,81 +298,388 @@ async def scan_menu(request: ScanRequest, db: Session = Depends(get_db)):
         menu_data = await ocr_service.process_menu_image(
             session_id=request.device_id,
             image_base64=request.image_base64,
+            image_bytes=image_bytes,
+            tiled=request.tiled,
         )
 
-        # Convert menu_data to JSON-serializable dict
-        menu_json = {
-            "id": menu_data.id,
-            "items": [
-                {
-                    "id": item.id,
-                    "name": item.name,
-                    "description": item.description,
-                    "price": item.price,
-                    "currency": item.currency,
-                    "category": item.category,
-                    "tags": item.tags,
-                    "allergens": item.allergens,
-                    "spice_level": item.spice_level,
-                    "is_vegetarian": item.is_vegetarian,
-                    "is_vegan": item.is_vegan,
-                }
-                for item in menu_data.items
-            ],
-            "restaurant": {
-                "name": menu_data.restaurant.name if menu_data.restaurant else None,
-                "cuisine_type": menu_data.restaurant.cuisine_type if menu_data.restaurant else None,
-            } if menu_data.restaurant else None,
-            "extraction_method": menu_data.extraction_method.value,
-            "confidence": menu_data.confidence,
-            "menu_language": menu_data.menu_language,
-        }
-
-        # Update user profile with current menu
-        user_profile.current_menu = menu_json
-        db.commit()
-
-        # Extract restaurant summary for frontend intro page
-        restaurant_info = menu_json.get("restaurant") or {}
-        restaurant_name = restaurant_info.get("name")
-        cuisine_type = restaurant_info.get("cuisine_type")
-        items = menu_json.get("items", [])
-        menu_item_count = len(items)
-        categories = list({
-            item.get("category")
-            for item in items
-            if item.get("category")
-        })
-        sample_items = [item.get("name", "") for item in items[:6]]
-        menu_language = menu_json.get("menu_language")
-
-        # Generate warm restaurant intro (non-blocking — fallback to None)
-        restaurant_intro = None
-        try:
-            restaurant_intro = await llm_service.generate_restaurant_intro(
-                restaurant_name=restaurant_name,
-                cuisine_type=cuisine_type,
-                categories=categories,
-                sample_items=sample_items,
-                menu_language=menu_language,
+        return await _store_menu_and_respond(user_profile, menu_data, db)
+
+    except Exception as e:
+        db.rollback()
+        return ScanResponse(
+            is_success=False,
+            err_msg=f"OCR processing failed: {str(e)}"
+        )
+
+
+@router.post("/upload", response_model=ScanResponse)
+async def scan_menu_upload(request: Request, db: Session = Depends(get_db)):
+    """
+    Upload a menu photo as binary instead of base64-in-JSON.
+
+    Accepts either multipart/form-data (fields: device_id, image, optional
+    tiled) or a raw image body (Content-Type image/* or
+    application/octet-stream) with device_id as a query parameter. The size
+    limit is enforced while the body arrives, and the image is
+    base64-encoded only once, for the Vision call.
+
+    Returns the same response as /scan.
+    """
+    try:
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > settings.SCAN_MAX_IMAGE_BYTES + MULTIPART_OVERHEAD_BYTES:
+            return _too_large_response()
+
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("multipart/form-data"):
+            form = await _read_multipart_form(request)
+            if form is None:
+                return _too_large_response()
+            try:
+                device_id = form.get("device_id")
+                tiled = str(form.get("tiled", "")).lower() in ("1", "true", "yes")
+                upload = form.get("image")
+                if not isinstance(device_id, str) or upload is None or isinstance(upload, str):
+                    return ScanResponse(
+                        is_success=False,
+                        err_msg="Multipart upload requires 'device_id' and an 'image' file"
+                    )
+                if upload.size is not None and upload.size > settings.SCAN_MAX_IMAGE_BYTES:
+                    return _too_large_response()
+                image_bytes = await upload.read()
+            finally:
+                await form.close()
+        else:
+            device_id = request.query_params.get("device_id")
+            tiled = request.query_params.get("tiled", "").lower() in ("1", "true", "yes")
+            if not device_id:
+                return ScanResponse(
+                    is_success=False,
+                    err_msg="Raw image upload requires a 'device_id' query parameter"
+                )
+            image_bytes = await _read_raw_body(request)
+            if image_bytes is None:
+                return _too_large_response()
+
+        if not image_bytes:
+            return ScanResponse(
+                is_success=False,
+                err_msg="Invalid image data: empty upload"
             )
-        except Exception:
-            pass  # Frontend handles None gracefully
 
+        user_profile = db.query(UserProfile).filter(
+            UserProfile.device_id == device_id
+        ).first()
+
+        if not user_profile:
+            return ScanResponse(
+                is_success=False,
+                err_msg="Device not registered. Please register first."
+            )
+
+        menu_data = await ocr_service.process_menu_image(
+            session_id=device_id,
+            image_bytes=image_bytes,
+            tiled=tiled,
+        )
+
+        return await _store_menu_and_respond(user_profile, menu_data, db)
+
+    except Exception as e:
+        db.rollback()
         return ScanResponse(
-            is_success=True,
-            err_msg=None,
-            restaurant_name=restaurant_name,
-            cuisine_type=cuisine_type,
-            menu_item_count=menu_item_count,
-            menu_categories=categories if categories else None,
-            restaurant_intro=restaurant_intro,
-            menu_language=menu_language,
+            is_success=False,
+            err_msg=f"OCR processing failed: {str(e)}"
         )
 
+
+@router.post("/multi", response_model=ScanResponse)
+async def scan_menu_pages(request: MultiScanRequest, db: Session = Depends(get_db)):
+    """
+    Upload several photos of one menu and merge them into a single menu.
+
+    Pages are extracted concurrently, so latency is close to the slowest page.
+    Dishes appearing on more than one page are deduplicated by name.
+
+    - **device_id**: Unique device identifier
+    - **images_base64**: Base64 encoded menu images, one per page
+
+    Returns:
+    - **is_success**: True if at least one page was read
+    - **page_count**: Number of pages submitted
+    """
+    try:
+        user_profile = db.query(UserProfile).filter(
+            UserProfile.device_id == request.device_id
+        ).first()
+
+        if not user_profile:
+            return ScanResponse(
+                is_success=False,
+                err_msg="Device not registered. Please register first."
+            )
+
+        if len(request.images_base64) > settings.SCAN_MAX_PAGES:
+            return ScanResponse(
+                is_success=False,
+                err_msg=f"Too many pages: at most {settings.SCAN_MAX_PAGES} images per scan"
+            )
+
+        if any(_base64_too_large(image_base64) for image_base64 in request.images_base64):
+            return _too_large_response()
+
+        pages = []
+        for page_number, image_base64 in enumerate(request.images_base64, start=1):
+            try:
+                pages.append((image_base64, base64.b64decode(image_base64)))
+            except Exception:
+                return ScanResponse(
+                    is_success=False,
+                    err_msg=f"Invalid image data on page {page_number}: Base64 decoding failed"
+                )
+
+        menu_data = await ocr_service.process_menu_images(
+            session_id=request.device_id,
+            pages=pages,
+        )
+
+        return await _store_menu_and_respond(user_profile, menu_data, db, page_count=len(pages))
+
     except Exception as e:
         db.rollback()
         return ScanResponse(
             is_success=False,
             err_msg=f"OCR processing failed: {str(e)}"
         )
+
+
+@router.post("/stream")
+async def scan_menu_stream(request: ScanRequest):
+    """
+    Streaming variant of /scan using Server-Sent Events.
+
+    Emits an `item` event for each menu item as soon as OCR has read it, so
+    the first dishes appear long before extraction finishes, then `result`,
+    carrying the same fields as the /scan response. If the intro was not
+    ready in time, a final `intro` event delivers it when it is.
+
+    - **device_id**: Unique device identifier
+    - **image_base64**: Base64 encoded menu image
+    - **tiled**: Tiled extraction; items are then sent together once all tiles are read
+    """
+    async def events() -> AsyncIterator[str]:
+        # The generator outlives the endpoint call, so it owns its DB session
+        db = SessionLocal()
+        try:
+            user_profile = db.query(UserProfile).filter(
+                UserProfile.device_id == request.device_id
+            ).first()
+
+            if not user_profile:
+                yield format_sse("result", ScanResponse(
+                    is_success=False,
+                    err_msg="Device not registered. Please register first."
+                ))
+                return
+
+            if _base64_too_large(request.image_base64):
+                yield format_sse("result", _too_large_response())
+                return
+
+            try:
+                image_bytes = base64.b64decode(request.image_base64)
+            except Exception:
+                yield format_sse("result", ScanResponse(
+                    is_success=False,
+                    err_msg="Invalid image data: Base64 decoding failed"
+                ))
+                return
+
+            menu_data = None
+            if request.tiled:
+                # Tiles are merged before items are final, so there is nothing to stream early
+                menu_data = await ocr_service.process_menu_image(
+                    session_id=request.device_id,
+                    image_base64=request.image_base64,
+                    image_bytes=image_bytes,
+                    tiled=True,
+                )
+                for item in menu_data.table:
+                    yield format_sse("item", _item_to_json(item))
+            else:
+                async for update in ocr_service.stream_menu_image(
+                    session_id=request.device_id,
+                    image_base64=request.image_base64,
+                    image_bytes=image_bytes,
+                ):
+                    if isinstance(update, MenuItem):
+                        yield format_sse("item", _item_to_json(update))
+                    else:
+                        menu_data = update
+
+            result = await _store_menu_and_respond(user_profile, menu_data, db)
+            yield format_sse("result", result)
+            if result.intro_pending:
+                intro, _ = await _resolve_intro(user_profile, db, settings.INTRO_FETCH_WAIT_SECONDS)
+                if intro:
+                    yield format_sse("intro", {"restaurant_intro": intro})
+
+        except Exception as e:
+            db.rollback()
+            yield format_sse("result", ScanResponse(
+                is_success=False,
+                err_msg=f"OCR processing failed: {str(e)}"
+            ))
+        finally:
+            db.close()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/intro", response_model=ScanIntroResponse)
+async def get_scan_intro(request: ScanIntroRequest, db: Session = Depends(get_db)):
+    """
+    Restaurant intro for the device's current menu.
+
+    Returns the stored intro at once; while it is still being generated,
+    waits up to INTRO_FETCH_WAIT_SECONDS and reports intro_pending if it
+    is still not done.
+
+    - **device_id**: Unique device identifier
+    """
+    user_profile = db.query(UserProfile).filter(
+        UserProfile.device_id == request.device_id
+    ).first()
+    if not user_profile:
+        return ScanIntroResponse(
+            is_success=False,
+            err_msg="Device not registered. Please register first."
+        )
+    if not user_profile.current_menu:
+        return ScanIntroResponse(
+            is_success=False,
+            err_msg="No menu found. Please scan a menu first."
+        )
+
+    intro, pending = await _resolve_intro(user_profile, db, settings.INTRO_FETCH_WAIT_SECONDS)
+    return ScanIntroResponse(is_success=True, restaurant_intro=intro, intro_pending=pending)
+
+
+# --- Asynchronous scan jobs ---
+
+async def _run_scan_job(device_id: str, image_bytes: bytes, tiled: bool) -> ScanResponse:
+    """Worker-side scan: opens its own DB session for the commit at the end."""
+    menu_data = await ocr_service.process_menu_image(
+        session_id=device_id,
+        image_bytes=image_bytes,
+        tiled=tiled,
+    )
+    db = SessionLocal()
+    try:
+        user_profile = db.query(UserProfile).filter(
+            UserProfile.device_id == device_id
+        ).first()
+        if not user_profile:
+            return ScanResponse(
+                is_success=False,
+                err_msg="Device not registered. Please register first."
+            )
+        return await _store_menu_and_respond(user_profile, menu_data, db)
+    except Exception as e:
+        db.rollback()
+        return ScanResponse(
+            is_success=False,
+            err_msg=f"OCR processing failed: {str(e)}"
+        )
+    finally:
+        db.close()
+
+
+def _job_status(job: ScanJob) -> ScanJobStatusResponse:
+    return ScanJobStatusResponse(
+        job_id=job.id,
+        status=job.status.value,
+        queue_position=get_scan_job_queue().position(job),
+        result=job.result,
+        err_msg=job.error,
+    )
+
+
+@router.post("/jobs", response_model=ScanJobResponse, status_code=202)
+async def submit_scan_job(request: ScanRequest, response: Response, db: Session = Depends(get_db)):
+    """
+    Queue a menu scan and return immediately with a job id (202 Accepted).
+
+    The scan runs on an in-process worker pool; when it finishes the menu is
+    written to the profile exactly as /scan would. Poll
+    `/scan/jobs/{job_id}` or subscribe to `/scan/jobs/{job_id}/events`.
+
+    - **device_id**: Unique device identifier
+    - **image_base64**: Base64 encoded menu image
+    - **tiled**: Opt-in tiled extraction for very large/dense menus
+    """
+    user_profile = db.query(UserProfile).filter(
+        UserProfile.device_id == request.device_id
+    ).first()
+
+    if not user_profile:
+        response.status_code = 200
+        return ScanJobResponse(
+            is_success=False,
+            err_msg="Device not registered. Please register first."
+        )
+
+    if _base64_too_large(request.image_base64):
+        response.status_code = 200
+        return ScanJobResponse(is_success=False, err_msg=_too_large_response().err_msg)
+
+    try:
+        image_bytes = base64.b64decode(request.image_base64)
+    except Exception:
+        response.status_code = 200
+        return ScanJobResponse(
+            is_success=False,
+            err_msg="Invalid image data: Base64 decoding failed"
+        )
+
+    device_id, tiled = request.device_id, request.tiled
+    try:
+        job = get_scan_job_queue().submit(
+            device_id,
+            lambda: _run_scan_job(device_id, image_bytes, tiled),
+        )
+    except ScanQueueFullError as e:
+        response.status_code = e.status_code
+        return ScanJobResponse(is_success=False, err_msg=e.message)
+
+    return ScanJobResponse(is_success=True, job_id=job.id, status=job.status.value)
+
+
+@router.get("/jobs/{job_id}", response_model=ScanJobStatusResponse)
+async def get_scan_job(job_id: str):
+    """Poll the status of a scan job; `result` is set once it has finished."""
+    job = get_scan_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scan job not found")
+    return _job_status(job)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_scan_job(job_id: str):
+    """
+    Server-Sent Events for a scan job.
+
+    Sends a `status` event whenever the job changes state and ends with a
+    `result` event carrying the final job status and scan result.
+    """
+    job = get_scan_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scan job not found")
+
+    async def events() -> AsyncIterator[str]:
+        while not job.is_finished:
+            yield format_sse("status", _job_status(job))
+            await job.wait_for_change(timeout=15.0)
+        yield format_sse("result", _job_status(job))
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
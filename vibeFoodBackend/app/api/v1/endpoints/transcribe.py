@@ -29,7 +29,8 @@ async def transcribe_audio(audio: UploadFile = File(...)):
         )
 
     try:
-        from app.services.openai_client import get_openai_client
+        from app.services.openai_client import get_openai_client, upstream_call
+        from app.services.openai_metrics import observe_call
         client = get_openai_client()
 
         # Read audio data
@@ -73,10 +74,15 @@ async def transcribe_audio(audio: UploadFile = File(...)):
         )
 
         # Use tuple format for reliable file upload to OpenAI
-        response = await client.audio.transcriptions.create(
-            model="whisper-1",
-            file=(filename, audio_data, mime),
-        )
+        async with upstream_call("transcription"):
+            with observe_call("transcription", "whisper-1") as call:
+                # verbose_json also reports the audio duration, which Whisper is billed by
+                response = await client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=(filename, audio_data, mime),
+                    response_format="verbose_json",
+                )
+                call.record_audio(getattr(response, "duration", None))
 
         transcript = response.text.strip()
         if not transcript:
@@ -34,6 +34,121 @@ class Settings(BaseSettings):
     # OpenAI配置
     OPENAI_API_KEY: Optional[str] = None
 
+    # OpenAI调用截止时间 (seconds; the whole call, including a hedged retry)
+    OCR_DEADLINE_SECONDS: float = 60.0
+    RECOMMENDATION_DEADLINE_SECONDS: float = 20.0
+    INTRO_DEADLINE_SECONDS: float = 10.0
+
+    # 餐厅介绍配置 (generated in the background; /scan only includes it if ready in time)
+    SCAN_INTRO_BUDGET_SECONDS: float = 1.0
+    # How long /scan/intro waits for a generation that is still running
+    INTRO_FETCH_WAIT_SECONDS: float = 10.0
+
+    # 对冲请求配置 (a second request races a slow first one after the pN latency)
+    OPENAI_HEDGE_ENABLED: bool = False
+    OPENAI_HEDGE_OPERATIONS: str = "recommendation,intro"
+    OPENAI_HEDGE_PERCENTILE: float = 0.9
+    OPENAI_HEDGE_MIN_SAMPLES: int = 20
+    OPENAI_HEDGE_DEFAULT_DELAY_SECONDS: float = 6.0
+    OPENAI_HEDGE_MIN_DELAY_SECONDS: float = 1.0
+    # Model for the hedged request (e.g. "gpt-4o-mini"); None = same model
+    OPENAI_HEDGE_MODEL: Optional[str] = None
+    OPENAI_LATENCY_WINDOW_SIZE: int = 200
+
+    # 熔断配置 (per OpenAI operation: open after failure_ratio of the last window_size calls failed)
+    OPENAI_CIRCUIT_ENABLED: bool = True
+    OPENAI_CIRCUIT_WINDOW_SIZE: int = 20
+    OPENAI_CIRCUIT_FAILURE_RATIO: float = 0.5
+    OPENAI_CIRCUIT_MIN_CALLS: int = 5
+    OPENAI_CIRCUIT_OPEN_SECONDS: float = 30.0
+    # Adaptive timeouts: pN latency x multiplier, bounded by [min, operation deadline]
+    OPENAI_ADAPTIVE_TIMEOUT_ENABLED: bool = True
+    # OCR is left out: dense menus legitimately take far longer than the typical scan
+    OPENAI_ADAPTIVE_TIMEOUT_OPERATIONS: str = "recommendation,intro"
+    OPENAI_ADAPTIVE_TIMEOUT_PERCENTILE: float = 0.99
+    OPENAI_ADAPTIVE_TIMEOUT_MULTIPLIER: float = 2.0
+    OPENAI_ADAPTIVE_TIMEOUT_MIN_SECONDS: float = 5.0
+    OPENAI_ADAPTIVE_TIMEOUT_MIN_SAMPLES: int = 20
+
+    # 速率调度配置 (match the account's rate limits; 0 = no limit)
+    OPENAI_SCHEDULER_ENABLED: bool = True
+    OPENAI_RPM_LIMIT: int = 500
+    OPENAI_TPM_LIMIT: int = 200000
+    # Share of both budgets that only recommendations may use
+    OPENAI_RECOMMENDATION_RESERVED_SHARE: float = 0.2
+
+    # OCR缓存配置 (keyed by SHA-256 of the decoded image bytes)
+    OCR_CACHE_ENABLED: bool = True
+    OCR_CACHE_MEMORY_SIZE: int = 256
+    OCR_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    OCR_CACHE_DB_PATH: Optional[str] = None
+    OCR_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Near-duplicate photos (perceptual hash within N differing bits of 64,
+    # and width/height ratio within the given relative difference)
+    OCR_NEAR_DUPLICATE_ENABLED: bool = True
+    OCR_NEAR_DUPLICATE_MAX_DISTANCE: int = 3
+    OCR_NEAR_DUPLICATE_MAX_ASPECT_DIFFERENCE: float = 0.02
+    OCR_NEAR_DUPLICATE_INDEX_SIZE: int = 1024
+
+    # 餐厅介绍缓存配置 (keyed by normalized restaurant name + cuisine + language)
+    INTRO_CACHE_ENABLED: bool = True
+    INTRO_CACHE_MEMORY_SIZE: int = 1024
+    INTRO_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    INTRO_CACHE_DB_PATH: Optional[str] = None
+    INTRO_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    # Distinct intros kept per restaurant and served in rotation
+    INTRO_CACHE_VARIANTS: int = 1
+
+    # 推荐缓存配置 (keyed by menu fingerprint + vibe + preferences + language)
+    RECOMMENDATION_CACHE_ENABLED: bool = True
+    RECOMMENDATION_CACHE_MEMORY_SIZE: int = 512
+    RECOMMENDATION_CACHE_TTL_SECONDS: int = 6 * 3600
+    RECOMMENDATION_CACHE_DB_PATH: Optional[str] = None
+    RECOMMENDATION_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # "llm" (GPT-4o) or "local" (deterministic engine, no API cost)
+    RECOMMENDATION_MODE: str = "llm"
+    # Answer from the local engine when the LLM call fails
+    RECOMMENDATION_LOCAL_FALLBACK: bool = True
+    # Menu encoding in the recommendation prompt: "table" (compact) or "json" (original)
+    RECOMMENDATION_PROMPT_FORMAT: str = "table"
+    # Local pre-ranking: only the top-K candidates of large menus go into the prompt
+    RECOMMENDATION_PRERANK_ENABLED: bool = True
+    RECOMMENDATION_PRERANK_MIN_ITEMS: int = 40
+    RECOMMENDATION_PRERANK_TOP_K: int = 25
+    # Speculatively generate likely vibes right after a scan (opt-in)
+    SPECULATIVE_RECOMMENDATIONS_ENABLED: bool = False
+    SPECULATIVE_VIBES_PER_SCAN: int = 2
+    SPECULATIVE_MAX_CONCURRENT: int = 4
+    SPECULATIVE_HISTORY_DEVICES: int = 10000
+    # Speculative generations allowed per device within the budget window
+    SPECULATIVE_DEVICE_BUDGET: int = 6
+    SPECULATIVE_BUDGET_WINDOW_SECONDS: int = 3600
+
+    # 上传配置
+    SCAN_MAX_IMAGE_BYTES: int = 10 * 1024 * 1024
+    SCAN_UPLOAD_SPOOL_BYTES: int = 1024 * 1024
+
+    # 异步扫描任务配置
+    SCAN_JOB_WORKERS: int = 2
+    SCAN_JOB_QUEUE_SIZE: int = 32
+    SCAN_JOB_RESULT_TTL_SECONDS: int = 600
+
+    # 多页扫描配置
+    SCAN_MAX_PAGES: int = 8
+    OCR_MAX_CONCURRENT_PAGES: int = 4
+    # Tiled extraction for dense menus (opt-in per request)
+    OCR_TILE_ROWS: int = 2
+    OCR_TILE_COLS: int = 2
+    OCR_TILE_OVERLAP: float = 0.15
+
+    # 图像处理配置
+    IMAGE_PROCESS_WORKERS: int = 2
+    # Downscale/recompress before the Vision call
+    IMAGE_PREPROCESS_ENABLED: bool = True
+    IMAGE_PREPROCESS_MAX_EDGE: int = 2048
+    IMAGE_PREPROCESS_JPEG_QUALITY: int = 85
+    IMAGE_PREPROCESS_GRAYSCALE: bool = False
+
     # Redis配置
     REDIS_URL: Optional[str] = None
 
@@ -10,14 +10,20 @@ from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
 from app.core.database import init_db
 from app.api.v1 import api_router
+from app.services.image_service import shutdown_image_pool, warm_image_pool
+from app.services.scan_jobs import get_scan_job_queue
 from app.utils.errors import AppError
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database tables on startup."""
+    """Initialize database tables, image workers and scan workers on startup."""
     init_db()
+    await warm_image_pool()
+    await get_scan_job_queue().start()
     yield
+    await get_scan_job_queue().stop()
+    shutdown_image_pool()
 
 
 app = FastAPI(
@@ -5,6 +5,7 @@ from app.models.enums import (
     VibeType,
     ExtractionMethod,
     PreferenceType,
+    ScanJobStatus,
 )
 from app.models.user_profile import UserProfile
 
@@ -13,6 +14,7 @@ __all__ = [
     "VibeType",
     "ExtractionMethod",
     "PreferenceType",
+    "ScanJobStatus",
     # SQLAlchemy models
     "UserProfile",
 ]
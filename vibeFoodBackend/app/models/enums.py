@@ -23,6 +23,14 @@ class ExtractionMethod(str, Enum):
     QR_CODE = "qr_code"
 
 
+class ScanJobStatus(str, Enum):
+    """Lifecycle of an asynchronous scan job."""
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class PreferenceType(str, Enum):
     """User dietary preference types for registration."""
     NO_RESTRICTION = "no_restriction"
@@ -16,7 +16,12 @@ from app.schemas.register import (
 )
 from app.schemas.scan import (
     ScanRequest,
+    MultiScanRequest,
     ScanResponse,
+    ScanIntroRequest,
+    ScanIntroResponse,
+    ScanJobResponse,
+    ScanJobStatusResponse,
 )
 from app.schemas.mvp_recommendation import (
     MVPRecommendationRequest,
@@ -41,7 +46,12 @@ __all__ = [
     "RegisterResponse",
     # MVP Scan
     "ScanRequest",
+    "MultiScanRequest",
     "ScanResponse",
+    "ScanIntroRequest",
+    "ScanIntroResponse",
+    "ScanJobResponse",
+    "ScanJobStatusResponse",
     # MVP Recommendation
     "MVPRecommendationRequest",
     "MVPRecommendationResponse",
@@ -20,6 +20,14 @@ class DishRecommendation(BaseModel):
         default=None,
         description="Emoji representing the dish mood"
     )
+    dish_id: Optional[str] = Field(
+        default=None,
+        description="Id of the matching menu item, if the dish was found on the scanned menu"
+    )
+    price_value: Optional[float] = Field(
+        default=None,
+        description="Numeric menu price of the matching item"
+    )
 
 
 class MVPRecommendationRequest(BaseModel):
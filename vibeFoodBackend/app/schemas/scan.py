@@ -14,6 +14,21 @@ class ScanRequest(BaseModel):
     image_base64: str = Field(
         description="Base64 encoded menu image"
     )
+    tiled: bool = Field(
+        default=False,
+        description="Extract very large or dense menus as overlapping tiles in parallel"
+    )
+
+
+class MultiScanRequest(BaseModel):
+    """Request schema for a multi-page menu scan."""
+    device_id: str = Field(
+        description="Unique device identifier"
+    )
+    images_base64: List[str] = Field(
+        min_length=1,
+        description="Base64 encoded menu images, one per page, in reading order"
+    )
 
 
 class ScanResponse(BaseModel):
@@ -45,7 +60,82 @@ class ScanResponse(BaseModel):
         default=None,
         description="LLM-generated warm introduction about the restaurant"
     )
+    intro_pending: bool = Field(
+        default=False,
+        description="The intro is still being generated; fetch it from /scan/intro"
+    )
     menu_language: Optional[str] = Field(
         default=None,
         description="Detected language of the menu (e.g., 'en', 'zh', 'ja')"
     )
+    page_count: Optional[int] = Field(
+        default=None,
+        description="Number of menu pages processed (multi-page scans only)"
+    )
+
+
+class ScanIntroRequest(BaseModel):
+    """Request schema for fetching the restaurant intro of the current menu."""
+    device_id: str = Field(
+        description="Unique device identifier"
+    )
+
+
+class ScanIntroResponse(BaseModel):
+    """Response schema for the restaurant intro of the current menu."""
+    is_success: bool = Field(
+        description="Whether the device has a scanned menu"
+    )
+    err_msg: Optional[str] = Field(
+        default=None,
+        description="Error message if there is no menu"
+    )
+    restaurant_intro: Optional[str] = Field(
+        default=None,
+        description="LLM-generated warm introduction about the restaurant"
+    )
+    intro_pending: bool = Field(
+        default=False,
+        description="The intro is still being generated; ask again"
+    )
+
+
+class ScanJobResponse(BaseModel):
+    """Response schema for submitting an asynchronous scan job."""
+    is_success: bool = Field(
+        description="Whether the scan was accepted into the queue"
+    )
+    err_msg: Optional[str] = Field(
+        default=None,
+        description="Error message if the scan could not be queued"
+    )
+    job_id: Optional[str] = Field(
+        default=None,
+        description="Id to poll at /scan/jobs/{job_id} or stream at /scan/jobs/{job_id}/events"
+    )
+    status: Optional[str] = Field(
+        default=None,
+        description="Job status: queued, processing, completed or failed"
+    )
+
+
+class ScanJobStatusResponse(BaseModel):
+    """Response schema for polling an asynchronous scan job."""
+    job_id: str = Field(
+        description="Scan job id"
+    )
+    status: str = Field(
+        description="Job status: queued, processing, completed or failed"
+    )
+    queue_position: Optional[int] = Field(
+        default=None,
+        description="1-based position in the queue while status is queued"
+    )
+    result: Optional[ScanResponse] = Field(
+        default=None,
+        description="Scan result once the job has finished"
+    )
+    err_msg: Optional[str] = Field(
+        default=None,
+        description="Error message if the job failed"
+    )
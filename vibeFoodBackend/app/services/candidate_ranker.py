@@ -0,0 +1,253 @@
+"""
+Local candidate pre-ranking for the recommendation prompt.
+
+Only 1-6 dishes come back from GPT-4o, yet large menus were sent in full.
+This module turns a menu into a NumPy feature matrix (spice, relative
+price, diet flags, allergens and keyword features read from the name,
+description, category and tags) once per menu, scores every item against
+all vibes and all dietary preferences with two matrix products, and keeps
+only the top-K items for the prompt.
+
+NumPy is optional: without it (or for small menus and voice prompts) the
+full menu is passed through unchanged.
+"""
+import logging
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from app.core.config import settings
+from app.models.enums import PreferenceType, VibeType
+from app.services.recommendation_cache import menu_fingerprint
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on deployment
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Keyword features matched against the lower-cased item text (English + Chinese)
+KEYWORD_FEATURES: Dict[str, Sequence[str]] = {
+    "popular": ("popular", "signature", "chef", "best seller", "house special", "招牌", "推荐", "人气"),
+    "healthy": ("healthy", "grilled", "steamed", "fresh", "salad", "vegetable", "lean", "蒸", "清炒", "时蔬", "沙拉"),
+    "light": ("light", "salad", "soup", "broth", "fresh", "steamed", "poke", "sashimi", "汤", "凉拌", "清"),
+    "fried": ("fried", "crispy", "tempura", "katsu", "fries", "炸", "酥"),
+    "rich": ("cream", "cheese", "butter", "rich", "truffle", "braised", "fatty", "奶油", "芝士", "红烧", "五花"),
+    "sweet": ("dessert", "cake", "sweet", "ice cream", "pudding", "chocolate", "甜", "糕", "冰淇淋"),
+    "shareable": ("platter", "sharing", "share", "family", "pizza", "whole", "combo", "hot pot", "拼盘", "锅", "全"),
+    "quick": ("sandwich", "roll", "bun", "wrap", "taco", "snack", "skewer", "dumpling", "包", "饺", "串"),
+    "unusual": ("exotic", "special", "seasonal", "fermented", "offal", "tripe", "tongue", "durian", "特色", "肚", "舌"),
+    "comfort": ("curry", "stew", "noodle", "ramen", "pie", "mac", "porridge", "dumpling", "面", "粥", "炖", "咖喱"),
+    "drink": ("drink", "beverage", "tea", "coffee", "juice", "soda", "beer", "wine", "饮", "茶", "酒"),
+    "meat": ("chicken", "beef", "pork", "lamb", "duck", "bacon", "ham", "sausage", "steak", "meat", "鸡", "牛", "猪", "羊", "鸭", "肉"),
+    "seafood": ("fish", "shrimp", "prawn", "crab", "lobster", "squid", "clam", "oyster", "salmon", "tuna", "鱼", "虾", "蟹", "贝"),
+    "pork": ("pork", "bacon", "ham", "lard", "prosciutto", "chorizo", "猪", "五花", "叉烧"),
+    "alcohol": ("wine", "beer", "sake", "rum", "whisky", "vodka", "liqueur", "酒"),
+}
+
+# Allergen features matched against the allergens list (and item text)
+ALLERGEN_FEATURES: Dict[str, Sequence[str]] = {
+    "gluten": ("gluten", "wheat", "flour", "bread", "noodle", "pasta", "麸", "面"),
+    "dairy": ("dairy", "milk", "cheese", "cream", "butter", "yogurt", "奶", "芝士"),
+    "eggs": ("egg", "蛋"),
+    "nuts": ("peanut", "nut", "tree nut", "almond", "cashew", "walnut", "pecan", "花生", "坚果", "核桃", "腰果"),
+    "shellfish": ("shellfish", "shrimp", "prawn", "crab", "lobster", "虾", "蟹"),
+}
+
+# Phrases that contain a feature's keyword without meaning it (鸡蛋 is egg,
+# not chicken; coconut cream is not dairy). They are blanked out before the
+# feature's keywords are matched.
+KEYWORD_EXCLUSIONS: Dict[str, Sequence[str]] = {
+    "meat": ("鸡蛋", "鸭蛋", "牛奶", "牛油果", "肉桂", "肉豆蔻", "素肉"),
+    "seafood": ("鱼香",),
+}
+ALLERGEN_EXCLUSIONS: Dict[str, Sequence[str]] = {
+    "dairy": (
+        "coconut milk", "coconut cream", "almond milk", "oat milk", "soy milk", "rice milk",
+        "peanut butter", "almond butter", "nut butter", "cocoa butter", "shea butter",
+        "椰奶", "椰浆", "豆奶", "杏仁奶", "燕麦奶",
+    ),
+}
+
+FEATURES: List[str] = (
+    ["spice", "price_rank", "cheap", "vegetarian", "vegan"]
+    + list(KEYWORD_FEATURES)
+    + ["allergen_" + name for name in ALLERGEN_FEATURES]
+)
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+
+VIBE_WEIGHTS: Dict[str, Dict[str, float]] = {
+    VibeType.COMFORT.value: {"comfort": 1.0, "rich": 0.5, "popular": 0.4, "fried": 0.3, "drink": -1.0},
+    VibeType.ADVENTURE.value: {"unusual": 1.0, "spice": 0.8, "seafood": 0.3, "popular": -0.2, "drink": -1.0},
+    VibeType.LIGHT.value: {"light": 1.0, "healthy": 0.6, "fried": -0.8, "rich": -0.7, "sweet": -0.3, "drink": -0.5},
+    VibeType.QUICK.value: {"quick": 1.0, "cheap": 0.3, "shareable": -0.5, "drink": -0.5},
+    VibeType.SHARING.value: {"shareable": 1.0, "fried": 0.3, "popular": 0.4, "price_rank": 0.2, "drink": -1.0},
+    VibeType.BUDGET.value: {"cheap": 1.0, "popular": 0.3, "drink": -0.8},
+    VibeType.HEALTHY.value: {"healthy": 1.0, "light": 0.5, "vegetarian": 0.3, "fried": -0.9, "sweet": -0.6, "rich": -0.6},
+    VibeType.INDULGENT.value: {"rich": 1.0, "sweet": 0.7, "fried": 0.5, "price_rank": 0.3, "healthy": -0.3},
+}
+
+# Positive result = conflict with the preference (diet flags cancel conflicts)
+PREFERENCE_CONFLICTS: Dict[str, Dict[str, float]] = {
+    PreferenceType.NO_RESTRICTION.value: {},
+    PreferenceType.VEGETARIAN.value: {"meat": 1.0, "seafood": 1.0, "vegetarian": -2.0, "vegan": -2.0},
+    PreferenceType.VEGAN.value: {"meat": 1.0, "seafood": 1.0, "allergen_dairy": 1.0, "allergen_eggs": 1.0, "vegan": -4.0},
+    PreferenceType.HALAL.value: {"pork": 1.0, "alcohol": 1.0},
+    PreferenceType.KOSHER.value: {"pork": 1.0, "allergen_shellfish": 1.0},
+    PreferenceType.GLUTEN_FREE.value: {"allergen_gluten": 1.0},
+    PreferenceType.DAIRY_FREE.value: {"allergen_dairy": 1.0, "vegan": -1.0},
+    PreferenceType.NUT_FREE.value: {"allergen_nuts": 1.0},
+}
+
+CONFLICT_PENALTY = 2.0
+
+VIBES: List[str] = list(VIBE_WEIGHTS)
+PREFERENCES: List[str] = list(PREFERENCE_CONFLICTS)
+
+_feature_cache = LRUCache(max_size=128)
+
+
+def _keyword_pattern(keywords: Sequence[str]) -> "re.Pattern":
+    """Whole-word match for Latin keywords (plural allowed), substring match for CJK."""
+    latin = [re.escape(k) for k in keywords if k.isascii()]
+    cjk = [re.escape(k) for k in keywords if not k.isascii()]
+    parts = []
+    if latin:
+        parts.append(r"\b(?:%s)(?:s|es)?\b" % "|".join(latin))
+    if cjk:
+        parts.append("|".join(cjk))
+    return re.compile("|".join(parts))
+
+
+class KeywordMatcher(NamedTuple):
+    """A feature's keyword pattern plus the phrases that must not trigger it."""
+    pattern: "re.Pattern"
+    exclude: Optional["re.Pattern"] = None
+
+    def search(self, text: str) -> Optional["re.Match"]:
+        if self.exclude is not None:
+            text = self.exclude.sub(" ", text)
+        return self.pattern.search(text)
+
+
+def _matcher(keywords: Sequence[str], exclusions: Sequence[str] = ()) -> KeywordMatcher:
+    return KeywordMatcher(_keyword_pattern(keywords), _keyword_pattern(exclusions) if exclusions else None)
+
+
+KEYWORD_PATTERNS = {name: _matcher(kws, KEYWORD_EXCLUSIONS.get(name, ())) for name, kws in KEYWORD_FEATURES.items()}
+ALLERGEN_PATTERNS = {name: _matcher(kws, ALLERGEN_EXCLUSIONS.get(name, ())) for name, kws in ALLERGEN_FEATURES.items()}
+
+
+def _weight_matrix(rows: Dict[str, Dict[str, float]]):
+    matrix = np.zeros((len(rows), len(FEATURES)), dtype=np.float32)
+    for r, weights in enumerate(rows.values()):
+        for feature, weight in weights.items():
+            matrix[r, FEATURE_INDEX[feature]] = weight
+    return matrix
+
+
+def item_text(item: Dict) -> str:
+    parts = [item.get("name"), item.get("description"), item.get("category")]
+    parts.extend(item.get("tags") or [])
+    return " ".join(str(p) for p in parts if p).lower()
+
+
+def build_features(menu_items: List[Dict]):
+    """Item x feature matrix (float32) for one menu."""
+    n = len(menu_items)
+    features = np.zeros((n, len(FEATURES)), dtype=np.float32)
+
+    spice = np.array([item.get("spice_level") or 0 for item in menu_items], dtype=np.float32)
+    features[:, FEATURE_INDEX["spice"]] = np.clip(spice, 0, 5) / 5.0
+
+    prices = np.array(
+        [item.get("price") if isinstance(item.get("price"), (int, float)) else np.nan for item in menu_items],
+        dtype=np.float64,
+    )
+    known = ~np.isnan(prices)
+    if known.any():
+        # Percentile rank within this menu; unknown prices sit in the middle
+        ranks = np.full(n, 0.5, dtype=np.float32)
+        order = np.argsort(prices[known], kind="stable")
+        ranks_known = np.empty(order.size, dtype=np.float32)
+        ranks_known[order] = np.arange(order.size) / max(order.size - 1, 1)
+        ranks[known] = ranks_known
+        features[:, FEATURE_INDEX["price_rank"]] = ranks
+        features[:, FEATURE_INDEX["cheap"]] = 1.0 - ranks
+
+    for row, item in enumerate(menu_items):
+        text = item_text(item)
+        allergens = " ".join(item.get("allergens") or []).lower()
+        features[row, FEATURE_INDEX["vegetarian"]] = bool(item.get("is_vegetarian") or item.get("is_vegan"))
+        features[row, FEATURE_INDEX["vegan"]] = bool(item.get("is_vegan"))
+        for name, pattern in KEYWORD_PATTERNS.items():
+            if pattern.search(text):
+                features[row, FEATURE_INDEX[name]] = 1.0
+        for name, pattern in ALLERGEN_PATTERNS.items():
+            if pattern.search(allergens) or pattern.search(text):
+                features[row, FEATURE_INDEX["allergen_" + name]] = 1.0
+    return features
+
+
+def menu_features(menu_items: List[Dict]):
+    """Feature matrix for a menu, cached by menu fingerprint."""
+    key = menu_fingerprint(menu_items)
+    features = _feature_cache.get(key)
+    if features is None:
+        features = build_features(menu_items)
+        _feature_cache.set(key, features)
+    return features
+
+
+def score_menu(menu_items: List[Dict]):
+    """
+    Score every item against every vibe and preference in one pass.
+
+    Returns (vibe_scores, conflicts): arrays of shape (items, len(VIBES))
+    and (items, len(PREFERENCES)); conflicts are clipped at zero.
+    """
+    features = menu_features(menu_items)
+    vibe_scores = features @ _VIBE_MATRIX.T
+    conflicts = np.clip(features @ _PREFERENCE_MATRIX.T, 0.0, None)
+    return vibe_scores, conflicts
+
+
+def select_candidates(
+    menu_items: List[Dict],
+    vibe: str,
+    preference: Optional[str],
+    top_k: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Return the top_k items for this vibe and preference, in menu order.
+
+    Menus at or below RECOMMENDATION_PRERANK_MIN_ITEMS, voice prompts
+    (free text cannot be scored reliably) and unknown vibes pass through.
+    """
+    top_k = top_k or settings.RECOMMENDATION_PRERANK_TOP_K
+    if (
+        not NUMPY_AVAILABLE
+        or not settings.RECOMMENDATION_PRERANK_ENABLED
+        or len(menu_items) <= max(settings.RECOMMENDATION_PRERANK_MIN_ITEMS, top_k)
+        or vibe not in VIBE_WEIGHTS
+    ):
+        return menu_items
+
+    vibe_scores, conflicts = score_menu(menu_items)
+    prefs = [p.strip() for p in (preference or "").split(",") if p.strip() in PREFERENCE_CONFLICTS]
+    scores = vibe_scores[:, VIBES.index(vibe)].copy()
+    if prefs:
+        scores -= CONFLICT_PENALTY * conflicts[:, [PREFERENCES.index(p) for p in prefs]].sum(axis=1)
+
+    # Highest score first, ties broken by menu position; then restore menu order
+    chosen = np.sort(np.argsort(-scores, kind="stable")[:top_k])
+    logger.info("Pre-ranked menu for %s: %d -> %d candidates", vibe, len(menu_items), len(chosen))
+    return [menu_items[i] for i in chosen]
+
+
+if NUMPY_AVAILABLE:
+    _VIBE_MATRIX = _weight_matrix(VIBE_WEIGHTS)
+    _PREFERENCE_MATRIX = _weight_matrix(PREFERENCE_CONFLICTS)
@@ -0,0 +1,303 @@
+"""
+Dietary conflict engine.
+
+Each menu item is encoded once per menu into a small integer bitset of
+diet-relevant facts: declared allergens, the vegetarian/vegan flags and
+keyword hits in the name, description, category and tags (meat, pork,
+seafood, alcohol). Every PreferenceType is a rule over those bits, so the
+conflicts of an item against all preferences are precomputed as one more
+bitset (bit i = conflicts with PREFERENCES[i]).
+
+Warnings are then written locally from templates for the user's
+comma-separated preference list, instead of asking GPT-4o to produce them.
+Menus in a language without templates (see template_language) keep the
+warnings the model writes.
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from app.models.enums import PreferenceType
+from app.services.candidate_ranker import ALLERGEN_PATTERNS, KEYWORD_PATTERNS, item_text
+from app.services.recommendation_cache import menu_fingerprint
+from app.utils.cache import LRUCache
+
+MEAT = 1 << 0
+SEAFOOD = 1 << 1
+PORK = 1 << 2
+ALCOHOL = 1 << 3
+SHELLFISH = 1 << 4
+GLUTEN = 1 << 5
+DAIRY = 1 << 6
+EGGS = 1 << 7
+NUTS = 1 << 8
+VEGETARIAN = 1 << 9
+VEGAN = 1 << 10
+SPICY = 1 << 11
+
+# spice_level (0-5) from which a dish gets a spice warning
+SPICY_LEVEL = 3
+
+# Keyword features (candidate_ranker) that set a bit
+KEYWORD_BITS = {"meat": MEAT, "seafood": SEAFOOD, "pork": PORK, "alcohol": ALCOHOL}
+ALLERGEN_BITS = {"shellfish": SHELLFISH, "gluten": GLUTEN, "dairy": DAIRY, "eggs": EGGS, "nuts": NUTS}
+
+
+class PreferenceRule(NamedTuple):
+    """An item conflicts if it has any conflict bit and none of the exempt bits."""
+    conflict: int
+    exempt: int = 0
+
+
+PREFERENCE_RULES: Dict[str, PreferenceRule] = {
+    PreferenceType.NO_RESTRICTION.value: PreferenceRule(0),
+    PreferenceType.VEGETARIAN.value: PreferenceRule(MEAT | SEAFOOD, exempt=VEGETARIAN | VEGAN),
+    PreferenceType.VEGAN.value: PreferenceRule(MEAT | SEAFOOD | DAIRY | EGGS, exempt=VEGAN),
+    PreferenceType.HALAL.value: PreferenceRule(PORK | ALCOHOL),
+    PreferenceType.KOSHER.value: PreferenceRule(PORK | SHELLFISH),
+    PreferenceType.GLUTEN_FREE.value: PreferenceRule(GLUTEN),
+    PreferenceType.DAIRY_FREE.value: PreferenceRule(DAIRY, exempt=VEGAN),
+    PreferenceType.NUT_FREE.value: PreferenceRule(NUTS),
+}
+PREFERENCES: List[str] = list(PREFERENCE_RULES)
+PREFERENCE_BIT = {pref: 1 << i for i, pref in enumerate(PREFERENCES)}
+
+TEMPLATES = {
+    "en": {
+        "conflict": "Not {preference}: contains {reasons}",
+        "contains": "Contains {allergens}",
+        "separator": ", ",
+        "preferences": {
+            "vegetarian": "vegetarian", "vegan": "vegan", "halal": "halal", "kosher": "kosher",
+            "gluten_free": "gluten-free", "dairy_free": "dairy-free", "nut_free": "nut-free",
+        },
+        "bits": {
+            MEAT: "meat", SEAFOOD: "seafood", PORK: "pork", ALCOHOL: "alcohol", SHELLFISH: "shellfish",
+            GLUTEN: "gluten", DAIRY: "dairy", EGGS: "eggs", NUTS: "nuts",
+        },
+        # Declared allergens are shown as the model wrote them
+        "allergens": None,
+        "spicy": "Spicy",
+    },
+    "zh": {
+        "conflict": "不符合{preference}要求：含{reasons}",
+        "contains": "含有{allergens}",
+        "separator": "、",
+        "preferences": {
+            "vegetarian": "素食", "vegan": "纯素", "halal": "清真", "kosher": "犹太洁食",
+            "gluten_free": "无麸质", "dairy_free": "无乳制品", "nut_free": "无坚果",
+        },
+        "bits": {
+            MEAT: "肉类", SEAFOOD: "海鲜", PORK: "猪肉", ALCOHOL: "酒精", SHELLFISH: "贝类/甲壳类",
+            GLUTEN: "麸质", DAIRY: "乳制品", EGGS: "鸡蛋", NUTS: "坚果",
+        },
+        # Declared allergens come back in English; other known names fall back to their bit label
+        "allergens": {
+            "peanut": "花生", "peanuts": "花生", "tree nuts": "坚果", "soy": "大豆", "soybeans": "大豆",
+            "sesame": "芝麻", "fish": "鱼类", "fish sauce": "鱼露", "coconut": "椰子", "wheat": "小麦",
+            "milk": "牛奶", "celery": "芹菜", "mustard": "芥末", "sulfites": "亚硫酸盐",
+        },
+        "spicy": "辣",
+    },
+    "ja": {
+        "conflict": "{preference}対応ではありません：{reasons}を含みます",
+        "contains": "{allergens}を含みます",
+        "separator": "、",
+        "preferences": {
+            "vegetarian": "ベジタリアン", "vegan": "ヴィーガン", "halal": "ハラール", "kosher": "コーシャ",
+            "gluten_free": "グルテンフリー", "dairy_free": "乳製品不使用", "nut_free": "ナッツ不使用",
+        },
+        "bits": {
+            MEAT: "肉", SEAFOOD: "魚介類", PORK: "豚肉", ALCOHOL: "アルコール", SHELLFISH: "甲殻類・貝類",
+            GLUTEN: "グルテン", DAIRY: "乳製品", EGGS: "卵", NUTS: "ナッツ",
+        },
+        "allergens": {
+            "peanut": "落花生", "peanuts": "落花生", "tree nuts": "ナッツ", "soy": "大豆", "soybeans": "大豆",
+            "sesame": "ごま", "fish": "魚", "fish sauce": "魚醤", "coconut": "ココナッツ", "wheat": "小麦",
+            "milk": "乳", "celery": "セロリ", "mustard": "からし", "sulfites": "亜硫酸塩",
+        },
+        "spicy": "辛口",
+    },
+    "ko": {
+        "conflict": "{preference} 메뉴 아님: {reasons} 포함",
+        "contains": "{allergens} 함유",
+        "separator": ", ",
+        "preferences": {
+            "vegetarian": "채식", "vegan": "비건", "halal": "할랄", "kosher": "코셔",
+            "gluten_free": "글루텐 프리", "dairy_free": "유제품 프리", "nut_free": "견과류 프리",
+        },
+        "bits": {
+            MEAT: "육류", SEAFOOD: "해산물", PORK: "돼지고기", ALCOHOL: "알코올", SHELLFISH: "갑각류/조개류",
+            GLUTEN: "글루텐", DAIRY: "유제품", EGGS: "달걀", NUTS: "견과류",
+        },
+        "allergens": {
+            "peanut": "땅콩", "peanuts": "땅콩", "tree nuts": "견과류", "soy": "대두", "soybeans": "대두",
+            "sesame": "참깨", "fish": "생선", "fish sauce": "피시 소스", "coconut": "코코넛", "wheat": "밀",
+            "milk": "우유", "celery": "셀러리", "mustard": "겨자", "sulfites": "아황산염",
+        },
+        "spicy": "매운맛",
+    },
+    "es": {
+        "conflict": "No apto para dieta {preference}: contiene {reasons}",
+        "contains": "Contiene {allergens}",
+        "separator": ", ",
+        "preferences": {
+            "vegetarian": "vegetariana", "vegan": "vegana", "halal": "halal", "kosher": "kosher",
+            "gluten_free": "sin gluten", "dairy_free": "sin lácteos", "nut_free": "sin frutos secos",
+        },
+        "bits": {
+            MEAT: "carne", SEAFOOD: "pescado o marisco", PORK: "cerdo", ALCOHOL: "alcohol",
+            SHELLFISH: "crustáceos o moluscos", GLUTEN: "gluten", DAIRY: "lácteos", EGGS: "huevo",
+            NUTS: "frutos secos",
+        },
+        "allergens": {
+            "peanut": "cacahuete", "peanuts": "cacahuete", "tree nuts": "frutos secos", "soy": "soja",
+            "soybeans": "soja", "sesame": "sésamo", "fish": "pescado", "fish sauce": "salsa de pescado",
+            "coconut": "coco", "wheat": "trigo", "milk": "leche", "celery": "apio", "mustard": "mostaza",
+            "sulfites": "sulfitos",
+        },
+        "spicy": "Picante",
+    },
+    "fr": {
+        "conflict": "Incompatible avec un régime {preference} : contient {reasons}",
+        "contains": "Contient {allergens}",
+        "separator": ", ",
+        "preferences": {
+            "vegetarian": "végétarien", "vegan": "végan", "halal": "halal", "kosher": "casher",
+            "gluten_free": "sans gluten", "dairy_free": "sans produits laitiers", "nut_free": "sans fruits à coque",
+        },
+        "bits": {
+            MEAT: "viande", SEAFOOD: "poisson ou fruits de mer", PORK: "porc", ALCOHOL: "alcool",
+            SHELLFISH: "crustacés ou mollusques", GLUTEN: "gluten", DAIRY: "produits laitiers", EGGS: "œufs",
+            NUTS: "fruits à coque",
+        },
+        "allergens": {
+            "peanut": "arachide", "peanuts": "arachides", "tree nuts": "fruits à coque", "soy": "soja",
+            "soybeans": "soja", "sesame": "sésame", "fish": "poisson", "fish sauce": "sauce de poisson",
+            "coconut": "noix de coco", "wheat": "blé", "milk": "lait", "celery": "céleri", "mustard": "moutarde",
+            "sulfites": "sulfites",
+        },
+        "spicy": "Épicé",
+    },
+}
+
+_table_cache = LRUCache(max_size=128)
+
+
+def _spice_level(item: Dict) -> float:
+    try:
+        return float(item.get("spice_level") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def item_bits(item: Dict) -> int:
+    """Diet-relevant facts about one menu item as a bitset."""
+    bits = 0
+    if item.get("is_vegetarian") or item.get("is_vegan"):
+        bits |= VEGETARIAN
+    if item.get("is_vegan"):
+        bits |= VEGAN
+    if _spice_level(item) >= SPICY_LEVEL:
+        bits |= SPICY
+    text = item_text(item)
+    for name, bit in KEYWORD_BITS.items():
+        if KEYWORD_PATTERNS[name].search(text):
+            bits |= bit
+    allergens = " ".join(str(a) for a in item.get("allergens") or []).lower()
+    for name, bit in ALLERGEN_BITS.items():
+        pattern = ALLERGEN_PATTERNS[name]
+        if pattern.search(allergens) or pattern.search(text):
+            bits |= bit
+    return bits
+
+
+def conflict_mask(bits: int) -> int:
+    """Bit i set when an item with these bits conflicts with PREFERENCES[i]."""
+    mask = 0
+    for pref, rule in PREFERENCE_RULES.items():
+        if bits & rule.conflict and not bits & rule.exempt:
+            mask |= PREFERENCE_BIT[pref]
+    return mask
+
+
+def parse_preferences(preference: Optional[str]) -> List[str]:
+    """Known restrictions from the comma-separated preference string."""
+    parsed = []
+    for pref in (preference or "").split(","):
+        pref = pref.strip().lower()
+        if pref in PREFERENCE_RULES and pref != PreferenceType.NO_RESTRICTION.value and pref not in parsed:
+            parsed.append(pref)
+    return parsed
+
+
+def template_language(menu_language: Optional[str]) -> Optional[str]:
+    """The TEMPLATES language for a menu ("zh-TW" -> "zh"), or None if there are no templates for it."""
+    lang = (menu_language or "en").lower().replace("_", "-").split("-")[0]
+    return lang if lang in TEMPLATES else None
+
+
+def _allergen_label(allergen: str, t: Dict) -> str:
+    """A declared allergen in the template's language (unknown names are kept as written)."""
+    names = t["allergens"]
+    if names is None:
+        return allergen
+    key = allergen.strip().lower()
+    if key in names:
+        return names[key]
+    for name, bit in ALLERGEN_BITS.items():
+        if ALLERGEN_PATTERNS[name].search(key):
+            return t["bits"][bit]
+    return allergen
+
+
+class ConflictTable:
+    """Per-item fact bitsets and precomputed preference conflict masks for one menu."""
+
+    def __init__(self, menu_items: List[Dict]):
+        self.items = menu_items
+        self.bits: List[int] = [item_bits(item) for item in menu_items]
+        self.masks: List[int] = [conflict_mask(bits) for bits in self.bits]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def conflicts(self, position: int, preferences: Sequence[str]) -> List[str]:
+        """The given preferences that the item at position conflicts with."""
+        mask = self.masks[position]
+        return [pref for pref in preferences if mask & PREFERENCE_BIT.get(pref, 0)]
+
+    def warnings(self, position: int, preference: Optional[str], menu_language: Optional[str] = None) -> Optional[List[str]]:
+        """
+        Warning lines for the item at position: one per conflicting
+        preference, then any declared allergens not named yet, then a
+        spice warning. None when there is nothing to warn about (the
+        response uses null, not []). Languages without templates get English.
+        """
+        t = TEMPLATES[template_language(menu_language) or "en"]
+        bits = self.bits[position]
+        lines = []
+        for pref in self.conflicts(position, parse_preferences(preference)):
+            reasons = [label for bit, label in t["bits"].items() if bits & PREFERENCE_RULES[pref].conflict & bit]
+            lines.append(t["conflict"].format(
+                preference=t["preferences"][pref], reasons=t["separator"].join(reasons),
+            ))
+        named = " ".join(lines).lower()
+        remaining: List[str] = []
+        for allergen in self.items[position].get("allergens") or []:
+            label = _allergen_label(str(allergen), t)
+            if label.lower() not in named and label not in remaining:
+                remaining.append(label)
+        if remaining:
+            lines.append(t["contains"].format(allergens=t["separator"].join(remaining)))
+        if bits & SPICY:
+            lines.append(t["spicy"])
+        return lines or None
+
+
+def get_conflict_table(menu_items: List[Dict]) -> ConflictTable:
+    """Get or build the conflict table for a menu, cached by menu fingerprint."""
+    key = menu_fingerprint(menu_items)
+    table = _table_cache.get(key)
+    if table is None:
+        table = ConflictTable(menu_items)
+        _table_cache.set(key, table)
+    return table
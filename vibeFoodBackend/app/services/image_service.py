@@ -0,0 +1,333 @@
+"""
+Image processing helpers for the scan pipeline.
+
+CPU-bound work (decoding, resizing, hashing) runs in a shared process pool
+so it never blocks the event loop. Pillow is required for these stages;
+without it they are skipped and the pipeline behaves as before.
+"""
+import asyncio
+import io
+import logging
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on deployment
+    Image = ImageOps = None
+    PIL_AVAILABLE = False
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class ImageSignature(NamedTuple):
+    """Difference hash (dHash) plus pixel size, used to match near-duplicate photos."""
+    dhash: int
+    width: int
+    height: int
+
+    @property
+    def aspect(self) -> float:
+        return self.width / self.height if self.height else 0.0
+
+
+@dataclass
+class PreprocessResult:
+    """Outcome of the downscale/recompress stage for one image."""
+    image_bytes: bytes
+    original_bytes: int
+    processed_bytes: int
+    original_size: Tuple[int, int]
+    processed_size: Tuple[int, int]
+    original_tokens: int
+    processed_tokens: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.processed_bytes
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.processed_tokens
+
+
+@dataclass
+class PreprocessStats:
+    """Running totals of preprocessing savings since startup."""
+    images: int = 0
+    bytes_saved: int = 0
+    tokens_saved: int = 0
+
+    def record(self, result: PreprocessResult) -> None:
+        self.images += 1
+        self.bytes_saved += result.bytes_saved
+        self.tokens_saved += result.tokens_saved
+
+
+preprocess_stats = PreprocessStats()
+
+
+def get_image_pool() -> ProcessPoolExecutor:
+    """Get or create the shared process pool for image work."""
+    global _pool
+    if _pool is None:
+        # Never fork: uvicorn and the scan workers already run threads
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def warm_image_pool() -> None:
+    """
+    Start the pool's worker processes now. Spawned workers take seconds to
+    start, which would otherwise land on the first scans. The pool starts
+    a process per task that finds no idle worker, so one task is submitted
+    per worker at once.
+    """
+    if not PIL_AVAILABLE:
+        return
+    loop = asyncio.get_running_loop()
+    pool = get_image_pool()
+    try:
+        await asyncio.gather(*(
+            loop.run_in_executor(pool, _warm_up) for _ in range(settings.IMAGE_PROCESS_WORKERS)
+        ))
+    except Exception as e:
+        logger.warning("Image pool warm-up failed: %s", e)
+
+
+def shutdown_image_pool() -> None:
+    """Shut down the process pool (called on application shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# --- Worker functions (module-level so they can be pickled) ---
+
+def _warm_up() -> None:
+    """No-op task: makes a worker process start (and import this module)."""
+
+
+def compute_dhash(image_bytes: bytes, hash_size: int = 8) -> Optional[int]:
+    """
+    Compute a difference hash (dHash) of an image.
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale thumbnail
+    and each bit records whether a pixel is brighter than its right neighbour.
+    Small changes in angle, lighting or JPEG quality flip only a few bits.
+    Returns None if the bytes cannot be decoded as an image.
+    """
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            return _dhash(img, hash_size)
+    except Exception:
+        return None
+
+
+def _dhash(img, hash_size: int = 8) -> int:
+    """dHash of an opened image (decodes it at reduced size where the format allows)."""
+    img.draft("L", (hash_size * 8, hash_size * 8))
+    pixels = img.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS).tobytes()
+    value = 0
+    width = hash_size + 1
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * width + col]
+            right = pixels[row * width + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def compute_image_signature(image_bytes: bytes) -> Optional[ImageSignature]:
+    """dHash and pixel size of an image, or None if it cannot be decoded."""
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            # Size first: draft() in _dhash shrinks the image it decodes
+            width, height = img.size
+            return ImageSignature(_dhash(img), width, height)
+    except Exception:
+        return None
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count("1")
+
+
+def estimate_vision_tokens(width: int, height: int) -> int:
+    """
+    Estimate input tokens for an image sent with high/auto detail.
+
+    Mirrors OpenAI's published rule: fit within 2048x2048, scale the shortest
+    side down to 768, then charge 170 tokens per 512px tile plus 85 base.
+    """
+    if width <= 0 or height <= 0:
+        return 0
+    scale = min(1.0, 2048 / max(width, height))
+    w, h = width * scale, height * scale
+    scale = min(1.0, 768 / min(w, h))
+    w, h = w * scale, h * scale
+    return 85 + 170 * math.ceil(w / 512) * math.ceil(h / 512)
+
+
+def preprocess_image(
+    image_bytes: bytes,
+    max_edge: int,
+    quality: int,
+    grayscale: bool = False,
+) -> Optional[PreprocessResult]:
+    """
+    Downscale an image to max_edge on its long side and re-encode as JPEG.
+
+    EXIF orientation is applied before resizing so rotated phone photos stay
+    upright. If re-encoding would not make the payload smaller, the original
+    bytes are kept. Returns None if the bytes cannot be decoded.
+    """
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            original_size = img.size
+            img.draft("L" if grayscale else "RGB", (max_edge, max_edge))
+            img = ImageOps.exif_transpose(img)
+            img = img.convert("L" if grayscale else "RGB")
+            img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+            buf = io.BytesIO()
+            img.save(buf, format="JPEG", quality=quality, optimize=True)
+            processed = buf.getvalue()
+            processed_size = img.size
+    except Exception:
+        return None
+
+    if len(processed) >= len(image_bytes):
+        processed, processed_size = image_bytes, original_size
+
+    return PreprocessResult(
+        image_bytes=processed,
+        original_bytes=len(image_bytes),
+        processed_bytes=len(processed),
+        original_size=original_size,
+        processed_size=processed_size,
+        original_tokens=estimate_vision_tokens(*original_size),
+        processed_tokens=estimate_vision_tokens(*processed_size),
+    )
+
+
+def split_into_tiles(
+    image_bytes: bytes,
+    rows: int,
+    cols: int,
+    overlap: float,
+    max_edge: int,
+    quality: int,
+) -> List[bytes]:
+    """
+    Split an image into a rows x cols grid of overlapping JPEG tiles.
+
+    Each tile extends by `overlap` (a fraction of the tile size) into its
+    neighbours so items on a grid line appear whole in at least one tile.
+    Tiles are returned in reading order (left to right, top to bottom).
+    Returns an empty list if the bytes cannot be decoded.
+    """
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            width, height = img.size
+            tile_w, tile_h = width / cols, height / rows
+            pad_w, pad_h = tile_w * overlap, tile_h * overlap
+            tiles = []
+            for row in range(rows):
+                for col in range(cols):
+                    box = (
+                        max(0, int(col * tile_w - pad_w)),
+                        max(0, int(row * tile_h - pad_h)),
+                        min(width, int((col + 1) * tile_w + pad_w)),
+                        min(height, int((row + 1) * tile_h + pad_h)),
+                    )
+                    tile = img.crop(box)
+                    tile.thumbnail((max_edge, max_edge), Image.LANCZOS)
+                    buf = io.BytesIO()
+                    tile.save(buf, format="JPEG", quality=quality, optimize=True)
+                    tiles.append(buf.getvalue())
+            return tiles
+    except Exception:
+        return []
+
+
+# --- Async entry points ---
+
+async def image_signature(image_bytes: bytes) -> Optional[ImageSignature]:
+    """Compute the dHash and size of an image in the process pool."""
+    if not PIL_AVAILABLE:
+        return None
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_image_pool(), compute_image_signature, image_bytes)
+    except Exception as e:
+        logger.warning("Perceptual hash failed: %s", e)
+        return None
+
+
+async def preprocess_for_vision(image_bytes: bytes) -> Optional[PreprocessResult]:
+    """
+    Run the downscale/recompress stage in the process pool.
+
+    Returns None when preprocessing is disabled, Pillow is missing, or the
+    image cannot be decoded; callers then send the original bytes.
+    """
+    if not (settings.IMAGE_PREPROCESS_ENABLED and PIL_AVAILABLE):
+        return None
+    loop = asyncio.get_running_loop()
+    try:
+        result = await loop.run_in_executor(
+            get_image_pool(),
+            preprocess_image,
+            image_bytes,
+            settings.IMAGE_PREPROCESS_MAX_EDGE,
+            settings.IMAGE_PREPROCESS_JPEG_QUALITY,
+            settings.IMAGE_PREPROCESS_GRAYSCALE,
+        )
+    except Exception as e:
+        logger.warning("Image preprocessing failed: %s", e)
+        return None
+
+    if result is not None:
+        preprocess_stats.record(result)
+        logger.info(
+            "Preprocessed image %sx%s -> %sx%s: %d -> %d bytes (saved %d), ~%d -> ~%d vision tokens (saved %d)",
+            *result.original_size, *result.processed_size,
+            result.original_bytes, result.processed_bytes, result.bytes_saved,
+            result.original_tokens, result.processed_tokens, result.tokens_saved,
+        )
+    return result
+
+
+async def tile_image(image_bytes: bytes) -> List[bytes]:
+    """Split an image into overlapping tiles in the process pool (empty if unavailable)."""
+    if not PIL_AVAILABLE:
+        return []
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            get_image_pool(),
+            split_into_tiles,
+            image_bytes,
+            settings.OCR_TILE_ROWS,
+            settings.OCR_TILE_COLS,
+            settings.OCR_TILE_OVERLAP,
+            settings.IMAGE_PREPROCESS_MAX_EDGE,
+            settings.IMAGE_PREPROCESS_JPEG_QUALITY,
+        )
+    except Exception as e:
+        logger.warning("Image tiling failed: %s", e)
+        return []
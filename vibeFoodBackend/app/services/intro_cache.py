@@ -0,0 +1,109 @@
+"""
+Cache for LLM restaurant intros.
+
+Every diner who scans a popular restaurant's menu used to trigger a fresh
+GPT-4o intro, although the inputs barely change between scans. Intros are
+cached per restaurant identity: the normalized restaurant name, cuisine
+type and menu language. Categories and sample dishes are left out of the
+key because they vary with which page or crop was photographed.
+
+With INTRO_CACHE_VARIANTS > 1, that many distinct intros are collected
+per restaurant (lookups miss until the set is full) and then served in
+rotation. Menus without a detected restaurant name are not cached.
+"""
+import logging
+from typing import List, Optional
+
+from app.core.config import settings
+from app.services.ocr_service import normalize_dish_name
+from app.utils.cache import LRUCache, TieredCache
+from app.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_cache: Optional[TieredCache] = None
+_rotation: Optional[LRUCache] = None
+
+LOOKUPS = REGISTRY.counter(
+    "vibefood_intro_cache_lookups_total",
+    "Restaurant intro cache lookups by result (hit, miss, or collecting more variants).",
+    ("result",),
+)
+
+
+def intro_cache_key(
+    restaurant_name: Optional[str],
+    cuisine_type: Optional[str],
+    menu_language: Optional[str],
+) -> Optional[str]:
+    """Cache key for a restaurant, or None if the menu has no usable name."""
+    name = normalize_dish_name(restaurant_name or "")
+    if not name:
+        return None
+    cuisine = normalize_dish_name(cuisine_type or "")
+    return ":".join([name, cuisine, (menu_language or "en").lower()])
+
+
+def get_intro_cache(create: bool = True) -> Optional[TieredCache]:
+    """
+    Get or create the shared intro cache. Returns None if disabled, or with
+    create=False if it does not exist yet.
+    """
+    global _cache, _rotation
+    if not settings.INTRO_CACHE_ENABLED:
+        return None
+    if _cache is None and create:
+        _cache = TieredCache(
+            name="restaurant_intros",
+            memory_size=settings.INTRO_CACHE_MEMORY_SIZE,
+            ttl_seconds=settings.INTRO_CACHE_TTL_SECONDS,
+            disk_path=settings.INTRO_CACHE_DB_PATH,
+            disk_max_bytes=settings.INTRO_CACHE_MAX_BYTES,
+        )
+        _rotation = LRUCache(max_size=settings.INTRO_CACHE_MEMORY_SIZE)
+        logger.info(
+            "Intro cache initialized (memory=%d entries, disk=%s, variants=%d)",
+            settings.INTRO_CACHE_MEMORY_SIZE,
+            settings.INTRO_CACHE_DB_PATH or "disabled",
+            settings.INTRO_CACHE_VARIANTS,
+        )
+    return _cache
+
+
+def get_cached_intro(key: Optional[str]) -> Optional[str]:
+    """The next cached intro for a restaurant, rotating through its variants."""
+    cache = get_intro_cache()
+    if cache is None or key is None:
+        return None
+    variants: List[str] = cache.get(key) or []
+    if not variants:
+        LOOKUPS.inc(result="miss")
+        return None
+    if len(variants) < settings.INTRO_CACHE_VARIANTS:
+        LOOKUPS.inc(result="collecting")
+        return None
+    LOOKUPS.inc(result="hit")
+    turn = _rotation.get(key) or 0
+    _rotation.set(key, turn + 1)
+    return variants[turn % len(variants)]
+
+
+def store_intro(key: Optional[str], intro: str) -> None:
+    """Add a generated intro to the restaurant's variants (up to INTRO_CACHE_VARIANTS)."""
+    cache = get_intro_cache()
+    if cache is None or key is None or not intro:
+        return
+    # Peek: adding a variant is not a lookup and must not count as a hit or miss
+    variants: List[str] = cache.peek(key) or []
+    if intro in variants:
+        return
+    cache.set(key, (variants + [intro])[-max(settings.INTRO_CACHE_VARIANTS, 1):])
+
+
+def reset_intro_cache() -> None:
+    """Drop all cached intros (used by tests and admin tooling)."""
+    global _cache, _rotation
+    if _cache is not None:
+        _cache.clear()
+    _cache = None
+    _rotation = None
@@ -1,13 +1,33 @@
 """
 LLM recommendation service using OpenAI GPT-4o.
-Falls back to hardcoded recommendations when OPENAI_API_KEY is not configured.
+Falls back to the local recommendation engine when OPENAI_API_KEY is not
+configured or the LLM call fails (hardcoded recommendations if the menu is empty).
 """
+import asyncio
+import copy
+import hashlib
 import json
 import logging
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from app.core.config import settings
+from app.services import local_recommender
+from app.services.candidate_ranker import select_candidates
+from app.services.dietary_conflicts import ConflictTable, get_conflict_table, template_language
+from app.services.intro_cache import get_cached_intro, intro_cache_key, store_intro
+from app.services.menu_prompt import encode_menu
+from app.services.name_index import DishNameIndex, attach_menu_item, get_name_index
+from app.services.recommendation_cache import (
+    get_cached_recommendations,
+    get_recommendation_flights,
+    menu_fingerprint,
+    recommendation_cache_key,
+    store_recommendations,
+)
 from app.utils.errors import LLMFailedError
+from app.utils.json_stream import JSONStreamParser
+from app.utils.singleflight import get_single_flight
+from app.utils.tokens import count_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +62,6 @@ Return a JSON object:
       "dish_name": "exact name from the menu",
       "reasoning": "Why this dish matches their vibe (1 sentence)",
       "story": "A brief, engaging description that makes the dish appealing (1 sentence)",
-      "warnings": ["allergen or dietary warnings relevant to user's preference"],
       "price": "price as string from menu, or 'Ask staff' if unknown",
       "emoji": "single emoji that represents this dish"
     }
@@ -57,13 +76,13 @@ Rules:
   - If the user picks a standard vibe or gives no group size hint → recommend 3-4 dishes
   - If the user mentions a group, sharing, many people, or a big meal → recommend 4-6 dishes
   - Use common sense: "随便吃点" (just grab something) = 1-2, "人很多" (lots of people) = 5-6
-- If user has dietary restrictions, ALWAYS flag conflicts in warnings
-- If a dish conflicts with the user's dietary preference, you may still include it if it's an exceptional vibe match, but add a clear warning
+- If user has dietary restrictions, prefer dishes that fit them
+- If a dish conflicts with the user's dietary preference, you may still include it if it's an exceptional vibe match
+- Dietary, allergen and spice warnings are added automatically — do not write them, unless the request says "Write warnings: yes". Then add "warnings" to each recommendation: a list of short warnings in the menu language (dietary conflicts, allergens, very spicy), or null if there are none
 - Price must match the menu price exactly
 - Keep reasoning and story concise and warm in tone
 - If the menu has very few items, recommend all that fit
-- warnings should be null (not empty array) if there are no warnings
-- CRITICAL: Write the brief_summary, reasoning, story, and warnings in the SAME LANGUAGE as the menu. If the menu language is "zh" (Chinese), write all text fields in Chinese. If "ja", write in Japanese. If "en" or unspecified, write in English. Dish names must remain exactly as they appear on the menu regardless of language."""
+- CRITICAL: Write the brief_summary, reasoning, and story in the SAME LANGUAGE as the menu. If the menu language is "zh" (Chinese), write all text fields in Chinese. If "ja", write in Japanese. If "en" or unspecified, write in English. Dish names must remain exactly as they appear on the menu regardless of language."""
 
 
 RESTAURANT_INTRO_PROMPT = """You are Gusto, a warm and friendly food companion. Given restaurant info extracted from a menu, write a 2-3 sentence introduction as if you're a friend telling someone about this place.
@@ -80,17 +99,51 @@ Rules:
 Return ONLY the introduction text, no JSON, no quotes."""
 
 
-async def generate_restaurant_intro(
+def start_restaurant_intro(
     restaurant_name: Optional[str],
     cuisine_type: Optional[str],
     categories: List[str],
     sample_items: List[str],
     menu_language: Optional[str] = None,
-) -> Optional[str]:
+) -> "asyncio.Task":
     """
-    Generate a warm 2-3 sentence restaurant intro using GPT-4o.
-    Returns None if generation fails or API key not set.
+    Start intro generation in the background, or join the one already
+    running for the same inputs. The task resolves to the intro or None.
     """
+    key = hashlib.sha256(json.dumps(
+        [restaurant_name, cuisine_type, categories, sample_items, menu_language], ensure_ascii=False,
+    ).encode("utf-8")).hexdigest()
+    return get_single_flight("restaurant_intro").start(key, lambda: _cached_restaurant_intro(
+        restaurant_name, cuisine_type, categories, sample_items, menu_language,
+    ))
+
+
+async def _cached_restaurant_intro(
+    restaurant_name: Optional[str],
+    cuisine_type: Optional[str],
+    categories: List[str],
+    sample_items: List[str],
+    menu_language: Optional[str] = None,
+) -> Optional[str]:
+    """Serve the restaurant's cached intro, or generate one and cache it."""
+    key = intro_cache_key(restaurant_name, cuisine_type, menu_language)
+    cached = get_cached_intro(key)
+    if cached is not None:
+        logger.info("Restaurant intro cache hit (%s)", key)
+        return cached
+    intro = await _generate_restaurant_intro(restaurant_name, cuisine_type, categories, sample_items, menu_language)
+    if intro and settings.OPENAI_API_KEY:  # the dev-mode template is not worth caching
+        store_intro(key, intro)
+    return intro
+
+
+async def _generate_restaurant_intro(
+    restaurant_name: Optional[str],
+    cuisine_type: Optional[str],
+    categories: List[str],
+    sample_items: List[str],
+    menu_language: Optional[str] = None,
+) -> Optional[str]:
     if not settings.OPENAI_API_KEY:
         # Fallback template for dev mode
         name = restaurant_name or "This place"
@@ -98,8 +151,7 @@ async def generate_restaurant_intro(
         return f"{name} serves{cuisine} cuisine with a nice variety to explore. I think you'll find something great here!"
 
     try:
-        from app.services.openai_client import get_openai_client
-        client = get_openai_client()
+        from app.services.openai_client import create_chat_completion, record_usage
 
         name = restaurant_name or "this restaurant"
         cuisine = cuisine_type or "varied"
@@ -113,14 +165,16 @@ Menu sections: {cats}
 Sample dishes: {samples}
 Menu language: {lang}"""
 
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(
+            "intro",
+            settings.INTRO_DEADLINE_SECONDS,
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": RESTAURANT_INTRO_PROMPT},
                 {"role": "user", "content": user_msg},
             ],
-            timeout=10.0,
         )
+        record_usage("intro", response.usage)
         return response.choices[0].message.content.strip()
     except Exception as e:
         logger.warning("Restaurant intro generation failed: %s", e)
@@ -137,42 +191,222 @@ async def generate_recommendations(
 ) -> Dict:
     """
     Generate dish recommendations using GPT-4o.
-    Falls back to hardcoded data if OPENAI_API_KEY is not set.
+    Uses the local engine in RECOMMENDATION_MODE=local, without an API key,
+    or (with RECOMMENDATION_LOCAL_FALLBACK) when the LLM call fails.
+    Results are cached per menu content, vibe, preferences and language,
+    and concurrent identical requests share one generation (single-flight).
+    Cached and shared results are the model's output only; every caller
+    resolves them against its own menu_items.
 
     Returns dict with "brief_summary" and "recommendations" keys.
     """
-    if not settings.OPENAI_API_KEY:
-        logger.warning("OPENAI_API_KEY not set — returning fallback recommendations")
-        return _get_fallback(vibe if vibe != "voice" else "comfort")
+    if settings.RECOMMENDATION_MODE == "local" or not settings.OPENAI_API_KEY:
+        if not settings.OPENAI_API_KEY:
+            logger.warning("OPENAI_API_KEY not set — returning local recommendations")
+        return _local_or_fallback(menu_items, vibe, preference, menu_language, voice_prompt)
 
+    cache_key = recommendation_cache_key(
+        menu_fingerprint(menu_items, restaurant_info), vibe, preference, menu_language, voice_prompt
+    )
+    cached = get_cached_recommendations(cache_key)
+    if cached is not None:
+        logger.info("Recommendation cache hit (vibe=%s, preference=%s)", vibe, preference)
+        return _validate_recommendations(cached, menu_items, preference, menu_language)
+
+    flights = get_recommendation_flights()
+    if flights.get(cache_key) is not None:
+        logger.info("Joining in-flight recommendation (vibe=%s, preference=%s)", vibe, preference)
     try:
-        return await _call_openai(menu_items, vibe, preference, restaurant_info, menu_language, voice_prompt)
+        result = await flights.do(cache_key, lambda: generate_and_cache(
+            cache_key, menu_items, vibe, preference, restaurant_info, menu_language, voice_prompt
+        ))
+        # The result is shared with every caller of this flight (and may come
+        # from another scan of the same menu): resolve it against our own items
+        return _validate_recommendations(copy.deepcopy(result), menu_items, preference, menu_language)
+    except LLMFailedError:
+        if not (settings.RECOMMENDATION_LOCAL_FALLBACK and menu_items):
+            raise
+        logger.warning("LLM recommendation failed — answering from the local engine")
+        return local_recommender.recommend(menu_items, vibe, preference, menu_language, voice_prompt)
+
+
+# (kind, payload): ("summary", str), ("dish", dict), then ("result", dict) last
+RecommendationEvent = Tuple[str, object]
+
+
+async def _replay(result: Dict) -> AsyncIterator[RecommendationEvent]:
+    """Emit a finished result as stream events."""
+    if result.get("brief_summary"):
+        yield "summary", result["brief_summary"]
+    for rec in result.get("recommendations", []):
+        yield "dish", rec
+    yield "result", result
+
+
+async def stream_recommendations(
+    menu_items: List[Dict],
+    vibe: str,
+    preference: str,
+    restaurant_info: Optional[Dict] = None,
+    menu_language: Optional[str] = None,
+    voice_prompt: Optional[str] = None,
+) -> AsyncIterator[RecommendationEvent]:
+    """
+    Streaming variant of generate_recommendations.
+
+    Yields the brief_summary and each recommendation as soon as the model
+    has finished writing it and it resolved to a dish on the menu. The last
+    event is the complete result, containing exactly the streamed dishes.
+    Cache hits (resolved against menu_items) and local answers are emitted
+    all at once.
+    """
+    if settings.RECOMMENDATION_MODE == "local" or not settings.OPENAI_API_KEY:
+        async for event in _replay(_local_or_fallback(menu_items, vibe, preference, menu_language, voice_prompt)):
+            yield event
+        return
+
+    cache_key = recommendation_cache_key(
+        menu_fingerprint(menu_items, restaurant_info), vibe, preference, menu_language, voice_prompt
+    )
+    cached = get_cached_recommendations(cache_key)
+    if cached is not None:
+        logger.info("Recommendation cache hit (vibe=%s, preference=%s)", vibe, preference)
+        async for event in _replay(_validate_recommendations(cached, menu_items, preference, menu_language)):
+            yield event
+        return
+
+    index = get_name_index(menu_items)
+    candidates = select_candidates(menu_items, vibe, preference)
+    parser = JSONStreamParser(array_keys=("recommendations",))
+    summary: Optional[str] = None
+    generated: List[Dict] = []
+    streamed: List[Dict] = []
+    unmatched: List[Dict] = []
+    try:
+        async for delta in _stream_openai(candidates, vibe, preference, restaurant_info, menu_language, voice_prompt):
+            for kind, key, value in parser.feed(delta):
+                if kind == "field" and key == "brief_summary" and summary is None:
+                    summary = value
+                    yield "summary", value
+                elif kind == "item" and key == "recommendations" and isinstance(value, dict):
+                    generated.append(dict(value))
+                    rec = _resolve_dish(value, index, preference, menu_language)
+                    if rec is None:
+                        logger.warning("LLM hallucinated dish: %s (not on menu)", value.get("dish_name", ""))
+                        unmatched.append(value)
+                        continue
+                    streamed.append(rec)
+                    yield "dish", rec
     except Exception as e:
-        logger.error("LLM recommendation error: %s", e)
-        raise LLMFailedError(message=f"Recommendation generation failed: {str(e)}")
+        logger.error("LLM recommendation stream error: %s", e)
+        if streamed or summary is not None or not (settings.RECOMMENDATION_LOCAL_FALLBACK and menu_items):
+            raise LLMFailedError(message=f"Recommendation generation failed: {str(e)}")
+        logger.warning("LLM recommendation failed — answering from the local engine")
+        async for event in _replay(local_recommender.recommend(menu_items, vibe, preference, menu_language, voice_prompt)):
+            yield event
+        return
+
+    if not streamed and unmatched:
+        # Same rule as the non-streaming path: rather all than nothing
+        logger.warning("No valid recommendations after filtering — returning all from LLM")
+        for rec in _check_unmatched(unmatched, preference, menu_language):
+            streamed.append(rec)
+            yield "dish", rec
 
+    summary = summary or "Here are our recommendations for you."
+    store_recommendations(cache_key, _model_output({"brief_summary": summary, "recommendations": generated}))
+    yield "result", {"brief_summary": summary, "recommendations": streamed}
 
-async def _call_openai(
-    menu_items: list[dict],
+
+def _local_or_fallback(
+    menu_items: List[Dict],
     vibe: str,
     preference: str,
-    restaurant_info: Optional[dict],
+    menu_language: Optional[str],
+    voice_prompt: Optional[str],
+) -> Dict:
+    """Local engine for menus with items; the hardcoded demo set otherwise."""
+    if menu_items:
+        return local_recommender.recommend(menu_items, vibe, preference, menu_language, voice_prompt)
+    return _get_fallback(vibe if vibe != "voice" else "comfort")
+
+
+async def generate_and_cache(
+    cache_key: str,
+    menu_items: List[Dict],
+    vibe: str,
+    preference: str,
+    restaurant_info: Optional[Dict] = None,
     menu_language: Optional[str] = None,
     voice_prompt: Optional[str] = None,
-) -> dict:
-    """Call OpenAI GPT-4o for recommendations."""
-    from app.services.openai_client import get_openai_client
+    schedule_as: Optional[str] = None,
+) -> Dict:
+    """
+    Call the LLM unconditionally and store its output under cache_key.
 
-    client = get_openai_client()
+    Returns the model's output as cached; callers resolve it against their
+    own menu with _validate_recommendations.
+    """
+    candidates = select_candidates(menu_items, vibe, preference)
+    try:
+        result = await _call_openai(
+            candidates, vibe, preference, restaurant_info, menu_language, voice_prompt, schedule_as=schedule_as
+        )
+    except Exception as e:
+        logger.error("LLM recommendation error: %s", e)
+        raise LLMFailedError(message=f"Recommendation generation failed: {str(e)}")
+
+    result = _model_output(result)
+    store_recommendations(cache_key, result)
+    return result
+
+
+# Taken from one scan's menu when a recommendation is resolved; never cached
+# or shared, because every scan of the same menu has its own item ids.
+# Warnings are kept: only model-written ones reach the cache.
+MENU_ITEM_FIELDS = ("dish_id", "price_value")
+
+
+def _model_output(result: Dict) -> Dict:
+    """A result without the fields attached from a particular menu."""
+    return dict(result, recommendations=[
+        {k: v for k, v in rec.items() if k not in MENU_ITEM_FIELDS}
+        for rec in result.get("recommendations", [])
+        if isinstance(rec, dict)
+    ])
 
-    restaurant_context = ""
+
+def _menu_context(
+    menu_items: List[Dict],
+    restaurant_info: Optional[Dict],
+    menu_language: Optional[str],
+) -> str:
+    """The menu-dependent part of the prompt; identical for every vibe on the same menu."""
+    lines = []
     if restaurant_info:
         name = restaurant_info.get("name", "Unknown")
         cuisine = restaurant_info.get("cuisine_type", "Unknown")
-        restaurant_context = f"\nRestaurant: {name} ({cuisine} cuisine)"
+        lines.append(f"Restaurant: {name} ({cuisine} cuisine)")
+    lines.append(f"Menu language: {menu_language or 'en'}")
+    lines.append("")
+    lines.append("Menu items:")
+    lines.append(encode_menu(menu_items, settings.RECOMMENDATION_PROMPT_FORMAT))
+    return "\n".join(lines)
 
-    lang = menu_language or "en"
-    menu_text = json.dumps(menu_items, indent=2, ensure_ascii=False)
+
+def _build_recommendation_messages(
+    menu_items: List[Dict],
+    vibe: str,
+    preference: str,
+    restaurant_info: Optional[Dict],
+    menu_language: Optional[str] = None,
+    voice_prompt: Optional[str] = None,
+) -> List[Dict]:
+    """Build the chat messages for a recommendation call and log the prompt size."""
+    # Layout for provider prefix caching: the system prompt and everything
+    # that only depends on the menu come first and are byte-identical for
+    # every vibe and preference; the per-request part goes last.
+    menu_context = _menu_context(menu_items, restaurant_info, menu_language)
 
     # Voice prompt overrides fixed vibe description
     if voice_prompt and vibe == "voice":
@@ -183,72 +417,158 @@ async def _call_openai(
     # Format preferences — may be comma-separated (e.g. "vegetarian,nut_free")
     pref_display = preference.replace(",", ", ") if preference else "no_restriction"
 
-    user_message = f"""{vibe_line}
-User's dietary restrictions: {pref_display}
-Menu language: {lang}
-{restaurant_context}
+    user_message = f"""{menu_context}
+
+{vibe_line}
+User's dietary restrictions: {pref_display}"""
+    if template_language(menu_language) is None:
+        # No local templates for this language: the model writes the warnings
+        user_message += "\nWrite warnings: yes"
 
-Menu items:
-{menu_text}"""
+    logger.info(
+        "Calling GPT-4o for recommendations (vibe=%s, preference=%s, %d items, ~%d prompt tokens)",
+        vibe, preference, len(menu_items),
+        count_tokens(RECOMMENDATION_SYSTEM_PROMPT) + count_tokens(user_message),
+    )
+    return [
+        {"role": "system", "content": RECOMMENDATION_SYSTEM_PROMPT},
+        {"role": "user", "content": user_message},
+    ]
+
+
+async def _call_openai(
+    menu_items: list[dict],
+    vibe: str,
+    preference: str,
+    restaurant_info: Optional[dict],
+    menu_language: Optional[str] = None,
+    voice_prompt: Optional[str] = None,
+    schedule_as: Optional[str] = None,
+) -> dict:
+    """Call OpenAI GPT-4o for recommendations (hedged if enabled)."""
+    from app.services.openai_client import create_chat_completion, record_usage
 
-    logger.info("Calling GPT-4o for recommendations (vibe=%s, preference=%s)", vibe, preference)
-    response = await client.chat.completions.create(
+    response = await create_chat_completion(
+        "recommendation",
+        settings.RECOMMENDATION_DEADLINE_SECONDS,
+        schedule_as=schedule_as,
         model="gpt-4o",
-        messages=[
-            {"role": "system", "content": RECOMMENDATION_SYSTEM_PROMPT},
-            {"role": "user", "content": user_message},
-        ],
+        messages=_build_recommendation_messages(
+            menu_items, vibe, preference, restaurant_info, menu_language, voice_prompt
+        ),
         response_format={"type": "json_object"},
-        timeout=20.0,
     )
 
     content = response.choices[0].message.content
-    logger.info(
-        "Recommendations complete — tokens: %s input, %s output",
-        response.usage.prompt_tokens if response.usage else "?",
-        response.usage.completion_tokens if response.usage else "?",
+    record_usage("recommendation", response.usage)
+
+    return json.loads(content)
+
+
+async def _stream_openai(
+    menu_items: List[Dict],
+    vibe: str,
+    preference: str,
+    restaurant_info: Optional[Dict],
+    menu_language: Optional[str] = None,
+    voice_prompt: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """Call OpenAI GPT-4o for recommendations with streaming and yield content deltas."""
+    from app.services.openai_client import (
+        get_openai_client, record_usage, settle_reservation, upstream_call,
     )
+    from app.services.openai_metrics import observe_call
+
+    client = get_openai_client()
+    messages = _build_recommendation_messages(
+        menu_items, vibe, preference, restaurant_info, menu_language, voice_prompt
+    )
+    async with upstream_call("recommendation", messages) as reservation:
+        with observe_call("recommendation", "gpt-4o") as call:
+            stream = await client.chat.completions.create(
+                model="gpt-4o",
+                messages=messages,
+                response_format={"type": "json_object"},
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=settings.RECOMMENDATION_DEADLINE_SECONDS,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if chunk.usage:
+                    record_usage("recommendation", chunk.usage)
+                    call.record_usage(chunk.usage)
+                    settle_reservation(reservation, chunk.usage)
+
+
+def _resolve_dish(
+    rec: Dict,
+    index: DishNameIndex,
+    preference: Optional[str],
+    menu_language: Optional[str],
+) -> Optional[Dict]:
+    """
+    Resolve a recommendation to its menu item and attach the item's exact
+    name, dish_id, price_value and locally generated warnings (the model's
+    are kept for languages without templates). Returns None if the dish
+    is not on the menu.
+    """
+    position = index.match(rec.get("dish_name", ""))
+    if position is None:
+        return None
+    attach_menu_item(rec, index.items[position])
+    if template_language(menu_language) is not None:
+        rec["warnings"] = get_conflict_table(index.items).warnings(position, preference, menu_language)
+    return rec
 
-    data = json.loads(content)
 
-    # Validate that recommended dishes actually exist on the menu.
-    # Use fuzzy matching: a dish is valid if the recommended name is a substring
-    # of a menu name or vice versa (handles translated names, parenthetical
-    # originals, and minor LLM rephrasing).
-    menu_names = [item.get("name", "") for item in menu_items]
+def _check_unmatched(recs: List[Dict], preference: Optional[str], menu_language: Optional[str]) -> List[Dict]:
+    """
+    Warnings for recommendations that did not resolve to a menu item, from
+    the conflict engine run over the model's own name and description.
+    """
+    if template_language(menu_language) is None:
+        return recs
+    table = ConflictTable([
+        {"name": rec.get("dish_name"), "description": f"{rec.get('reasoning') or ''} {rec.get('story') or ''}"}
+        for rec in recs
+    ])
+    for position, rec in enumerate(recs):
+        rec["warnings"] = table.warnings(position, preference, menu_language)
+    return recs
+
+
+def _validate_recommendations(
+    data: dict,
+    menu_items: List[Dict],
+    preference: Optional[str] = None,
+    menu_language: Optional[str] = None,
+) -> dict:
+    """
+    Keep only recommendations that resolve to a dish on the menu.
+
+    Names are resolved through the menu's DishNameIndex, so matched
+    recommendations carry the exact menu name, dish_id and price_value,
+    plus warnings from the dietary conflict engine. If none resolves, all
+    are returned, with warnings from the engine run over their own text.
+    """
+    index = get_name_index(menu_items)
+    recs = [dict(rec) for rec in data.get("recommendations", [])]
     valid_recs = []
-    for rec in data.get("recommendations", []):
-        rec_name = rec.get("dish_name", "")
-        if _name_matches_menu(rec_name, menu_names):
+    for rec in recs:
+        if _resolve_dish(rec, index, preference, menu_language) is not None:
             valid_recs.append(rec)
         else:
-            logger.warning("LLM hallucinated dish: %s (not on menu)", rec_name)
+            logger.warning("LLM hallucinated dish: %s (not on menu)", rec.get("dish_name", ""))
 
     # If validation filtered everything out, the LLM likely used different
     # names than OCR. Return what we have rather than nothing.
     if not valid_recs:
         logger.warning("No valid recommendations after filtering — returning all from LLM")
-        valid_recs = data.get("recommendations", [])
-
-    data["recommendations"] = valid_recs
-    return data
+        valid_recs = _check_unmatched(recs, preference, menu_language)
 
-
-def _name_matches_menu(rec_name: str, menu_names: List[str]) -> bool:
-    """Check if a recommended dish name matches any menu item name.
-
-    Uses case-insensitive substring matching in both directions so that
-    "Kung Pao Chicken" matches "Kung Pao Chicken (宫保鸡丁)" and
-    "宫保鸡丁" matches "宫保鸡丁 Kung Pao Chicken".
-    """
-    rec_lower = rec_name.lower().strip()
-    for menu_name in menu_names:
-        menu_lower = menu_name.lower().strip()
-        if rec_lower == menu_lower:
-            return True
-        if rec_lower in menu_lower or menu_lower in rec_lower:
-            return True
-    return False
+    return dict(data, recommendations=valid_recs)
 
 
 # --- Fallback recommendations for dev mode ---
@@ -314,5 +634,5 @@ FALLBACK_RECOMMENDATIONS = {
 
 
 def _get_fallback(vibe: str) -> dict:
-    """Return fallback recommendations for dev mode."""
+    """Return fallback recommendations for dev mode when there is no menu to rank."""
     return FALLBACK_RECOMMENDATIONS.get(vibe, FALLBACK_RECOMMENDATIONS["comfort"])
@@ -0,0 +1,230 @@
+"""
+Local, deterministic recommendation engine.
+
+Ranks the scanned menu's own dishes with the candidate ranker's vibe and
+preference scores and writes reasoning, stories and warnings from
+templates in the menu language (English and Chinese; other languages use
+English). It answers in a few milliseconds and serves three roles:
+RECOMMENDATION_MODE=local (a low-cost tier), dev mode without an API key,
+and a degraded mode when the LLM call fails.
+"""
+import logging
+from typing import Dict, List, Optional
+
+from app.models.enums import VibeType
+from app.services import candidate_ranker
+from app.services.dietary_conflicts import get_conflict_table
+
+logger = logging.getLogger(__name__)
+
+# How many dishes to return per vibe (mirrors the LLM prompt's guidance)
+VIBE_DISH_COUNT = {
+    VibeType.QUICK.value: 2,
+    VibeType.LIGHT.value: 2,
+    VibeType.SHARING.value: 5,
+}
+DEFAULT_DISH_COUNT = 3
+
+# Voice prompts are mapped to the closest fixed vibe by keyword
+VOICE_HINTS = {
+    VibeType.ADVENTURE.value: ("spicy", "adventure", "new", "different", "exotic", "辣", "新", "特别"),
+    VibeType.LIGHT.value: ("light", "fresh", "salad", "清淡", "轻", "随便"),
+    VibeType.QUICK.value: ("quick", "fast", "hurry", "snack", "快", "赶时间"),
+    VibeType.SHARING.value: ("share", "sharing", "group", "friends", "family", "people", "分享", "人多", "朋友", "一起"),
+    VibeType.BUDGET.value: ("cheap", "budget", "value", "affordable", "便宜", "实惠", "划算"),
+    VibeType.HEALTHY.value: ("healthy", "diet", "protein", "健康", "减肥"),
+    VibeType.INDULGENT.value: ("treat", "indulge", "dessert", "sweet", "rich", "甜", "犒劳", "放纵"),
+    VibeType.COMFORT.value: ("comfort", "warm", "cozy", "tired", "暖", "舒服", "累"),
+}
+
+TEMPLATES = {
+    "en": {
+        "summary": {
+            "comfort": "Warm, familiar picks from this menu to settle into.",
+            "adventure": "The boldest, most unusual dishes on this menu — let's explore.",
+            "light": "Light picks from this menu that won't weigh you down.",
+            "quick": "Fast, easy dishes from this menu for when you're short on time.",
+            "sharing": "Dishes from this menu made for passing around the table.",
+            "budget": "The best-value dishes on this menu.",
+            "healthy": "Wholesome, balanced picks from this menu.",
+            "indulgent": "Go on, treat yourself — the richest dishes on this menu.",
+        },
+        "feature_reasons": {
+            "comfort": "Warm and familiar — exactly the kind of dish that hits the spot.",
+            "popular": "A favourite here, so it's a safe and satisfying bet.",
+            "rich": "Rich and decadent, made for treating yourself.",
+            "fried": "Crispy, golden and deeply satisfying.",
+            "unusual": "Something different from the usual — worth the adventure.",
+            "spice": "Brings real heat for a bold, exciting bite.",
+            "seafood": "A taste of the sea to shake things up.",
+            "light": "Light and fresh, so it won't weigh you down.",
+            "healthy": "A wholesome, balanced choice.",
+            "quick": "Easy to eat and quick to arrive.",
+            "cheap": "One of the best-value dishes on the menu.",
+            "shareable": "Made for passing around the table.",
+            "sweet": "A sweet treat worth saving room for.",
+            "price_rank": "A generous, premium pick from the menu.",
+            "vegetarian": "A satisfying meat-free option.",
+        },
+        "vibe_reason": "A good match for your {vibe} mood.",
+        "story": "A {category} pick from this menu.",
+        "story_plain": "One of the dishes on this menu.",
+        "ask_staff": "Ask staff",
+    },
+    "zh": {
+        "summary": {
+            "comfort": "从这份菜单里挑了几道温暖熟悉的菜，慢慢享用吧。",
+            "adventure": "菜单上最大胆、最特别的几道菜，一起去探索吧！",
+            "light": "几道清爽不油腻的菜，吃得轻松无负担。",
+            "quick": "上菜快、吃起来方便的几道菜，适合赶时间的你。",
+            "sharing": "适合大家一起分享的几道菜。",
+            "budget": "这份菜单上性价比最高的几道菜。",
+            "healthy": "营养均衡、健康的几道菜。",
+            "indulgent": "犒劳一下自己吧——菜单上最浓郁过瘾的几道菜。",
+        },
+        "feature_reasons": {
+            "comfort": "温暖熟悉的味道，正是此刻想要的。",
+            "popular": "店里的人气菜，稳妥又满足。",
+            "rich": "浓郁香醇，适合好好犒劳自己。",
+            "fried": "外酥里嫩，满足感十足。",
+            "unusual": "和平常不太一样，值得一试。",
+            "spice": "够辣够过瘾，味道很有冲击力。",
+            "seafood": "来点海鲜换换口味。",
+            "light": "清爽不腻，吃完很轻松。",
+            "healthy": "营养均衡，健康之选。",
+            "quick": "上菜快，吃起来也方便。",
+            "cheap": "菜单上性价比最高的菜之一。",
+            "shareable": "分量足，适合大家一起分享。",
+            "sweet": "甜蜜收尾，值得留点肚子。",
+            "price_rank": "菜单上比较精致的一道菜。",
+            "vegetarian": "不含肉也很满足的选择。",
+        },
+        "vibe_reason": "很适合你现在的{vibe}心情。",
+        "story": "菜单上的{category}之选。",
+        "story_plain": "这份菜单上的一道菜。",
+        "ask_staff": "请询问店员",
+        "vibes": {
+            "comfort": "治愈", "adventure": "冒险", "light": "清淡", "quick": "快速",
+            "sharing": "分享", "budget": "实惠", "healthy": "健康", "indulgent": "放纵",
+        },
+    },
+}
+
+# First matching feature picks the emoji
+EMOJI_FEATURES = [
+    ("drink", "\U0001f964"), ("sweet", "\U0001f370"), ("seafood", "\U0001f41f"),
+    ("spice", "\U0001f336\ufe0f"), ("fried", "\U0001f357"), ("light", "\U0001f957"),
+    ("healthy", "\U0001f957"), ("comfort", "\U0001f372"), ("meat", "\U0001f356"),
+]
+DEFAULT_EMOJI = "\U0001f37d\ufe0f"
+
+
+def _language(menu_language: Optional[str]) -> str:
+    lang = (menu_language or "en").lower()
+    return "zh" if lang.startswith("zh") else "en"
+
+
+def vibe_from_voice(voice_prompt: Optional[str]) -> str:
+    """Closest fixed vibe for a free-text request (comfort if nothing matches)."""
+    text = (voice_prompt or "").lower()
+    best, best_hits = VibeType.COMFORT.value, 0
+    for vibe, hints in VOICE_HINTS.items():
+        hits = sum(1 for hint in hints if hint in text)
+        if hits > best_hits:
+            best, best_hits = vibe, hits
+    return best
+
+
+def _format_price(price, ask_staff: str) -> str:
+    if isinstance(price, bool) or not isinstance(price, (int, float)):
+        return str(price) if price else ask_staff
+    return str(int(price)) if float(price).is_integer() else f"{price:.2f}"
+
+
+def _rank(menu_items: List[Dict], vibe: str, preferences: List[str]):
+    """Return (order, features, conflicts) with items sorted best first."""
+    if not candidate_ranker.NUMPY_AVAILABLE:
+        return list(range(len(menu_items))), None, None
+    np = candidate_ranker.np
+    features = candidate_ranker.menu_features(menu_items)
+    vibe_scores, conflicts = candidate_ranker.score_menu(menu_items)
+    scores = vibe_scores[:, candidate_ranker.VIBES.index(vibe)].copy()
+    pref_columns = [candidate_ranker.PREFERENCES.index(p) for p in preferences]
+    if pref_columns:
+        scores -= candidate_ranker.CONFLICT_PENALTY * conflicts[:, pref_columns].sum(axis=1)
+    order = np.argsort(-scores, kind="stable").tolist()
+    return order, features, conflicts
+
+
+def _top_feature(features_row, vibe: str) -> Optional[str]:
+    """Feature contributing most to the item's score for this vibe."""
+    best, best_value = None, 0.0
+    for feature, weight in candidate_ranker.VIBE_WEIGHTS[vibe].items():
+        contribution = weight * float(features_row[candidate_ranker.FEATURE_INDEX[feature]])
+        if contribution > best_value:
+            best, best_value = feature, contribution
+    return best
+
+
+def recommend(
+    menu_items: List[Dict],
+    vibe: str,
+    preference: Optional[str],
+    menu_language: Optional[str] = None,
+    voice_prompt: Optional[str] = None,
+) -> Dict:
+    """
+    Recommend dishes from menu_items without calling an LLM.
+
+    Returns the same shape as llm_service.generate_recommendations.
+    """
+    if vibe == "voice" or vibe not in candidate_ranker.VIBE_WEIGHTS:
+        vibe = vibe_from_voice(voice_prompt)
+    lang = _language(menu_language)
+    t = TEMPLATES[lang]
+    preferences = [
+        p.strip() for p in (preference or "").split(",")
+        if p.strip() in candidate_ranker.PREFERENCE_CONFLICTS and p.strip() != "no_restriction"
+    ]
+
+    order, features, _ = _rank(menu_items, vibe, preferences)
+    conflict_table = get_conflict_table(menu_items)
+    count = min(VIBE_DISH_COUNT.get(vibe, DEFAULT_DISH_COUNT), len(menu_items))
+
+    recommendations = []
+    for index in order[:count]:
+        item = menu_items[index]
+        top = _top_feature(features[index], vibe) if features is not None else None
+        vibe_label = t.get("vibes", {}).get(vibe, vibe)
+        reasoning = t["feature_reasons"].get(top) or t["vibe_reason"].format(vibe=vibe_label)
+
+        category = item.get("category")
+        story = item.get("description") or (
+            t["story"].format(category=category) if category else t["story_plain"]
+        )
+
+        # In the same language as the rest of the local answer
+        warnings = conflict_table.warnings(index, preference, lang)
+
+        emoji = DEFAULT_EMOJI
+        if features is not None:
+            for feature, symbol in EMOJI_FEATURES:
+                if features[index, candidate_ranker.FEATURE_INDEX[feature]] > 0:
+                    emoji = symbol
+                    break
+
+        recommendations.append({
+            "dish_name": item.get("name", ""),
+            "reasoning": reasoning,
+            "story": story,
+            "warnings": warnings,
+            "price": _format_price(item.get("price"), t["ask_staff"]),
+            "emoji": emoji,
+            "dish_id": item.get("id"),
+            "price_value": item.get("price") if isinstance(item.get("price"), (int, float)) else None,
+        })
+
+    return {
+        "brief_summary": t["summary"][vibe],
+        "recommendations": recommendations,
+    }
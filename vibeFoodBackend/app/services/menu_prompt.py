@@ -0,0 +1,83 @@
+"""
+Menu encodings for the recommendation prompt.
+
+The original prompt embedded `json.dumps(menu_items, indent=2)`: UUIDs,
+a currency on every row, nulls, empty lists and indentation all cost
+tokens without helping the model. The table encoding writes one line per
+dish under a single header, leaves out ids and default values, states the
+currency once when the whole menu shares it, and groups dishes by category
+so the category name is not repeated per row.
+"""
+import json
+from typing import Dict, List, Optional
+
+TABLE_COLUMNS = "name | price | description | tags | allergens | spice 0-5 | diet"
+
+
+def _cell(value: Optional[str]) -> str:
+    """Flatten a text cell so it cannot break the row/column layout."""
+    if not value:
+        return ""
+    return " ".join(str(value).replace("|", "/").split())
+
+
+def _price(value, currency: Optional[str], shared_currency: Optional[str]) -> str:
+    if value is None or value == "":
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if currency and currency != shared_currency:
+        return f"{value} {currency}"
+    return str(value)
+
+
+def _diet(item: Dict) -> str:
+    if item.get("is_vegan"):
+        return "vegan"
+    if item.get("is_vegetarian"):
+        return "veg"
+    return ""
+
+
+def encode_menu_table(menu_items: List[Dict]) -> str:
+    """Compact pipe-separated table, grouped by category, without ids or defaults."""
+    currencies = {item.get("currency") or "USD" for item in menu_items}
+    shared_currency = currencies.pop() if len(currencies) == 1 else None
+
+    lines = [f"Columns: {TABLE_COLUMNS}"]
+    if shared_currency:
+        lines.append(f"Currency: {shared_currency}")
+
+    groups: Dict[str, List[Dict]] = {}
+    for item in menu_items:
+        groups.setdefault(_cell(item.get("category")) or "Other", []).append(item)
+
+    for category, items in groups.items():
+        lines.append(f"[{category}]")
+        for item in items:
+            spice = item.get("spice_level")
+            cells = [
+                _cell(item.get("name")),
+                _price(item.get("price"), item.get("currency"), shared_currency),
+                _cell(item.get("description")),
+                ",".join(_cell(t) for t in item.get("tags") or []),
+                ",".join(_cell(a) for a in item.get("allergens") or []),
+                str(spice) if spice else "",
+                _diet(item),
+            ]
+            while cells and not cells[-1]:
+                cells.pop()
+            lines.append(" | ".join(cells))
+    return "\n".join(lines)
+
+
+def encode_menu_json(menu_items: List[Dict]) -> str:
+    """The original encoding: the stored item dicts as indented JSON."""
+    return json.dumps(menu_items, indent=2, ensure_ascii=False)
+
+
+def encode_menu(menu_items: List[Dict], fmt: str = "table") -> str:
+    """Encode menu items for the prompt in the configured format ("table" or "json")."""
+    if fmt == "json":
+        return encode_menu_json(menu_items)
+    return encode_menu_table(menu_items)
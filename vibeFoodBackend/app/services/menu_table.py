@@ -0,0 +1,253 @@
+"""
+Columnar storage for extracted menu items.
+
+A scanned menu used to exist as a list of MenuItem dataclasses plus a second
+list of per-item dicts built for the profile JSON. MenuTable keeps one array
+per field instead: prices, spice levels, flags and confidences live in
+typed arrays, while currencies, categories, tags and allergens are interned
+into small integer vocabularies shared by every row. Prices the model gave
+as text ("Market price", "时价") are kept verbatim in a sparse side column.
+JSON is produced straight from the columns, and MenuItem objects are only
+built on demand.
+"""
+import math
+import re
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+_NO_SPICE = -1
+_VEGETARIAN = 1
+_VEGAN = 2
+
+# Spice levels written as words or chili emoji instead of 0-5
+_SPICE_WORDS = {
+    "none": 0, "no": 0, "mild": 1, "medium": 2, "hot": 3, "spicy": 3,
+    "very hot": 4, "very spicy": 4, "extra hot": 5, "extra spicy": 5,
+    "不辣": 0, "微辣": 1, "中辣": 2, "辣": 3, "特辣": 4,
+}
+_CHILI = "\U0001f336"
+_WORD_SEPARATORS = re.compile(r"[,;、，]")
+
+
+def _as_float(value) -> float:
+    """Model output is loosely typed; unreadable numbers become NaN (= missing)."""
+    try:
+        return math.nan if value is None else float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _as_text(value) -> Optional[str]:
+    """A single-string field; numbers become text, lists and objects are dropped."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return str(value)
+    return None
+
+
+def _as_words(value) -> List[str]:
+    """Tags or allergens as a list of strings; a lone string is split on commas, not into characters."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = _WORD_SEPARATORS.split(value)
+    elif not isinstance(value, (list, tuple)):
+        value = [value]
+    words = (_as_text(v) for v in value)
+    return [w.strip() for w in words if w and w.strip()]
+
+
+def _as_spice(value) -> int:
+    """0-5 spice level; text like "3/5", "hot" or chili emoji is read too, anything else is unknown."""
+    if value is None or isinstance(value, bool):
+        return _NO_SPICE
+    try:
+        return max(0, min(int(float(value)), 127))
+    except (TypeError, ValueError, OverflowError):
+        pass
+    if not isinstance(value, str):
+        return _NO_SPICE
+    text = value.strip().lower()
+    digits = re.search(r"\d+", text)
+    if digits:
+        return min(int(digits.group()), 127)
+    if _CHILI in text:
+        return min(text.count(_CHILI), 5)
+    return _SPICE_WORDS.get(text, _NO_SPICE)
+
+
+@dataclass
+class MenuItem:
+    """Represents a single menu item extracted from OCR."""
+    id: str
+    name: str
+    description: Optional[str] = None
+    price: Optional[Union[float, str]] = None
+    currency: str = "USD"
+    category: Optional[str] = None
+    tags: List[str] = field(default_factory=list)
+    allergens: List[str] = field(default_factory=list)
+    spice_level: Optional[int] = None
+    is_vegetarian: bool = False
+    is_vegan: bool = False
+    confidence: float = 1.0
+
+
+class Vocabulary:
+    """Interns strings to dense integer ids (None is stored as -1)."""
+
+    __slots__ = ("words", "_ids")
+
+    def __init__(self):
+        self.words: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, word: Optional[str]) -> int:
+        if word is None:
+            return -1
+        word_id = self._ids.get(word)
+        if word_id is None:
+            word_id = len(self.words)
+            self._ids[word] = word_id
+            self.words.append(word)
+        return word_id
+
+    def intern_all(self, words: Optional[Sequence[str]]) -> Tuple[int, ...]:
+        return tuple(self.intern(w) for w in words or () if w is not None)
+
+    def lookup(self, word_id: int) -> Optional[str]:
+        return self.words[word_id] if word_id >= 0 else None
+
+    def lookup_all(self, word_ids: Sequence[int]) -> List[str]:
+        words = self.words
+        return [words[i] for i in word_ids]
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+
+class MenuTable:
+    """Menu items stored column by column."""
+
+    __slots__ = (
+        "ids", "names", "descriptions", "prices", "price_texts", "currencies", "categories",
+        "tags", "allergens", "spice_levels", "flags", "confidences",
+        "currency_vocab", "category_vocab", "tag_vocab", "allergen_vocab",
+    )
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.descriptions: List[Optional[str]] = []
+        self.prices = array("d")          # NaN = no numeric price
+        self.price_texts: Dict[int, str] = {}  # row -> non-numeric price as written
+        self.currencies = array("h")      # currency_vocab ids
+        self.categories = array("h")      # category_vocab ids, -1 = none
+        self.tags: List[Tuple[int, ...]] = []
+        self.allergens: List[Tuple[int, ...]] = []
+        self.spice_levels = array("b")    # -1 = unknown
+        self.flags = bytearray()          # _VEGETARIAN | _VEGAN
+        self.confidences = array("d")
+        self.currency_vocab = Vocabulary()
+        self.category_vocab = Vocabulary()
+        self.tag_vocab = Vocabulary()
+        self.allergen_vocab = Vocabulary()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[MenuItem]:
+        return (self.row(i) for i in range(len(self)))
+
+    def append(
+        self,
+        id: str,
+        name: str,
+        description: Optional[str] = None,
+        price: Optional[Union[float, str]] = None,
+        currency: str = "USD",
+        category: Optional[str] = None,
+        tags: Optional[Sequence[str]] = None,
+        allergens: Optional[Sequence[str]] = None,
+        spice_level: Optional[int] = None,
+        is_vegetarian: bool = False,
+        is_vegan: bool = False,
+        confidence: float = 1.0,
+    ) -> int:
+        """
+        Add a row and return its index. Values come from model output, so
+        they are coerced to the column types first instead of trusted.
+        """
+        self.ids.append(id)
+        self.names.append(_as_text(name) or "Unknown")
+        self.descriptions.append(_as_text(description))
+        numeric_price = _as_float(price)
+        if math.isnan(numeric_price) and isinstance(price, str) and price.strip():
+            self.price_texts[len(self.ids) - 1] = price.strip()
+        self.prices.append(numeric_price)
+        self.currencies.append(self.currency_vocab.intern(_as_text(currency) or "USD"))
+        self.categories.append(self.category_vocab.intern(_as_text(category)))
+        self.tags.append(self.tag_vocab.intern_all(_as_words(tags)))
+        self.allergens.append(self.allergen_vocab.intern_all(_as_words(allergens)))
+        self.spice_levels.append(_as_spice(spice_level))
+        self.flags.append((_VEGETARIAN if is_vegetarian else 0) | (_VEGAN if is_vegan else 0))
+        confidence = _as_float(confidence)
+        self.confidences.append(0.0 if math.isnan(confidence) else confidence)
+        return len(self.ids) - 1
+
+    def append_item(self, item: MenuItem) -> int:
+        return self.append(
+            item.id, item.name, item.description, item.price, item.currency,
+            item.category, item.tags, item.allergens, item.spice_level,
+            item.is_vegetarian, item.is_vegan, item.confidence,
+        )
+
+    def price(self, index: int) -> Optional[Union[float, str]]:
+        """Numeric price, else the price text as written, else None."""
+        value = self.prices[index]
+        return self.price_texts.get(index) if math.isnan(value) else value
+
+    def spice_level(self, index: int) -> Optional[int]:
+        value = self.spice_levels[index]
+        return None if value == _NO_SPICE else value
+
+    def row(self, index: int) -> MenuItem:
+        """Materialize one row as a MenuItem."""
+        flags = self.flags[index]
+        return MenuItem(
+            id=self.ids[index],
+            name=self.names[index],
+            description=self.descriptions[index],
+            price=self.price(index),
+            currency=self.currency_vocab.lookup(self.currencies[index]),
+            category=self.category_vocab.lookup(self.categories[index]),
+            tags=self.tag_vocab.lookup_all(self.tags[index]),
+            allergens=self.allergen_vocab.lookup_all(self.allergens[index]),
+            spice_level=self.spice_level(index),
+            is_vegetarian=bool(flags & _VEGETARIAN),
+            is_vegan=bool(flags & _VEGAN),
+            confidence=self.confidences[index],
+        )
+
+    def row_json(self, index: int) -> dict:
+        """One row in the stored/streamed JSON shape."""
+        flags = self.flags[index]
+        return {
+            "id": self.ids[index],
+            "name": self.names[index],
+            "description": self.descriptions[index],
+            "price": self.price(index),
+            "currency": self.currency_vocab.lookup(self.currencies[index]),
+            "category": self.category_vocab.lookup(self.categories[index]),
+            "tags": self.tag_vocab.lookup_all(self.tags[index]),
+            "allergens": self.allergen_vocab.lookup_all(self.allergens[index]),
+            "spice_level": self.spice_level(index),
+            "is_vegetarian": bool(flags & _VEGETARIAN),
+            "is_vegan": bool(flags & _VEGAN),
+        }
+
+    def to_json(self) -> List[dict]:
+        """All rows in the stored JSON shape, serialized straight from the columns."""
+        return [self.row_json(i) for i in range(len(self))]
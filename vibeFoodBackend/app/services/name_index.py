@@ -0,0 +1,141 @@
+"""
+Dish-name index for resolving LLM-returned names to menu items.
+
+The LLM is told to copy dish names exactly but often paraphrases, drops a
+parenthetical original ("Kung Pao Chicken" for "Kung Pao Chicken (宫保鸡丁)")
+or returns only one half of a bilingual name. The index normalizes every
+menu name once (NFKC, casefold, punctuation stripped), tokenizes it
+(Latin words, CJK character bigrams) and builds inverted token and trigram
+postings. A lookup only inspects items that share a token or trigram with
+the query and returns the index of the best match:
+
+1. exact normalized name,
+2. containment in either direction (the previous substring rule),
+3. trigram Jaccard similarity above MIN_SIMILARITY (typos, small rewrites).
+
+Indexes are cached per menu (keyed by its item ids), so the one built at
+scan time is reused by every recommendation for that menu.
+"""
+import hashlib
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, List, Optional, Set
+
+from app.services.ocr_service import normalize_dish_name
+from app.utils.cache import LRUCache
+
+MIN_SIMILARITY = 0.45
+
+_CJK_RUN = re.compile(r"[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\u3040-\u30ff]+")
+_index_cache = LRUCache(max_size=256)
+
+
+def name_tokens(normalized: str) -> Set[str]:
+    """Latin/number words plus CJK character bigrams (single chars for 1-char runs)."""
+    tokens: Set[str] = set()
+    for word in normalized.split():
+        for part in _CJK_RUN.split(word):
+            if part:
+                tokens.add(part)
+        for run in _CJK_RUN.findall(word):
+            if len(run) == 1:
+                tokens.add(run)
+            tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def trigrams(normalized: str) -> FrozenSet[str]:
+    padded = f"  {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class DishNameIndex:
+    """Token and trigram postings over the normalized names of one menu."""
+
+    def __init__(self, menu_items: List[Dict]):
+        self.items = menu_items
+        self._names: List[str] = []
+        self._trigrams: List[FrozenSet[str]] = []
+        self._exact: Dict[str, int] = {}
+        self._token_postings: Dict[str, List[int]] = {}
+        self._trigram_postings: Dict[str, List[int]] = {}
+
+        for position, item in enumerate(menu_items):
+            normalized = normalize_dish_name(item.get("name") or "")
+            grams = trigrams(normalized)
+            self._names.append(normalized)
+            self._trigrams.append(grams)
+            if normalized:
+                self._exact.setdefault(normalized, position)
+            for token in name_tokens(normalized):
+                self._token_postings.setdefault(token, []).append(position)
+            for gram in grams:
+                self._trigram_postings.setdefault(gram, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def match(self, name: str) -> Optional[int]:
+        """Position of the menu item that name refers to, or None."""
+        query = normalize_dish_name(name or "")
+        if not query:
+            return None
+        exact = self._exact.get(query)
+        if exact is not None:
+            return exact
+
+        candidates = Counter()
+        for token in name_tokens(query):
+            for position in self._token_postings.get(token, ()):
+                candidates[position] += 1
+        query_grams = trigrams(query)
+        if not candidates:
+            for gram in query_grams:
+                for position in self._trigram_postings.get(gram, ()):
+                    candidates[position] += 1
+
+        best, best_score = None, 0.0
+        for position in candidates:
+            menu_name = self._names[position]
+            if not menu_name:
+                continue
+            if query in menu_name or menu_name in query:
+                # Containment beats similarity; prefer the closest length
+                score = 1.0 + min(len(query), len(menu_name)) / max(len(query), len(menu_name))
+            else:
+                grams = self._trigrams[position]
+                score = len(query_grams & grams) / len(query_grams | grams)
+                if score < MIN_SIMILARITY:
+                    continue
+            if score > best_score:
+                best, best_score = position, score
+        return best
+
+    def match_item(self, name: str) -> Optional[Dict]:
+        """The canonical menu item that name refers to, or None."""
+        position = self.match(name)
+        return self.items[position] if position is not None else None
+
+
+def _menu_key(menu_items: List[Dict]) -> str:
+    ids = "|".join(str(item.get("id") or item.get("name")) for item in menu_items)
+    return hashlib.sha1(ids.encode("utf-8")).hexdigest()
+
+
+def get_name_index(menu_items: List[Dict]) -> DishNameIndex:
+    """Get or build the name index for a menu."""
+    key = _menu_key(menu_items)
+    index = _index_cache.get(key)
+    if index is None:
+        index = DishNameIndex(menu_items)
+        _index_cache.set(key, index)
+    return index
+
+
+def attach_menu_item(rec: Dict, item: Dict) -> Dict:
+    """Give a recommendation the menu's exact dish_name, its dish_id and numeric price_value."""
+    rec["dish_name"] = item.get("name") or rec.get("dish_name")
+    rec["dish_id"] = item.get("id")
+    price = item.get("price")
+    rec["price_value"] = price if isinstance(price, (int, float)) and not isinstance(price, bool) else None
+    return rec
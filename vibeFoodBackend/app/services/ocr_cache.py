@@ -0,0 +1,174 @@
+"""
+Content-addressed cache for OCR extraction results.
+
+Keys are the SHA-256 of the decoded image bytes, so client retries and
+diners at the same table uploading the same photo skip the Vision call.
+The cached value is the raw extraction dict; callers re-parse it into
+MenuData so every scan still gets fresh ids and its own session_id.
+
+A perceptual-hash (dHash) index sits next to the exact cache so photos of the same
+printed menu taken from slightly different angles also reuse the stored
+extraction. Text-heavy pages of different menus can hash close together,
+so a near match also needs the same aspect ratio and a small Hamming
+distance. With a disk tier, the signatures are stored in the same SQLite
+file (bounded to the index size, least recently added dropped first) and
+reloaded at startup, so persisted extractions stay matchable.
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import settings
+from app.services.image_service import ImageSignature, hamming_distance
+from app.utils.cache import SQLiteCache, TieredCache
+
+logger = logging.getLogger(__name__)
+
+_cache: Optional[TieredCache] = None
+_near_duplicate_index: Optional["NearDuplicateIndex"] = None
+
+
+class NearDuplicateIndex:
+    """
+    Bounded index from image signatures (dHash + size) to OCR cache keys.
+
+    Lookups scan every entry, which is a few microseconds for the default
+    index size; the oldest entries are dropped once max_size is reached.
+    An optional SQLite store keeps the signatures across restarts.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        max_distance: int,
+        max_aspect_difference: float = 0.02,
+        store: Optional[SQLiteCache] = None,
+    ):
+        self.max_size = max_size
+        self.max_distance = max_distance
+        self.max_aspect_difference = max_aspect_difference
+        self.store = store
+        self._entries: "OrderedDict[str, ImageSignature]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if store is not None:
+            for cache_key, value in reversed(store.items(limit=max_size)):
+                self._entries[cache_key] = ImageSignature(*value)
+
+    def add(self, signature: ImageSignature, cache_key: str) -> None:
+        with self._lock:
+            self._entries[cache_key] = signature
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        if self.store is not None:
+            self.store.set(cache_key, list(signature))
+
+    def _same_shape(self, a: ImageSignature, b: ImageSignature) -> bool:
+        if not a.aspect or not b.aspect:
+            return False
+        return abs(a.aspect / b.aspect - 1.0) <= self.max_aspect_difference
+
+    def find(self, signature: ImageSignature) -> Optional[str]:
+        """Return the cache key of the closest same-shaped image within max_distance."""
+        best_key = None
+        best_distance = self.max_distance + 1
+        with self._lock:
+            for cache_key, stored in self._entries.items():
+                if not self._same_shape(signature, stored):
+                    continue
+                distance = hamming_distance(signature.dhash, stored.dhash)
+                if distance < best_distance:
+                    best_key, best_distance = cache_key, distance
+                    if distance == 0:
+                        break
+        if best_key is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            logger.info("Near-duplicate menu photo found (distance=%d)", best_distance)
+        return best_key
+
+    def discard(self, cache_key: str) -> None:
+        """Remove the entry pointing at a cache key that no longer exists."""
+        with self._lock:
+            self._entries.pop(cache_key, None)
+        if self.store is not None:
+            self.store.delete(cache_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self.store.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def image_cache_key(image_bytes: bytes) -> str:
+    """Return the content address for an image."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def get_ocr_cache(create: bool = True) -> Optional[TieredCache]:
+    """
+    Get or create the shared OCR cache. Returns None if caching is disabled,
+    or with create=False if it does not exist yet.
+    """
+    global _cache
+    if not settings.OCR_CACHE_ENABLED:
+        return None
+    if _cache is None and create:
+        _cache = TieredCache(
+            name="ocr_results",
+            memory_size=settings.OCR_CACHE_MEMORY_SIZE,
+            ttl_seconds=settings.OCR_CACHE_TTL_SECONDS,
+            disk_path=settings.OCR_CACHE_DB_PATH,
+            disk_max_bytes=settings.OCR_CACHE_MAX_BYTES,
+        )
+        logger.info(
+            "OCR cache initialized (memory=%d entries, disk=%s)",
+            settings.OCR_CACHE_MEMORY_SIZE,
+            settings.OCR_CACHE_DB_PATH or "disabled",
+        )
+    return _cache
+
+
+def get_near_duplicate_index() -> Optional[NearDuplicateIndex]:
+    """Get or create the perceptual-hash index. Returns None if disabled."""
+    global _near_duplicate_index
+    if not (settings.OCR_CACHE_ENABLED and settings.OCR_NEAR_DUPLICATE_ENABLED):
+        return None
+    if _near_duplicate_index is None:
+        store = None
+        if settings.OCR_CACHE_DB_PATH:
+            store = SQLiteCache(
+                settings.OCR_CACHE_DB_PATH,
+                table="ocr_image_signatures",
+                ttl_seconds=settings.OCR_CACHE_TTL_SECONDS,
+                max_entries=settings.OCR_NEAR_DUPLICATE_INDEX_SIZE,
+            )
+        _near_duplicate_index = NearDuplicateIndex(
+            max_size=settings.OCR_NEAR_DUPLICATE_INDEX_SIZE,
+            max_distance=settings.OCR_NEAR_DUPLICATE_MAX_DISTANCE,
+            max_aspect_difference=settings.OCR_NEAR_DUPLICATE_MAX_ASPECT_DIFFERENCE,
+            store=store,
+        )
+    return _near_duplicate_index
+
+
+def reset_ocr_cache() -> None:
+    """Drop all cached extractions (used by tests and admin tooling)."""
+    global _cache, _near_duplicate_index
+    if _cache is not None:
+        _cache.clear()
+    if _near_duplicate_index is not None:
+        _near_duplicate_index.clear()
+    _cache = None
+    _near_duplicate_index = None
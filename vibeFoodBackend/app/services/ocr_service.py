@@ -2,37 +2,30 @@
 OCR service for menu extraction using OpenAI Vision API.
 Falls back to fake data when OPENAI_API_KEY is not configured.
 """
+import asyncio
+import base64
 import json
 import logging
+import re
+import unicodedata
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
+import time
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Union
 from uuid import uuid4
 
 from app.core.config import settings
 from app.models.enums import ExtractionMethod
+from app.services.image_service import ImageSignature
+from app.services.menu_table import MenuItem, MenuTable
 from app.utils.errors import OCRFailedError
+from app.utils.json_stream import JSONStreamParser
+from app.utils.singleflight import get_single_flight
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class MenuItem:
-    """Represents a single menu item extracted from OCR."""
-    id: str
-    name: str
-    description: Optional[str] = None
-    price: Optional[float] = None
-    currency: str = "USD"
-    category: Optional[str] = None
-    tags: List[str] = field(default_factory=list)
-    allergens: List[str] = field(default_factory=list)
-    spice_level: Optional[int] = None
-    is_vegetarian: bool = False
-    is_vegan: bool = False
-    confidence: float = 1.0
-
-
 @dataclass
 class Restaurant:
     """Restaurant information extracted from menu."""
@@ -43,10 +36,10 @@ class Restaurant:
 
 @dataclass
 class MenuData:
-    """Complete menu data from OCR extraction."""
+    """Complete menu data from OCR extraction; items are stored column-wise in `table`."""
     id: str
     session_id: str
-    items: List[MenuItem] = field(default_factory=list)
+    table: MenuTable = field(default_factory=MenuTable)
     restaurant: Optional[Restaurant] = None
     extraction_method: ExtractionMethod = ExtractionMethod.OCR
     confidence: float = 0.0
@@ -55,6 +48,11 @@ class MenuData:
     warnings: List[str] = field(default_factory=list)
     menu_language: Optional[str] = None
 
+    @property
+    def items(self) -> List[MenuItem]:
+        """Items materialized as MenuItem objects (built on each access)."""
+        return list(self.table)
+
 
 MENU_EXTRACTION_PROMPT = """You are a restaurant menu OCR extraction system. Extract ALL menu items visible in the image.
 
@@ -93,63 +91,115 @@ Rules:
 - Menu may be in any language. Keep dish names EXACTLY as they appear on the menu. Do NOT translate or modify dish names. If a dish name is in Chinese, keep it in Chinese. Add an English translation in the "description" field if needed.
 - Detect the dominant language of the menu and include it as a top-level field "menu_language" in your JSON response (e.g., "en", "zh", "ja", "ko", "es", "fr", etc.)."""
 
+DEFAULT_EXTRACTION_INSTRUCTION = "Extract all menu items from this restaurant menu image."
+
+TILE_EXTRACTION_INSTRUCTION = (
+    "This image is one overlapping section of a larger restaurant menu. "
+    "Extract all menu items fully visible in it. Skip items whose name is cut off at the edge."
+)
+
+
+def _vision_messages(image_base64: str, instruction: str) -> List[dict]:
+    """Build the chat messages for a menu extraction request."""
+    return [
+        {"role": "system", "content": MENU_EXTRACTION_PROMPT},
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": instruction},
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:image/jpeg;base64,{image_base64}",
+                        "detail": "auto",
+                    },
+                },
+            ],
+        },
+    ]
+
 
-async def _extract_with_openai(image_base64: str) -> dict:
+async def _extract_with_openai(image_base64: str, instruction: str = DEFAULT_EXTRACTION_INSTRUCTION) -> dict:
     """Call OpenAI Vision API to extract menu items from image."""
-    from app.services.openai_client import get_openai_client
-
-    client = get_openai_client()
+    from app.services.openai_client import create_chat_completion, record_usage
 
     logger.info("Calling OpenAI Vision API for menu extraction (image size: %d chars)", len(image_base64))
-    response = await client.chat.completions.create(
+    response = await create_chat_completion(
+        "ocr",
+        settings.OCR_DEADLINE_SECONDS,
         model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": MENU_EXTRACTION_PROMPT},
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": "Extract all menu items from this restaurant menu image."},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{image_base64}",
-                            "detail": "auto",
-                        },
-                    },
-                ],
-            },
-        ],
+        messages=_vision_messages(image_base64, instruction),
         response_format={"type": "json_object"},
-        timeout=60.0,
     )
 
     content = response.choices[0].message.content
-    logger.info(
-        "OCR complete — tokens: %s input, %s output",
-        response.usage.prompt_tokens if response.usage else "?",
-        response.usage.completion_tokens if response.usage else "?",
-    )
+    record_usage("ocr", response.usage)
     return json.loads(content)
 
 
-def _parse_extraction(data: dict, session_id: str) -> MenuData:
-    """Parse OpenAI JSON response into MenuData dataclass."""
-    items = []
-    for item_data in data.get("items", []):
-        items.append(MenuItem(
-            id=str(uuid4()),
-            name=item_data.get("name", "Unknown"),
-            description=item_data.get("description"),
-            price=item_data.get("price"),
-            currency=item_data.get("currency", "USD"),
-            category=item_data.get("category"),
-            tags=item_data.get("tags", []),
-            allergens=item_data.get("allergens", []),
-            spice_level=item_data.get("spice_level"),
-            is_vegetarian=item_data.get("is_vegetarian", False),
-            is_vegan=item_data.get("is_vegan", False),
-            confidence=data.get("confidence", 0.5),
-        ))
+async def _stream_extract_with_openai(image_base64: str) -> AsyncIterator[str]:
+    """Call OpenAI Vision API with streaming and yield content deltas."""
+    from app.services.openai_client import (
+        get_openai_client, record_usage, settle_reservation, upstream_call,
+    )
+    from app.services.openai_metrics import observe_call
+
+    client = get_openai_client()
+
+    logger.info("Streaming OpenAI Vision API menu extraction (image size: %d chars)", len(image_base64))
+    messages = _vision_messages(image_base64, DEFAULT_EXTRACTION_INSTRUCTION)
+    async with upstream_call("ocr", messages) as reservation:
+        with observe_call("ocr", "gpt-4o-mini") as call:
+            stream = await client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                response_format={"type": "json_object"},
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=settings.OCR_DEADLINE_SECONDS,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if chunk.usage:
+                    record_usage("ocr", chunk.usage)
+                    call.record_usage(chunk.usage)
+                    settle_reservation(reservation, chunk.usage)
+
+
+def _append_item(table: MenuTable, item_data: dict, default_confidence: float) -> int:
+    """Append one extracted item dict to the table; returns its row index."""
+    return table.append(
+        id=str(uuid4()),
+        name=item_data.get("name", "Unknown"),
+        description=item_data.get("description"),
+        price=item_data.get("price"),
+        currency=item_data.get("currency", "USD"),
+        category=item_data.get("category"),
+        tags=item_data.get("tags", []),
+        allergens=item_data.get("allergens", []),
+        spice_level=item_data.get("spice_level"),
+        is_vegetarian=item_data.get("is_vegetarian", False),
+        is_vegan=item_data.get("is_vegan", False),
+        confidence=item_data.get("confidence", default_confidence),
+    )
+
+
+def _parse_extraction(
+    data: dict,
+    session_id: str,
+    table: Optional[MenuTable] = None,
+) -> MenuData:
+    """
+    Parse OpenAI JSON response into MenuData dataclass.
+
+    Pass table to reuse rows already built from the same data (e.g. while
+    streaming) so their ids stay stable.
+    """
+    if table is None:
+        table = MenuTable()
+    for item_data in data.get("items", [])[len(table):]:
+        _append_item(table, item_data, data.get("confidence", 0.5))
 
     restaurant_data = data.get("restaurant")
     restaurant = None
@@ -159,7 +209,7 @@ def _parse_extraction(data: dict, session_id: str) -> MenuData:
             cuisine_type=restaurant_data.get("cuisine_type"),
         )
 
-    warnings = data.get("warnings", [])
+    warnings = list(data.get("warnings", []))
     confidence = data.get("confidence", 0.5)
     if confidence < 0.3:
         warnings.append("Low confidence extraction - results may be inaccurate")
@@ -167,7 +217,7 @@ def _parse_extraction(data: dict, session_id: str) -> MenuData:
     return MenuData(
         id=str(uuid4()),
         session_id=session_id,
-        items=items,
+        table=table,
         restaurant=restaurant,
         extraction_method=ExtractionMethod.OCR,
         confidence=confidence,
@@ -178,6 +228,78 @@ def _parse_extraction(data: dict, session_id: str) -> MenuData:
     )
 
 
+def normalize_dish_name(name: str) -> str:
+    """Normalize a dish name for deduplication (NFKC, casefold, no punctuation)."""
+    text = unicodedata.normalize("NFKC", name or "").casefold()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def _merge_extractions(pages: List[dict]) -> dict:
+    """
+    Merge per-page extraction dicts into one, in page order.
+
+    Items are deduplicated by normalized dish name; a later duplicate only
+    fills fields the first occurrence left empty and adds its tags/allergens.
+    Each item keeps the confidence of the page it was first read from.
+    The first non-empty restaurant name/cuisine wins, confidence is the
+    item-weighted mean across pages, and menu_language is the majority vote.
+    """
+    merged_items: List[dict] = []
+    by_name = {}
+    restaurant = {"name": None, "cuisine_type": None}
+    warnings: List[str] = []
+    languages = Counter()
+    weighted_confidence = 0.0
+    total_weight = 0
+
+    for page in pages:
+        page_items = page.get("items", [])
+        page_confidence = page.get("confidence", 0.5)
+        for item in page_items:
+            key = normalize_dish_name(item.get("name", ""))
+            existing = by_name.get(key)
+            if existing is None:
+                item = dict(item)
+                item.setdefault("confidence", page_confidence)
+                by_name[key] = item
+                merged_items.append(item)
+                continue
+            for field_name, value in item.items():
+                if field_name == "confidence":
+                    continue
+                if field_name in ("tags", "allergens"):
+                    combined = list(existing.get(field_name) or [])
+                    combined.extend(v for v in value or [] if v not in combined)
+                    existing[field_name] = combined
+                elif existing.get(field_name) is None and value is not None:
+                    existing[field_name] = value
+
+        page_restaurant = page.get("restaurant") or {}
+        for field_name in restaurant:
+            if not restaurant[field_name] and page_restaurant.get(field_name):
+                restaurant[field_name] = page_restaurant[field_name]
+
+        for warning in page.get("warnings", []):
+            if warning not in warnings:
+                warnings.append(warning)
+
+        if page.get("menu_language"):
+            languages[page["menu_language"]] += len(page_items) or 1
+
+        weight = len(page_items) or 1
+        weighted_confidence += page_confidence * weight
+        total_weight += weight
+
+    return {
+        "restaurant": restaurant if any(restaurant.values()) else None,
+        "items": merged_items,
+        "confidence": weighted_confidence / total_weight if total_weight else 0.0,
+        "warnings": warnings,
+        "menu_language": languages.most_common(1)[0][0] if languages else None,
+    }
+
+
 # --- Fallback fake data for dev mode (no API key) ---
 
 FAKE_MENU_ITEMS = [
@@ -192,15 +314,14 @@ FAKE_MENU_ITEMS = [
 
 def _get_fake_menu(session_id: str) -> MenuData:
     """Return fake menu data for development without API key."""
-    items = [
-        MenuItem(id=str(uuid4()), name=i.name, description=i.description, price=i.price,
-                 currency=i.currency, category=i.category, tags=list(i.tags),
-                 allergens=list(i.allergens), spice_level=i.spice_level,
-                 is_vegetarian=i.is_vegetarian, is_vegan=i.is_vegan, confidence=0.95)
-        for i in FAKE_MENU_ITEMS
-    ]
+    table = MenuTable()
+    for i in FAKE_MENU_ITEMS:
+        table.append(id=str(uuid4()), name=i.name, description=i.description, price=i.price,
+                     currency=i.currency, category=i.category, tags=i.tags,
+                     allergens=i.allergens, spice_level=i.spice_level,
+                     is_vegetarian=i.is_vegetarian, is_vegan=i.is_vegan, confidence=0.95)
     return MenuData(
-        id=str(uuid4()), session_id=session_id, items=items,
+        id=str(uuid4()), session_id=session_id, table=table,
         restaurant=Restaurant(name="Thai Orchid Kitchen", cuisine_type="Thai"),
         extraction_method=ExtractionMethod.OCR, confidence=0.94,
         extracted_at=datetime.utcnow(), raw_text="[Fake OCR - dev mode]", warnings=[],
@@ -208,9 +329,183 @@ def _get_fake_menu(session_id: str) -> MenuData:
     )
 
 
+async def _prepare_for_vision(image_base64: Optional[str], image_bytes: bytes) -> str:
+    """
+    Downscale/recompress the image in the process pool; return the base64 to send.
+
+    This is the only place raw uploads get base64-encoded, and only on a
+    cache miss.
+    """
+    from app.services.image_service import preprocess_for_vision
+
+    result = await preprocess_for_vision(image_bytes)
+    if result is not None and result.bytes_saved > 0:
+        return base64.b64encode(result.image_bytes).decode()
+    if image_base64 is None:
+        return base64.b64encode(image_bytes).decode()
+    return image_base64
+
+
+async def _extract_image(image_base64: Optional[str], image_bytes: bytes) -> dict:
+    """Preprocess the image, then run OCR on it."""
+    return await _extract_with_openai(await _prepare_for_vision(image_base64, image_bytes))
+
+
+async def _extract_concurrently(
+    jobs: List[Callable[[], Awaitable[dict]]],
+    label: str,
+) -> dict:
+    """
+    Run extraction jobs concurrently under a bounded semaphore and merge them.
+
+    Failed jobs are reported in the merged warnings; raises OCRFailedError
+    only if every job failed.
+    """
+    semaphore = asyncio.BoundedSemaphore(settings.OCR_MAX_CONCURRENT_PAGES)
+
+    async def run(job: Callable[[], Awaitable[dict]]) -> dict:
+        async with semaphore:
+            return await job()
+
+    results = await asyncio.gather(*(run(job) for job in jobs), return_exceptions=True)
+
+    extracted = []
+    failed = []
+    for number, result in enumerate(results, start=1):
+        if isinstance(result, Exception):
+            logger.error("OCR failed for %s %d: %s", label, number, result)
+            failed.append(number)
+        else:
+            extracted.append(result)
+
+    if not extracted:
+        raise OCRFailedError(message=f"Menu extraction failed for all {len(jobs)} {label}s")
+
+    data = _merge_extractions(extracted)
+    if failed:
+        data["warnings"].append(
+            f"Could not read {label}(s) " + ", ".join(str(n) for n in failed)
+        )
+    logger.info(
+        "Merged %d %ss into %d unique items", len(extracted), label, len(data["items"])
+    )
+    return data
+
+
+async def _get_tiled_extraction(image_base64: Optional[str], image_bytes: Optional[bytes] = None) -> dict:
+    """
+    Extract a large/dense menu photo as overlapping tiles processed in parallel.
+
+    Each tile is a smaller Vision call, so output stays under the token limit
+    and wall-clock time tracks the slowest tile. Items seen in two tiles'
+    overlap are deduplicated by the merge. Falls back to a whole-image
+    extraction if the image cannot be tiled.
+    """
+    from app.services.image_service import tile_image
+    from app.services.ocr_cache import get_ocr_cache, image_cache_key
+
+    if image_bytes is None:
+        image_bytes = base64.b64decode(image_base64)
+
+    cache = get_ocr_cache()
+    key = image_cache_key(image_bytes) + ":tiled"
+    if cache is not None:
+        cached = await cache.aget(key)
+        if cached is not None:
+            logger.info("OCR cache hit for tiled image %s", key[:12])
+            return cached
+
+    tiles = await tile_image(image_bytes)
+    if not tiles:
+        logger.warning("Image could not be tiled — extracting it whole")
+        return await _get_extraction(image_base64, image_bytes)
+
+    data = await _extract_concurrently(
+        [
+            lambda tile=tile: _extract_with_openai(
+                base64.b64encode(tile).decode(), instruction=TILE_EXTRACTION_INSTRUCTION
+            )
+            for tile in tiles
+        ],
+        label="tile",
+    )
+    if cache is not None and data.get("items"):
+        await cache.aset(key, data)
+    return data
+
+
+async def _lookup_cached_extraction(image_bytes: bytes) -> Tuple[Optional[dict], str, Optional[int]]:
+    """
+    Look an image up in the OCR cache.
+
+    Exact byte matches are served first; otherwise a perceptual hash is
+    computed in the image process pool and matched against previously
+    extracted menus. Returns (cached data or None, content key, image signature).
+    SQLite reads and writes run in worker threads, off the event loop.
+    """
+    from app.services.image_service import image_signature
+    from app.services.ocr_cache import get_near_duplicate_index, get_ocr_cache, image_cache_key
+
+    cache = get_ocr_cache()
+    key = image_cache_key(image_bytes)
+    if cache is None:
+        return None, key, None
+
+    cached = await cache.aget(key)
+    if cached is not None:
+        logger.info("OCR cache hit for image %s (%s)", key[:12], cache.stats.to_dict())
+        return cached, key, None
+
+    index = get_near_duplicate_index()
+    signature = await image_signature(image_bytes) if index is not None else None
+    if signature is not None:
+        match_key = index.find(signature)
+        if match_key is not None:
+            cached = await cache.aget(match_key)
+            if cached is not None:
+                await cache.aset(key, cached)
+                return cached, key, signature
+            await asyncio.to_thread(index.discard, match_key)
+    return None, key, signature
+
+
+async def _store_extraction(key: str, signature: Optional[ImageSignature], data: dict) -> None:
+    """
+    Cache a fresh extraction under its content key and image signature.
+
+    Only extractions that found menu items are cached, so a retry after a
+    failed or empty read still gets a fresh Vision call.
+    """
+    from app.services.ocr_cache import get_near_duplicate_index, get_ocr_cache
+
+    cache = get_ocr_cache()
+    if cache is None or not data.get("items"):
+        return
+    await cache.aset(key, data)
+    index = get_near_duplicate_index()
+    if signature is not None and index is not None:
+        await asyncio.to_thread(index.add, signature, key)
+
+
+async def _get_extraction(image_base64: Optional[str], image_bytes: Optional[bytes] = None) -> dict:
+    """Return the raw extraction dict for an image, consulting the OCR cache first."""
+    if image_bytes is None:
+        image_bytes = base64.b64decode(image_base64)
+
+    cached, key, signature = await _lookup_cached_extraction(image_bytes)
+    if cached is not None:
+        return cached
+
+    data = await _extract_image(image_base64, image_bytes)
+    await _store_extraction(key, signature, data)
+    return data
+
+
 async def process_menu_image(
     session_id: str,
-    image_base64: str,
+    image_base64: Optional[str] = None,
+    image_bytes: Optional[bytes] = None,
+    tiled: bool = False,
 ) -> MenuData:
     """
     Extract menu items from a photo using OpenAI Vision API.
@@ -218,17 +513,40 @@ async def process_menu_image(
 
     Args:
         session_id: The session/device ID for this extraction
-        image_base64: Base64-encoded image string
+        image_base64: Base64-encoded image string (may be omitted if image_bytes is given)
+        image_bytes: Decoded image bytes, if the caller already has them
+        tiled: Split the photo into overlapping tiles extracted in parallel
 
     Returns:
         MenuData with extracted menu items
+
+    Concurrent calls for the same device and image (double-taps, client
+    retries) share one extraction.
     """
+    from app.services.ocr_cache import image_cache_key
+
+    image_key = image_cache_key(image_bytes if image_bytes is not None else image_base64.encode("ascii"))
+    key = f"{session_id}:{image_key}:{int(tiled)}"
+    return await get_single_flight("ocr").do(
+        key, lambda: _process_menu_image(session_id, image_base64, image_bytes, tiled)
+    )
+
+
+async def _process_menu_image(
+    session_id: str,
+    image_base64: Optional[str],
+    image_bytes: Optional[bytes],
+    tiled: bool,
+) -> MenuData:
     if not settings.OPENAI_API_KEY:
         logger.warning("OPENAI_API_KEY not set — returning fake menu data")
         return _get_fake_menu(session_id)
 
     try:
-        data = await _extract_with_openai(image_base64)
+        if tiled:
+            data = await _get_tiled_extraction(image_base64, image_bytes)
+        else:
+            data = await _get_extraction(image_base64, image_bytes)
         return _parse_extraction(data, session_id)
     except json.JSONDecodeError as e:
         logger.error("Failed to parse OCR response JSON: %s", e)
@@ -236,3 +554,95 @@ async def process_menu_image(
     except Exception as e:
         logger.error("OCR service error: %s", e)
         raise OCRFailedError(message=f"Menu extraction failed: {str(e)}")
+
+
+async def process_menu_images(
+    session_id: str,
+    pages: List[Tuple[str, Optional[bytes]]],
+) -> MenuData:
+    """
+    Extract and merge a multi-page menu.
+
+    Every page goes through the same cache/preprocess/OCR pipeline as a
+    single scan, concurrently under a bounded semaphore, so total latency
+    tracks the slowest page rather than the sum. Pages that fail are
+    reported in warnings; the scan only fails if no page could be read.
+
+    Args:
+        session_id: The session/device ID for this extraction
+        pages: (image_base64, image_bytes) per page, in reading order
+
+    Returns:
+        MenuData with items from all pages, deduplicated by dish name
+    """
+    if not settings.OPENAI_API_KEY:
+        logger.warning("OPENAI_API_KEY not set — returning fake menu data")
+        return _get_fake_menu(session_id)
+
+    data = await _extract_concurrently(
+        [lambda b64=b64, raw=raw: _get_extraction(b64, raw) for b64, raw in pages],
+        label="page",
+    )
+    return _parse_extraction(data, session_id)
+
+
+async def stream_menu_image(
+    session_id: str,
+    image_base64: Optional[str] = None,
+    image_bytes: Optional[bytes] = None,
+) -> AsyncIterator[Union[MenuItem, MenuData]]:
+    """
+    Streaming variant of process_menu_image.
+
+    Yields each MenuItem as soon as the model has finished writing it, then
+    the complete MenuData last. The final MenuData's table holds the rows that
+    were yielded, with the same ids. Cache hits and dev mode yield everything at once.
+    """
+    if not settings.OPENAI_API_KEY:
+        logger.warning("OPENAI_API_KEY not set — returning fake menu data")
+        menu = _get_fake_menu(session_id)
+        for item in menu.table:
+            yield item
+        yield menu
+        return
+
+    try:
+        if image_bytes is None:
+            image_bytes = base64.b64decode(image_base64)
+
+        cached, key, signature = await _lookup_cached_extraction(image_bytes)
+        if cached is not None:
+            menu = _parse_extraction(cached, session_id)
+            for item in menu.table:
+                yield item
+            yield menu
+            return
+
+        vision_base64 = await _prepare_for_vision(image_base64, image_bytes)
+        parser = JSONStreamParser(array_keys=("items",))
+        table = MenuTable()
+        started = time.perf_counter()
+        async for delta in _stream_extract_with_openai(vision_base64):
+            for kind, field_name, value in parser.feed(delta):
+                if kind == "item" and field_name == "items" and isinstance(value, dict):
+                    if not len(table):
+                        logger.info("First streamed menu item after %.2fs", time.perf_counter() - started)
+                    # Item confidence is only known once the top-level field arrives
+                    yield table.row(_append_item(table, value, default_confidence=0.5))
+
+        data = parser.result()
+        for index, item_data in enumerate(data.get("items", [])[:len(table)]):
+            table.confidences[index] = item_data.get("confidence", data.get("confidence", 0.5))
+        logger.info(
+            "Streamed %d menu items in %.2fs", len(data.get("items", [])), time.perf_counter() - started
+        )
+        await _store_extraction(key, signature, data)
+        yield _parse_extraction(data, session_id, table=table)
+    except json.JSONDecodeError as e:
+        logger.error("Failed to parse streamed OCR response JSON: %s", e)
+        raise OCRFailedError(message="Failed to parse menu extraction results")
+    except OCRFailedError:
+        raise
+    except Exception as e:
+        logger.error("OCR streaming error: %s", e)
+        raise OCRFailedError(message=f"Menu extraction failed: {str(e)}")
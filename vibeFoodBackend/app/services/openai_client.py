@@ -1,9 +1,42 @@
 """
 Shared OpenAI async client for OCR and recommendation services.
+
+Also keeps running token totals per call purpose. OpenAI reuses the prompt
+prefix of recent requests (1024+ identical leading tokens) and reports the
+reused part as usage.prompt_tokens_details.cached_tokens; recording it shows
+how much of each prompt was served from that cache.
+
+Chat completions go through create_chat_completion, which enforces a
+deadline for the whole operation and, when hedging is enabled, races a
+second request (optionally on a faster model) against a first one that is
+slower than the operation's recent pN latency.
+
+Every call path (including streams and transcriptions) runs inside
+upstream_call: the request first waits for its turn in the rate-limit
+scheduler (reserve_capacity), then enters circuit_guard, a per-operation
+circuit breaker that fails fast with UpstreamUnavailableError while OpenAI
+is degraded, so callers reach their fallbacks immediately. Once enough
+latency samples exist, timeouts of the adaptive operations shrink from the
+configured deadline to a multiple of the observed p99; timed-out calls are
+sampled at the cap they hit, so the cap grows back when upstream slows
+down. Latency, errors, tokens and estimated cost of every upstream request
+are exported through openai_metrics.observe_call.
 """
-from typing import Optional
-from openai import AsyncOpenAI
+import asyncio
+import logging
+import math
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from openai import APIStatusError, AsyncOpenAI
 from app.core.config import settings
+from app.services.openai_metrics import observe_call, record_error
+from app.services.openai_scheduler import Reservation, estimate_call_tokens, get_openai_scheduler
+from app.utils.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
 
 _client: Optional[AsyncOpenAI] = None
 
@@ -18,3 +51,322 @@ def get_openai_client() -> AsyncOpenAI:
             )
         _client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
     return _client
+
+
+class UsageStats:
+    """Token totals per purpose: calls, prompt, cached prompt and completion tokens."""
+
+    FIELDS = ("calls", "prompt_tokens", "cached_tokens", "completion_tokens")
+
+    def __init__(self):
+        self._totals: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, purpose: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(purpose, dict.fromkeys(self.FIELDS, 0))
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens
+            totals["cached_tokens"] += cached_tokens
+            totals["completion_tokens"] += completion_tokens
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {purpose: dict(totals) for purpose, totals in self._totals.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+_usage = UsageStats()
+
+
+def get_usage_stats() -> UsageStats:
+    """The process-wide token usage totals."""
+    return _usage
+
+
+def record_usage(purpose: str, usage) -> None:
+    """Log one response's token usage (None if the API omitted it) and add it to the totals."""
+    if usage is None:
+        logger.info("OpenAI %s call complete — tokens: ? input, ? output", purpose)
+        return
+    prompt_tokens = usage.prompt_tokens or 0
+    completion_tokens = usage.completion_tokens or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None) or 0
+    if not isinstance(cached_tokens, int):
+        cached_tokens = 0
+    _usage.add(purpose, prompt_tokens, cached_tokens, completion_tokens)
+    logger.info(
+        "OpenAI %s call complete — tokens: %d input (%d cached), %d output",
+        purpose, prompt_tokens, cached_tokens, completion_tokens,
+    )
+
+
+# --- Latency tracking and hedged requests ---
+
+class LatencyWindow:
+    """The most recent successful call durations of one operation."""
+
+    def __init__(self, size: int):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Nearest-rank percentile, or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = min(len(samples), max(1, math.ceil(fraction * len(samples))))
+        return samples[rank - 1]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class HedgeStats:
+    """Per-operation counts of hedged requests fired and won."""
+
+    def __init__(self):
+        self.fired: Dict[str, int] = {}
+        self.won: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict[str, Dict[str, int]]:
+        return {op: {"fired": fired, "won": self.won.get(op, 0)} for op, fired in self.fired.items()}
+
+
+_latency: Dict[str, LatencyWindow] = {}
+_hedge_stats = HedgeStats()
+
+
+def get_latency_window(operation: str) -> LatencyWindow:
+    """Get or create the latency window for an operation."""
+    window = _latency.get(operation)
+    if window is None:
+        window = _latency[operation] = LatencyWindow(settings.OPENAI_LATENCY_WINDOW_SIZE)
+    return window
+
+
+def get_hedge_stats() -> HedgeStats:
+    return _hedge_stats
+
+
+def hedge_delay(operation: str) -> Optional[float]:
+    """
+    Seconds to wait before hedging a call of this operation, or None if it
+    is not hedged. The delay is the configured latency percentile once
+    enough samples exist, the default delay before that.
+    """
+    operations = {op.strip() for op in settings.OPENAI_HEDGE_OPERATIONS.split(",")}
+    if not settings.OPENAI_HEDGE_ENABLED or operation not in operations:
+        return None
+    window = get_latency_window(operation)
+    if len(window) < settings.OPENAI_HEDGE_MIN_SAMPLES:
+        return settings.OPENAI_HEDGE_DEFAULT_DELAY_SECONDS
+    return max(settings.OPENAI_HEDGE_MIN_DELAY_SECONDS, window.percentile(settings.OPENAI_HEDGE_PERCENTILE))
+
+
+async def _race(operation: str, attempt, model: str, delay: float) -> Any:
+    """Run attempt(model); after delay, race attempt(hedge model) and keep the first success."""
+    primary = asyncio.ensure_future(attempt(model))
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+
+    hedge = asyncio.ensure_future(attempt(settings.OPENAI_HEDGE_MODEL or model))
+    _hedge_stats.fired[operation] = _hedge_stats.fired.get(operation, 0) + 1
+    logger.info("OpenAI %s call slower than %.1fs — hedging with %s", operation, delay, settings.OPENAI_HEDGE_MODEL or model)
+    pending = {primary, hedge}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        _hedge_stats.won[operation] = _hedge_stats.won.get(operation, 0) + 1
+                    return task.result()
+        return primary.result()  # both failed: report the original error
+    finally:
+        for task in (primary, hedge):
+            task.cancel()
+
+
+async def create_chat_completion(
+    operation: str, deadline_seconds: float, schedule_as: Optional[str] = None, **kwargs
+) -> Any:
+    """
+    client.chat.completions.create with a deadline for the whole operation
+    (shortened by adaptive timeouts), optional hedging and the operation's
+    circuit breaker. Raises asyncio.TimeoutError when the deadline passes
+    and UpstreamUnavailableError while the breaker is open. Not for
+    streaming calls. schedule_as queues the call in the rate-limit
+    scheduler under another operation's priority.
+
+    The deadline starts once the scheduler has admitted the call, and a
+    hedged request rides on the primary's reservation.
+    """
+    client = get_openai_client()
+    loop = asyncio.get_running_loop()
+    window = get_latency_window(operation)
+
+    async with upstream_call(operation, kwargs.get("messages"), schedule_as) as reservation:
+        deadline_seconds = adaptive_timeout(operation, deadline_seconds)
+        deadline = loop.time() + deadline_seconds
+
+        async def attempt(model: str) -> Any:
+            started = loop.time()
+            with observe_call(operation, model) as call:
+                response = await client.chat.completions.create(
+                    **dict(kwargs, model=model, timeout=max(deadline - started, 0.001))
+                )
+                call.record_usage(getattr(response, "usage", None))
+            window.record(loop.time() - started)
+            settle_reservation(reservation, getattr(response, "usage", None))
+            return response
+
+        delay = hedge_delay(operation)
+        if delay is None or delay >= deadline_seconds:
+            call = attempt(kwargs["model"])
+        else:
+            call = _race(operation, attempt, kwargs["model"], delay)
+        try:
+            return await asyncio.wait_for(call, deadline_seconds)
+        except asyncio.TimeoutError as e:
+            # The cancelled attempt is not counted by observe_call
+            record_error(operation, kwargs["model"], e)
+            # The call took at least this long; without the sample a shrunken cap could never grow
+            window.record(deadline_seconds)
+            raise
+
+
+# --- Rate-limit scheduling ---
+
+async def reserve_capacity(operation: str, messages: Optional[list] = None) -> Optional[Reservation]:
+    """Wait until the rate-limit scheduler admits this call (None if scheduling is off)."""
+    scheduler = get_openai_scheduler()
+    if scheduler is None:
+        return None
+    return await scheduler.acquire(operation, estimate_call_tokens(operation, messages))
+
+
+def settle_reservation(reservation: Optional[Reservation], usage) -> None:
+    """Correct a reservation with the response's actual token usage."""
+    if reservation is not None and usage is not None:
+        reservation.settle(getattr(usage, "total_tokens", None))
+
+
+def release_reservation(reservation: Optional[Reservation]) -> None:
+    """Give back a reservation whose call never went upstream."""
+    scheduler = get_openai_scheduler()
+    if scheduler is not None and reservation is not None:
+        scheduler.release(reservation)
+
+
+# --- Circuit breakers and adaptive timeouts ---
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(operation: str) -> CircuitBreaker:
+    """Get or create the circuit breaker for an operation."""
+    breaker = _breakers.get(operation)
+    if breaker is None:
+        breaker = _breakers[operation] = CircuitBreaker(
+            name=f"openai-{operation}",
+            window_size=settings.OPENAI_CIRCUIT_WINDOW_SIZE,
+            failure_ratio=settings.OPENAI_CIRCUIT_FAILURE_RATIO,
+            min_calls=settings.OPENAI_CIRCUIT_MIN_CALLS,
+            open_seconds=settings.OPENAI_CIRCUIT_OPEN_SECONDS,
+        )
+    return breaker
+
+
+def circuit_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """State and counters of every breaker, by operation."""
+    return {operation: breaker.to_dict() for operation, breaker in _breakers.items()}
+
+
+def _is_upstream_failure(exc: BaseException) -> bool:
+    """Timeouts, connection errors, 429 and 5xx count against the breaker; other 4xx do not."""
+    if isinstance(exc, APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return True
+
+
+@asynccontextmanager
+async def circuit_guard(operation: str) -> AsyncIterator[None]:
+    """
+    Run the enclosed OpenAI call under the operation's circuit breaker.
+    Raises UpstreamUnavailableError without calling upstream while it is open.
+    """
+    if not settings.OPENAI_CIRCUIT_ENABLED:
+        yield
+        return
+    breaker = get_circuit_breaker(operation)
+    breaker.before_call()
+    try:
+        yield
+    except Exception as e:
+        if _is_upstream_failure(e):
+            breaker.record_failure()
+        else:
+            breaker.release()
+        raise
+    except BaseException:
+        # Cancelled or abandoned (e.g. a closed stream): no verdict on upstream health
+        breaker.release()
+        raise
+    else:
+        breaker.record_success()
+
+
+@asynccontextmanager
+async def upstream_call(
+    operation: str, messages: Optional[list] = None, schedule_as: Optional[str] = None
+) -> AsyncIterator[Optional[Reservation]]:
+    """
+    Wait for rate-limit capacity, then run the enclosed call under the
+    operation's circuit breaker. Queueing for our own budget is not an
+    upstream failure, so it happens outside the breaker; the reservation
+    is given back if the breaker rejects the call.
+    """
+    reservation = await reserve_capacity(schedule_as or operation, messages)
+    admitted = False
+    try:
+        async with circuit_guard(operation):
+            admitted = True
+            yield reservation
+    finally:
+        if not admitted:
+            release_reservation(reservation)
+
+
+def adaptive_timeout(operation: str, deadline_seconds: float) -> float:
+    """
+    Timeout for the next call: the configured multiple of the operation's
+    observed latency percentile, at least the minimum and at most the deadline.
+    Operations not listed in OPENAI_ADAPTIVE_TIMEOUT_OPERATIONS keep the deadline.
+    """
+    operations = {op.strip() for op in settings.OPENAI_ADAPTIVE_TIMEOUT_OPERATIONS.split(",")}
+    if not settings.OPENAI_ADAPTIVE_TIMEOUT_ENABLED or operation not in operations:
+        return deadline_seconds
+    window = get_latency_window(operation)
+    if len(window) < settings.OPENAI_ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+        return deadline_seconds
+    observed = window.percentile(settings.OPENAI_ADAPTIVE_TIMEOUT_PERCENTILE) * settings.OPENAI_ADAPTIVE_TIMEOUT_MULTIPLIER
+    return min(deadline_seconds, max(settings.OPENAI_ADAPTIVE_TIMEOUT_MIN_SECONDS, observed))
+
+
+def reset_call_stats() -> None:
+    """Forget latency samples, hedge counts and breaker state (used by tests)."""
+    global _hedge_stats
+    _latency.clear()
+    _hedge_stats = HedgeStats()
+    _breakers.clear()
@@ -0,0 +1,123 @@
+"""
+Prometheus metrics for upstream OpenAI calls (chat, vision and Whisper).
+
+Every call is labelled by operation (ocr, recommendation, intro,
+transcription) and the model it was sent to:
+
+- vibefood_openai_request_duration_seconds: upstream latency of successful
+  calls (rate-limit queueing excluded), for p50/p99 per operation.
+- vibefood_openai_errors_total: failed calls by exception type.
+- vibefood_openai_tokens_total: prompt, cached prompt and completion tokens.
+- vibefood_openai_cost_usd_total: estimated spend from MODEL_PRICES.
+
+Cancelled calls (hedge losers, closed streams) are neither successes nor
+errors and are not counted.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from app.utils.metrics import REGISTRY
+
+# USD list prices: per 1M tokens (input, cached input, output) or per audio minute
+MODEL_PRICES: Dict[str, Dict[str, float]] = {
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "whisper-1": {"audio_minute": 0.006},
+}
+
+CALL_SECONDS = REGISTRY.histogram(
+    "vibefood_openai_request_duration_seconds",
+    "Latency of successful OpenAI calls.",
+    ("operation", "model"),
+)
+CALL_ERRORS = REGISTRY.counter(
+    "vibefood_openai_errors_total",
+    "Failed OpenAI calls by exception type.",
+    ("operation", "model", "error_type"),
+)
+TOKENS = REGISTRY.counter(
+    "vibefood_openai_tokens_total",
+    "Tokens reported by OpenAI responses (cached is a subset of prompt).",
+    ("operation", "model", "type"),
+)
+AUDIO_SECONDS = REGISTRY.counter(
+    "vibefood_openai_audio_seconds_total",
+    "Seconds of audio sent for transcription.",
+    ("operation", "model"),
+)
+COST = REGISTRY.counter(
+    "vibefood_openai_cost_usd_total",
+    "Estimated OpenAI spend in USD.",
+    ("operation", "model"),
+)
+
+
+def token_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Estimated USD cost of one chat call, or None for a model without prices."""
+    prices = MODEL_PRICES.get(model)
+    if prices is None or "input" not in prices:
+        return None
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    return (
+        uncached * prices["input"]
+        + cached_tokens * prices["cached_input"]
+        + completion_tokens * prices["output"]
+    ) / 1_000_000
+
+
+def record_error(operation: str, model: str, exc: BaseException) -> None:
+    CALL_ERRORS.inc(operation=operation, model=model, error_type=type(exc).__name__)
+
+
+class CallObservation:
+    """Usage recorder for one upstream call, yielded by observe_call."""
+
+    def __init__(self, operation: str, model: str):
+        self.operation = operation
+        self.model = model
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def record_usage(self, usage) -> None:
+        """Count a chat response's tokens and their estimated cost."""
+        if usage is None:
+            return
+        labels = {"operation": self.operation, "model": self.model}
+        prompt_tokens = usage.prompt_tokens or 0
+        completion_tokens = usage.completion_tokens or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None) or 0
+        if not isinstance(cached_tokens, int):
+            cached_tokens = 0
+        TOKENS.inc(prompt_tokens, type="prompt", **labels)
+        TOKENS.inc(cached_tokens, type="cached", **labels)
+        TOKENS.inc(completion_tokens, type="completion", **labels)
+        cost = token_cost(self.model, prompt_tokens, cached_tokens, completion_tokens)
+        if cost is not None:
+            COST.inc(cost, **labels)
+
+    def record_audio(self, seconds: Optional[float]) -> None:
+        """Count transcribed audio and its estimated cost."""
+        if not isinstance(seconds, (int, float)) or seconds < 0:
+            return
+        labels = {"operation": self.operation, "model": self.model}
+        AUDIO_SECONDS.inc(seconds, **labels)
+        price = MODEL_PRICES.get(self.model, {}).get("audio_minute")
+        if price is not None:
+            COST.inc(seconds / 60 * price, **labels)
+
+
+@contextmanager
+def observe_call(operation: str, model: str) -> Iterator[CallObservation]:
+    """Time the enclosed upstream call and count it as a success or an error."""
+    call = CallObservation(operation, model)
+    try:
+        yield call
+    except Exception as e:
+        record_error(operation, model, e)
+        raise
+    CALL_SECONDS.observe(call.elapsed, operation=operation, model=model)
@@ -0,0 +1,233 @@
+"""
+Priority scheduler for the account's OpenAI rate limits.
+
+OCR, recommendations, restaurant intros and Whisper transcriptions share
+one requests-per-minute and tokens-per-minute budget. Without coordination
+a burst of scans could use all of it and make user-facing recommendations
+fail with 429s. Every call now reserves its estimated token cost in a
+sliding 60-second window before it goes upstream; calls that do not fit
+wait in a queue that is served strictly by priority
+(recommendation > OCR > transcription > intro > speculative
+recommendations), and a share of the budget is held back for
+recommendations. Reservations are corrected with the
+actual usage once a response reports it.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.utils.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60.0
+
+# Lower value = served first; unknown operations go last
+PRIORITIES = {"recommendation": 0, "ocr": 1, "transcription": 2, "intro": 3, "speculative": 4}
+LOWEST_PRIORITY = max(PRIORITIES.values()) + 1
+
+# Expected completion tokens per operation (corrected by actual usage)
+OUTPUT_TOKEN_ESTIMATES = {"recommendation": 600, "ocr": 2000, "intro": 120, "transcription": 0, "speculative": 600}
+# Rough prompt cost of one menu photo
+IMAGE_TOKEN_ESTIMATE = 1500
+
+_scheduler: Optional["OpenAIScheduler"] = None
+
+
+def estimate_call_tokens(operation: str, messages: Optional[List[Dict]] = None) -> int:
+    """Up-front token cost of a call: prompt text, images and expected output."""
+    tokens = OUTPUT_TOKEN_ESTIMATES.get(operation, 500)
+    for message in messages or ():
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += estimate_tokens(content)
+            continue
+        for part in content or ():
+            if part.get("type") == "text":
+                tokens += estimate_tokens(part.get("text", ""))
+            elif part.get("type") == "image_url":
+                tokens += IMAGE_TOKEN_ESTIMATE
+    return tokens
+
+
+class Reservation:
+    """One admitted call's share of the rate window."""
+
+    __slots__ = ("at", "tokens")
+
+    def __init__(self, at: float, tokens: int):
+        self.at = at
+        self.tokens = tokens
+
+    def settle(self, actual_tokens: Optional[int]) -> None:
+        """Replace the estimate with the tokens the response actually used."""
+        if isinstance(actual_tokens, int) and actual_tokens >= 0:
+            self.tokens = actual_tokens
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "operation", "tokens", "future", "enqueued_at")
+
+    def __init__(self, priority, seq, operation, tokens, future, enqueued_at):
+        self.priority = priority
+        self.seq = seq
+        self.operation = operation
+        self.tokens = tokens
+        self.future = future
+        self.enqueued_at = enqueued_at
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class OpenAIScheduler:
+    """RPM/TPM budgets over a sliding window with a priority wait queue."""
+
+    def __init__(
+        self,
+        rpm_limit: int,
+        tpm_limit: int,
+        reserved_share: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.reserved_share = reserved_share
+        self._clock = clock
+        self._window: Deque[Reservation] = deque()
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._wait_stats: Dict[str, Dict[str, float]] = {}
+
+    def _prune(self, now: float) -> None:
+        while self._window and now - self._window[0].at >= WINDOW_SECONDS:
+            self._window.popleft()
+
+    def _fits(self, priority: int, tokens: int) -> bool:
+        # Everything but the top priority may only use (1 - reserved_share) of the budget
+        share = 1.0 if priority == 0 else 1.0 - self.reserved_share
+        if self.rpm_limit and len(self._window) + 1 > self.rpm_limit * share:
+            return False
+        if self.tpm_limit and self._window:
+            # A call larger than the whole budget is admitted into an empty window
+            window_tokens = sum(r.tokens for r in self._window)
+            if window_tokens + tokens > self.tpm_limit * share:
+                return False
+        return True
+
+    def _admit(self, tokens: int, now: float) -> Reservation:
+        reservation = Reservation(now, tokens)
+        self._window.append(reservation)
+        return reservation
+
+    def _record_wait(self, operation: str, waited: float) -> None:
+        stats = self._wait_stats.setdefault(operation, {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        stats["calls"] += 1
+        stats["total_seconds"] += waited
+        stats["max_seconds"] = max(stats["max_seconds"], waited)
+
+    def _dispatch(self) -> None:
+        """Admit queued calls in priority order while the head of the queue fits."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = self._clock()
+        self._prune(now)
+        while self._queue:
+            waiter = self._queue[0]
+            if waiter.future.done():  # cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+            if not self._fits(waiter.priority, waiter.tokens):
+                break
+            heapq.heappop(self._queue)
+            self._record_wait(waiter.operation, now - waiter.enqueued_at)
+            waiter.future.set_result(self._admit(waiter.tokens, now))
+
+        if self._queue and self._window:
+            # Re-check when the oldest reservation leaves the window
+            delay = max(WINDOW_SECONDS - (now - self._window[0].at), 0.01)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def release(self, reservation: Reservation) -> None:
+        """Return an unused reservation to the budget and admit waiting calls."""
+        try:
+            self._window.remove(reservation)
+        except ValueError:
+            return  # already left the window
+        if self._queue:
+            self._dispatch()
+
+    def has_headroom(self, operation: str, tokens: int) -> bool:
+        """Whether a call would be admitted right now without queueing."""
+        self._prune(self._clock())
+        return not self._queue and self._fits(PRIORITIES.get(operation, LOWEST_PRIORITY), tokens)
+
+    async def acquire(self, operation: str, tokens: int) -> Reservation:
+        """Wait until the call fits the budget and ahead of lower priorities."""
+        priority = PRIORITIES.get(operation, LOWEST_PRIORITY)
+        now = self._clock()
+        self._prune(now)
+        if not self._queue and self._fits(priority, tokens):
+            self._record_wait(operation, 0.0)
+            return self._admit(tokens, now)
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, next(self._seq), operation, tokens, loop.create_future(), now)
+        heapq.heappush(self._queue, waiter)
+        logger.info("OpenAI %s call queued (depth %d, ~%d tokens)", operation, len(self._queue), tokens)
+        self._dispatch()
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            # Gave up (e.g. deadline passed): let the next waiter move up. If
+            # the call was admitted just before the cancellation arrived, its
+            # reservation would otherwise hold capacity for the whole window.
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(waiter.future.result())
+            else:
+                self._dispatch()
+            raise
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Calls currently waiting, by operation."""
+        depth: Dict[str, int] = {}
+        for waiter in self._queue:
+            if not waiter.future.done():
+                depth[waiter.operation] = depth.get(waiter.operation, 0) + 1
+        return depth
+
+    def stats(self) -> Dict[str, Any]:
+        self._prune(self._clock())
+        return {
+            "queue_depth": self.queue_depth(),
+            "window_requests": len(self._window),
+            "window_tokens": sum(r.tokens for r in self._window),
+            "wait": {op: dict(stats) for op, stats in self._wait_stats.items()},
+        }
+
+
+def get_openai_scheduler() -> Optional[OpenAIScheduler]:
+    """Get or create the shared scheduler. Returns None if scheduling is disabled."""
+    global _scheduler
+    if not settings.OPENAI_SCHEDULER_ENABLED:
+        return None
+    if _scheduler is None:
+        _scheduler = OpenAIScheduler(
+            rpm_limit=settings.OPENAI_RPM_LIMIT,
+            tpm_limit=settings.OPENAI_TPM_LIMIT,
+            reserved_share=settings.OPENAI_RECOMMENDATION_RESERVED_SHARE,
+        )
+    return _scheduler
+
+
+def reset_openai_scheduler() -> None:
+    """Drop the shared scheduler (used by tests)."""
+    global _scheduler
+    _scheduler = None
@@ -0,0 +1,130 @@
+"""
+Cache for LLM recommendation results.
+
+Diners at the same restaurant scan the same menu, and users often tap the
+same vibe twice. The key is a fingerprint of the menu content (item ids are
+per-scan UUIDs, so they are left out) plus the vibe, the normalized
+preference set, the menu language and the voice prompt if there is one.
+Identical requests then skip the GPT-4o round trip. Because the key
+ignores ids, entries hold the model's output only; dish_id, price_value
+and template warnings are attached per request from the caller's own menu.
+
+Generations that are still running (e.g. speculative ones started right
+after a scan, or a double-tap) run in the "recommendations" single-flight
+group under the same key, so a request joins them instead of starting a
+second call.
+"""
+import copy
+import hashlib
+import json
+import logging
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.utils.cache import TieredCache
+from app.utils.singleflight import SingleFlight, get_single_flight
+
+logger = logging.getLogger(__name__)
+
+_cache: Optional[TieredCache] = None
+
+# Item fields that can change a recommendation; everything else (ids) is ignored
+_FINGERPRINT_FIELDS = (
+    "name", "description", "price", "currency", "category", "tags",
+    "allergens", "spice_level", "is_vegetarian", "is_vegan",
+)
+
+
+def menu_fingerprint(menu_items: List[Dict], restaurant_info: Optional[Dict] = None) -> str:
+    """Stable SHA-256 of the menu content, independent of item ids."""
+    items = [
+        [item.get(field_name) for field_name in _FINGERPRINT_FIELDS]
+        for item in menu_items
+    ]
+    restaurant = restaurant_info or {}
+    payload = json.dumps(
+        [restaurant.get("name"), restaurant.get("cuisine_type"), items],
+        ensure_ascii=False, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def normalize_preferences(preference: Optional[str]) -> str:
+    """Comma-separated preference string -> sorted, de-duplicated form."""
+    prefs = sorted({p.strip().lower() for p in (preference or "").split(",") if p.strip()})
+    if len(prefs) > 1 and "no_restriction" in prefs:
+        prefs.remove("no_restriction")
+    return ",".join(prefs) or "no_restriction"
+
+
+def recommendation_cache_key(
+    menu_fingerprint_hex: str,
+    vibe: str,
+    preference: Optional[str],
+    menu_language: Optional[str],
+    voice_prompt: Optional[str] = None,
+) -> str:
+    """Cache key for one recommendation request."""
+    voice = " ".join((voice_prompt or "").split()).casefold() if vibe == "voice" else ""
+    parts = [
+        menu_fingerprint_hex,
+        vibe,
+        normalize_preferences(preference),
+        menu_language or "en",
+        hashlib.sha256(voice.encode("utf-8")).hexdigest()[:16] if voice else "",
+    ]
+    return ":".join(parts)
+
+
+def get_recommendation_cache(create: bool = True) -> Optional[TieredCache]:
+    """
+    Get or create the shared recommendation cache. Returns None if disabled,
+    or with create=False if it does not exist yet.
+    """
+    global _cache
+    if not settings.RECOMMENDATION_CACHE_ENABLED:
+        return None
+    if _cache is None and create:
+        _cache = TieredCache(
+            name="recommendations",
+            memory_size=settings.RECOMMENDATION_CACHE_MEMORY_SIZE,
+            ttl_seconds=settings.RECOMMENDATION_CACHE_TTL_SECONDS,
+            disk_path=settings.RECOMMENDATION_CACHE_DB_PATH,
+            disk_max_bytes=settings.RECOMMENDATION_CACHE_MAX_BYTES,
+        )
+        logger.info(
+            "Recommendation cache initialized (memory=%d entries, disk=%s)",
+            settings.RECOMMENDATION_CACHE_MEMORY_SIZE,
+            settings.RECOMMENDATION_CACHE_DB_PATH or "disabled",
+        )
+    return _cache
+
+
+def get_cached_recommendations(key: str) -> Optional[Dict]:
+    """Return a copy of the cached result so callers may modify it freely."""
+    cache = get_recommendation_cache()
+    if cache is None:
+        return None
+    value = cache.get(key)
+    return copy.deepcopy(value) if value is not None else None
+
+
+def store_recommendations(key: str, result: Dict) -> None:
+    """Cache a result; empty recommendation lists are not worth keeping."""
+    cache = get_recommendation_cache()
+    if cache is not None and result.get("recommendations"):
+        cache.set(key, copy.deepcopy(result))
+
+
+def get_recommendation_flights() -> SingleFlight:
+    """Single-flight group for recommendation generations, keyed by cache key."""
+    return get_single_flight("recommendations")
+
+
+def reset_recommendation_cache() -> None:
+    """Drop all cached recommendations (used by tests and admin tooling)."""
+    global _cache
+    if _cache is not None:
+        _cache.clear()
+    _cache = None
+    get_recommendation_flights().clear()
@@ -0,0 +1,211 @@
+"""
+In-process asynchronous job queue for menu scans.
+
+Clients submit a scan and get a job id back immediately; a fixed pool of
+asyncio worker tasks runs the OCR + intro pipeline without holding an HTTP
+connection or DB session open. Jobs live in memory only — this matches the
+single-process deployment — and finished jobs are forgotten after
+SCAN_JOB_RESULT_TTL_SECONDS.
+
+Workers are bound to the event loop they were started on. If the queue is
+used from a new loop, the old workers are cancelled, jobs that were
+running on them are failed, and jobs still waiting are carried over.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.models.enums import ScanJobStatus
+from app.utils.errors import ScanQueueFullError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScanJob:
+    """A queued scan and, once finished, its result."""
+    id: str
+    device_id: str
+    run: Optional[Callable[[], Awaitable[BaseModel]]]
+    status: ScanJobStatus = ScanJobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[BaseModel] = None
+    error: Optional[str] = None
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (ScanJobStatus.COMPLETED, ScanJobStatus.FAILED)
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_change(self, timeout: float) -> None:
+        """Wait until the job's status changes (or timeout elapses)."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+class ScanJobQueue:
+    """Bounded queue of scan jobs processed by N asyncio worker tasks."""
+
+    def __init__(self, workers: int, max_queue: int, result_ttl: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self._jobs: Dict[str, ScanJob] = {}
+        # Jobs waiting for a worker, in submission order (drives position())
+        self._pending: "OrderedDict[str, ScanJob]" = OrderedDict()
+        self._running: Dict[str, ScanJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self) -> None:
+        """Start workers on the running loop (lazily, or again after a loop change)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        if self._tasks:
+            self._abandon_workers()
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        for job in self._pending.values():
+            self._queue.put_nowait(job)
+        self._tasks = [
+            loop.create_task(self._worker(n), name=f"scan-job-worker-{n}")
+            for n in range(self.workers)
+        ]
+        logger.info("Scan job queue started (%d workers, depth %d)", self.workers, self.max_queue)
+
+    def _abandon_workers(self) -> None:
+        """Cancel workers left on a previous loop and fail the jobs they were running."""
+        old_loop = self._loop
+        if old_loop is not None and not old_loop.is_closed():
+            for task in self._tasks:
+                old_loop.call_soon_threadsafe(task.cancel)
+        for job in list(self._running.values()):
+            self._interrupt(job)
+        self._running.clear()
+        self._tasks = []
+        if self._pending:
+            logger.warning("Scan job workers restarted; re-queueing %d pending jobs", len(self._pending))
+
+    async def start(self) -> None:
+        self._ensure_started()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    def submit(self, device_id: str, run: Callable[[], Awaitable[BaseModel]]) -> ScanJob:
+        """Queue a scan. Raises ScanQueueFullError when the queue is at capacity."""
+        self._ensure_started()
+        self._purge_expired()
+        if len(self._pending) >= self.max_queue:
+            raise ScanQueueFullError()
+        job = ScanJob(id=str(uuid4()), device_id=device_id, run=run)
+        self._queue.put_nowait(job)
+        self._pending[job.id] = job
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        return self._jobs.get(job_id)
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def position(self, job: ScanJob) -> Optional[int]:
+        """1-based position of a queued job, or None once it has started."""
+        if job.id not in self._pending:
+            return None
+        return list(self._pending).index(job.id) + 1
+
+    def _purge_expired(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.is_finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def _worker(self, number: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if self._pending.pop(job.id, None) is not None:
+                    await self._process(job)
+            finally:
+                self._queue.task_done()
+
+    def _interrupt(self, job: ScanJob) -> None:
+        """Fail a job whose worker went away before it finished."""
+        if job.is_finished:
+            return
+        job.status = ScanJobStatus.FAILED
+        job.error = "Scan was interrupted. Please try again."
+        job.run = None
+        job.finished_at = time.time()
+        job._notify()
+
+    async def _process(self, job: ScanJob) -> None:
+        job.status = ScanJobStatus.PROCESSING
+        job.started_at = time.time()
+        job._notify()
+        self._running[job.id] = job
+        try:
+            job.result = await job.run()
+            success = getattr(job.result, "is_success", True)
+            job.status = ScanJobStatus.COMPLETED if success else ScanJobStatus.FAILED
+            if not success:
+                job.error = getattr(job.result, "err_msg", None)
+        except asyncio.CancelledError:
+            self._interrupt(job)
+            raise
+        except Exception as e:
+            logger.error("Scan job %s failed: %s", job.id, e)
+            job.status = ScanJobStatus.FAILED
+            job.error = str(e)
+        finally:
+            self._running.pop(job.id, None)
+            job.run = None  # release the image bytes held by the closure
+            job.finished_at = time.time()
+            job._notify()
+            logger.info(
+                "Scan job %s %s in %.2fs (waited %.2fs)",
+                job.id, job.status.value,
+                job.finished_at - job.started_at, job.started_at - job.created_at,
+            )
+
+
+_queue: Optional[ScanJobQueue] = None
+
+
+def get_scan_job_queue() -> ScanJobQueue:
+    """Get or create the shared scan job queue."""
+    global _queue
+    if _queue is None:
+        _queue = ScanJobQueue(
+            workers=settings.SCAN_JOB_WORKERS,
+            max_queue=settings.SCAN_JOB_QUEUE_SIZE,
+            result_ttl=settings.SCAN_JOB_RESULT_TTL_SECONDS,
+        )
+    return _queue
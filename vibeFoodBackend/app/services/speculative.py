@@ -0,0 +1,198 @@
+"""
+Speculative recommendation precomputation.
+
+After a scan the user reads the restaurant intro for several seconds before
+picking a vibe. When SPECULATIVE_RECOMMENDATIONS_ENABLED is set, the scan
+endpoint starts background generations for the vibes this user is most
+likely to pick: their own favorites first, then the most popular vibes
+overall. Results land in the recommendation cache, and a /recommendation
+request that arrives while one is still running joins it.
+
+Speculation only uses spare capacity: each device gets a budget of
+SPECULATIVE_DEVICE_BUDGET generations per window, at most
+SPECULATIVE_MAX_CONCURRENT run at once, and calls are scheduled as the
+lowest-priority "speculative" operation and only started while the
+rate-limit scheduler has headroom. Vibes that do not fit are skipped
+rather than queued, so a real request never joins a flight that is still
+waiting for a slot.
+
+Vibe history is kept in memory; it only steers which vibes to warm up.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.models.enums import VibeType
+from app.services import llm_service
+from app.services.recommendation_cache import (
+    get_cached_recommendations,
+    get_recommendation_flights,
+    menu_fingerprint,
+    recommendation_cache_key,
+)
+from app.services.openai_scheduler import estimate_call_tokens, get_openai_scheduler
+
+logger = logging.getLogger(__name__)
+
+_history: Optional["VibeHistory"] = None
+_budget: Optional["SpeculationBudget"] = None
+_running = 0
+
+
+class VibeHistory:
+    """Per-device and global vibe selection counts (bounded by device count)."""
+
+    def __init__(self, max_devices: int):
+        self.max_devices = max_devices
+        self._devices: "OrderedDict[str, Counter]" = OrderedDict()
+        self._global: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, device_id: str, vibe: str) -> None:
+        with self._lock:
+            counts = self._devices.pop(device_id, None) or Counter()
+            counts[vibe] += 1
+            self._devices[device_id] = counts
+            while len(self._devices) > self.max_devices:
+                self._devices.popitem(last=False)
+            self._global[vibe] += 1
+
+    def likely_vibes(self, device_id: str, limit: int) -> List[str]:
+        """Device favorites, then global favorites, then the default vibe order."""
+        with self._lock:
+            device_counts = self._devices.get(device_id) or Counter()
+            ranked = [v for v, _ in device_counts.most_common()]
+            ranked += [v for v, _ in self._global.most_common() if v not in ranked]
+        ranked += [v.value for v in VibeType if v.value not in ranked]
+        return ranked[:limit]
+
+
+class SpeculationBudget:
+    """Sliding-window count of speculative generations per device (bounded by device count)."""
+
+    def __init__(self, limit: int, window_seconds: float, max_devices: int, clock: Callable[[], float] = time.monotonic):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.max_devices = max_devices
+        self._clock = clock
+        self._devices: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, device_id: str) -> bool:
+        """Spend one generation from the device's budget; False if it is used up."""
+        now = self._clock()
+        with self._lock:
+            spent = self._devices.pop(device_id, None) or deque()
+            while spent and now - spent[0] >= self.window_seconds:
+                spent.popleft()
+            allowed = len(spent) < self.limit
+            if allowed:
+                spent.append(now)
+            self._devices[device_id] = spent
+            while len(self._devices) > self.max_devices:
+                self._devices.popitem(last=False)
+            return allowed
+
+
+def get_vibe_history() -> VibeHistory:
+    """Get or create the shared vibe history."""
+    global _history
+    if _history is None:
+        _history = VibeHistory(max_devices=settings.SPECULATIVE_HISTORY_DEVICES)
+    return _history
+
+
+def record_vibe(device_id: str, vibe: str) -> None:
+    """Remember a fixed-vibe selection (voice prompts are not predictable)."""
+    if vibe != "voice":
+        get_vibe_history().record(device_id, vibe)
+
+
+def get_speculation_budget() -> SpeculationBudget:
+    """Get or create the shared per-device speculation budget."""
+    global _budget
+    if _budget is None:
+        _budget = SpeculationBudget(
+            limit=settings.SPECULATIVE_DEVICE_BUDGET,
+            window_seconds=settings.SPECULATIVE_BUDGET_WINDOW_SECONDS,
+            max_devices=settings.SPECULATIVE_HISTORY_DEVICES,
+        )
+    return _budget
+
+
+def _has_capacity() -> bool:
+    """A free speculation slot and rate-limit headroom to start right away."""
+    if _running >= settings.SPECULATIVE_MAX_CONCURRENT:
+        return False
+    scheduler = get_openai_scheduler()
+    return scheduler is None or scheduler.has_headroom("speculative", estimate_call_tokens("speculative"))
+
+
+async def _speculate(cache_key: str, vibe: str, menu_json: Dict, preference: str) -> Dict:
+    return await llm_service.generate_and_cache(
+        cache_key,
+        menu_json.get("items", []),
+        vibe,
+        preference,
+        restaurant_info=menu_json.get("restaurant"),
+        menu_language=menu_json.get("menu_language"),
+        schedule_as="speculative",
+    )
+
+
+def _finished(task: "asyncio.Task") -> None:
+    global _running
+    _running -= 1
+    if not task.cancelled() and task.exception() is not None:
+        logger.info("Speculative recommendation failed: %s", task.exception())
+
+
+def schedule_recommendations(device_id: str, menu_json: Dict, preference: Optional[str]) -> List[str]:
+    """
+    Start background generations for the device's most likely vibes.
+
+    Vibes that are already cached or running are skipped, and so are vibes
+    beyond the device's budget or the spare capacity. Returns the vibes
+    that were started. No-op unless speculation is enabled and an API key
+    is configured (the dev-mode fallback is instant anyway).
+    """
+    global _running
+    if not (settings.SPECULATIVE_RECOMMENDATIONS_ENABLED and settings.OPENAI_API_KEY):
+        return []
+    items = menu_json.get("items") or []
+    if not items:
+        return []
+
+    preference = preference or "no_restriction"
+    fingerprint = menu_fingerprint(items, menu_json.get("restaurant"))
+    flights = get_recommendation_flights()
+    started = []
+    for vibe in get_vibe_history().likely_vibes(device_id, settings.SPECULATIVE_VIBES_PER_SCAN):
+        cache_key = recommendation_cache_key(fingerprint, vibe, preference, menu_json.get("menu_language"))
+        if flights.get(cache_key) is not None or get_cached_recommendations(cache_key) is not None:
+            continue
+        if not _has_capacity() or not get_speculation_budget().take(device_id):
+            break
+        task = flights.start(
+            cache_key,
+            lambda cache_key=cache_key, vibe=vibe: _speculate(cache_key, vibe, menu_json, preference),
+        )
+        _running += 1
+        task.add_done_callback(_finished)
+        started.append(vibe)
+
+    if started:
+        logger.info("Speculative recommendations started for %s: %s", device_id, ", ".join(started))
+    return started
+
+
+def reset_speculation() -> None:
+    """Forget vibe history and budgets (used by tests)."""
+    global _history, _budget, _running
+    _history = None
+    _budget = None
+    _running = 0
@@ -0,0 +1,333 @@
+"""
+Generic caching primitives shared by services.
+
+TieredCache combines an in-process LRU tier with an optional persistent
+SQLite tier. Values must be JSON-serializable so they survive restarts.
+Async callers use aget/aset, which run the SQLite tier in a worker thread
+so disk reads, writes and commits do not block the event loop.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a cache instance."""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class LRUCache:
+    """In-process LRU cache with an optional time-to-live per entry."""
+
+    def __init__(self, max_size: int, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Like get, but leaves the entry's recency unchanged."""
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+            return None
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    Persistent key/value tier stored in a SQLite file.
+
+    Entries expire after ttl_seconds. When the total payload size exceeds
+    max_bytes, or the row count exceeds max_entries, the least recently
+    accessed entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "cache",
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.path = path
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_accessed ON {table} (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(value)
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Like get, but without updating the entry's access time."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then oldest-accessed rows until under max_entries and max_bytes."""
+        if self.ttl_seconds is not None:
+            cursor = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+        if self.max_entries is not None:
+            excess = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_entries
+            if excess > 0:
+                cursor = self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += max(cursor.rowcount, 0)
+        if self.max_bytes is None:
+            return
+        total = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def items(self, limit: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """Unexpired entries, most recently accessed first (does not touch accessed_at)."""
+        cutoff = time.time() - self.ttl_seconds if self.ttl_seconds is not None else float("-inf")
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, value FROM {self.table} WHERE created_at >= ? "
+                "ORDER BY accessed_at DESC LIMIT ?",
+                (cutoff, -1 if limit is None else limit),
+            ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class TieredCache:
+    """
+    Two-tier cache: in-process LRU in front of an optional SQLite tier.
+
+    Disk hits are promoted into the memory tier. Both tiers share the same TTL.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        memory_size: int,
+        ttl_seconds: Optional[float] = None,
+        disk_path: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None,
+    ):
+        self.name = name
+        self.stats = CacheStats()
+        self.memory = LRUCache(memory_size, ttl_seconds)
+        self.disk: Optional[SQLiteCache] = None
+        if disk_path:
+            self.disk = SQLiteCache(
+                disk_path, table=name, ttl_seconds=ttl_seconds, max_bytes=disk_max_bytes
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get_memory(key)
+        if value is None and self.disk is not None:
+            value = self._disk_result(key, self.disk.get(key))
+        return value if value is not None else self._miss()
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get for async callers: the disk tier is read in a worker thread."""
+        value = self._get_memory(key)
+        if value is None and self.disk is not None:
+            value = self._disk_result(key, await asyncio.to_thread(self.disk.get, key))
+        return value if value is not None else self._miss()
+
+    def _get_memory(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.memory_hits += 1
+        return value
+
+    def _disk_result(self, key: str, value: Optional[Any]) -> Optional[Any]:
+        if value is not None:
+            self.stats.disk_hits += 1
+            self.memory.set(key, value)
+        return value
+
+    def _miss(self) -> None:
+        self.stats.misses += 1
+        return None
+
+    def peek(self, key: str) -> Optional[Any]:
+        """
+        Read an entry without counting a lookup, promoting it or refreshing
+        its recency (for read-modify-write updates).
+        """
+        value = self.memory.peek(key)
+        if value is None and self.disk is not None:
+            value = self.disk.peek(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.stats.sets += 1
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+        self._count_evictions()
+
+    async def aset(self, key: str, value: Any) -> None:
+        """set for async callers: the disk tier is written in a worker thread."""
+        self.stats.sets += 1
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value)
+        self._count_evictions()
+
+    def _count_evictions(self) -> None:
+        self.stats.evictions = self.memory.evictions + (self.disk.evictions if self.disk else 0)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        self.stats = CacheStats()
@@ -0,0 +1,116 @@
+"""
+Circuit breaker for calls to a degraded upstream service.
+
+The breaker keeps the outcomes of the last N calls. Once enough of them
+failed it opens: calls are rejected immediately with
+UpstreamUnavailableError, so callers can go straight to their fallback
+instead of waiting for a timeout. After a cool-down it lets a single probe
+call through (half-open); the probe's outcome closes or re-opens it.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict
+
+from app.utils.errors import UpstreamUnavailableError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Failure-rate breaker over a window of recent call outcomes."""
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int,
+        failure_ratio: float,
+        min_calls: int,
+        open_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)  # True = failure
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """Raise UpstreamUnavailableError if the call must not go upstream now."""
+        with self._lock:
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    raise UpstreamUnavailableError(message=f"{self.name} is temporarily unavailable")
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN:
+                if self._probing:
+                    self.rejected += 1
+                    raise UpstreamUnavailableError(message=f"{self.name} is temporarily unavailable")
+                self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._probing = False
+                self._outcomes.clear()
+            self._outcomes.append(False)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trip()
+                return
+            self._outcomes.append(True)
+            failures = sum(self._outcomes)
+            if (
+                self._state == CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and failures >= self.failure_ratio * len(self._outcomes)
+            ):
+                self._trip()
+
+    def release(self) -> None:
+        """Give up a half-open probe slot without an outcome (e.g. cancelled call)."""
+        with self._lock:
+            self._probing = False
+
+    def _trip(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probing = False
+        self._outcomes.clear()
+        self.opened += 1
+        logger.warning("Circuit breaker %s opened for %.0fs", self.name, self.open_seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            failures = sum(self._outcomes)
+            calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "recent_calls": calls,
+            "recent_failures": failures,
+            "rejected": self.rejected,
+            "opened": self.opened,
+        }
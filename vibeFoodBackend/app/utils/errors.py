@@ -1,7 +1,8 @@
 """
 Custom exceptions for Vibe-Food application.
 Standard error codes: invalid_request, validation_failed, not_found,
-session_expired, rate_limited, ocr_failed, llm_failed, timeout, internal_error
+session_expired, rate_limited, ocr_failed, llm_failed, timeout,
+upstream_unavailable, scan_queue_full, internal_error
 """
 from typing import Optional, Dict, Any
 
@@ -95,6 +96,20 @@ class TimeoutError(AppError):
     message = "Operation timed out"
 
 
+class UpstreamUnavailableError(AppError):
+    """An upstream service is failing and its circuit breaker is open."""
+    error_code = "upstream_unavailable"
+    status_code = 503
+    message = "Service temporarily unavailable"
+
+
+class ScanQueueFullError(AppError):
+    """The scan job queue is at capacity."""
+    error_code = "scan_queue_full"
+    status_code = 503
+    message = "Scan queue is full. Please try again shortly."
+
+
 class InvalidSessionStepError(InvalidRequestError):
     """Operation not allowed at current session step."""
     message = "Operation not allowed at current session step"
@@ -0,0 +1,111 @@
+"""
+Incremental parser for a streamed top-level JSON object.
+
+LLM responses in json_object mode arrive token by token. The parser is fed
+those chunks and reports each element of selected array fields (e.g. menu
+"items") as soon as the element is complete, plus every other top-level
+field once its value is complete. It never re-scans text it has seen.
+"""
+import json
+from typing import Any, Iterable, List, Optional, Tuple
+
+# (kind, key, value): kind is "item" for an array element, "field" otherwise
+StreamEvent = Tuple[str, str, Any]
+
+_WHITESPACE = " \t\r\n"
+
+
+class JSONStreamParser:
+    """Emit completed array elements and top-level fields from a JSON object stream."""
+
+    def __init__(self, array_keys: Iterable[str] = ()):
+        self.array_keys = set(array_keys)
+        self.text = ""
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._value_start: Optional[int] = None
+        self._in_array = False
+        self._array_consumed = False
+        self._element_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[StreamEvent]:
+        """Consume the next chunk and return any events it completed."""
+        self.text += chunk
+        text = self.text
+        events: List[StreamEvent] = []
+        i = self._pos
+        while i < len(text):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._key_start = None
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None:
+                    self._key_start = i
+                else:
+                    self._mark_value_start(i)
+            elif ch in "{[":
+                if self._depth == 1 and self._key is not None and self._value_start is None:
+                    self._value_start = i
+                    if ch == "[" and self._key in self.array_keys:
+                        self._in_array = True
+                elif self._depth == 2 and self._in_array and self._element_start is None:
+                    self._element_start = i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 2 and self._in_array and self._element_start is not None:
+                    events.append(("item", self._key, json.loads(text[self._element_start:i + 1])))
+                    self._element_start = None
+                elif self._depth == 1 and self._in_array:
+                    self._emit_scalar_element(text, i, events)
+                    self._in_array = False
+                    self._array_consumed = True
+                elif self._depth == 0:
+                    self._finish_value(text, i, events)
+                    self.done = True
+            elif ch == ",":
+                if self._depth == 1:
+                    self._finish_value(text, i, events)
+                elif self._depth == 2 and self._in_array:
+                    self._emit_scalar_element(text, i, events)
+            elif ch not in _WHITESPACE and ch != ":":
+                self._mark_value_start(i)
+            i += 1
+        self._pos = i
+        return events
+
+    def result(self) -> Any:
+        """Parse the complete document (call after the stream has ended)."""
+        return json.loads(self.text)
+
+    def _mark_value_start(self, i: int) -> None:
+        if self._depth == 1 and self._key is not None and self._value_start is None:
+            self._value_start = i
+        elif self._depth == 2 and self._in_array and self._element_start is None:
+            self._element_start = i
+
+    def _emit_scalar_element(self, text: str, end: int, events: List[StreamEvent]) -> None:
+        if self._element_start is not None:
+            events.append(("item", self._key, json.loads(text[self._element_start:end])))
+            self._element_start = None
+
+    def _finish_value(self, text: str, end: int, events: List[StreamEvent]) -> None:
+        if self._key is not None and self._value_start is not None and not self._array_consumed:
+            events.append(("field", self._key, json.loads(text[self._value_start:end])))
+        self._key = None
+        self._value_start = None
+        self._array_consumed = False
@@ -0,0 +1,105 @@
+"""
+Single-flight coalescing of concurrent identical calls.
+
+Double-taps and client retries used to start a second OCR or GPT-4o call
+for the same inputs while the first was still running. A SingleFlight
+group runs one task per key; every caller that arrives while it is running
+awaits that same task. The work is shielded, so a caller that disconnects
+does not cancel it for the others.
+
+Groups are named and kept in a registry so their counters can be reported:
+`calls` is upstream executions, `coalesced` is calls that were saved.
+"""
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+_groups: Dict[str, "SingleFlight"] = {}
+_groups_lock = threading.Lock()
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters for one single-flight group."""
+    calls: int = 0
+    coalesced: int = 0
+    failures: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "failures": self.failures}
+
+
+class SingleFlight:
+    """Runs at most one task per key at a time (per event loop)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stats = SingleFlightStats()
+        self._tasks: Dict[str, "asyncio.Task"] = {}
+
+    def get(self, key: str) -> Optional["asyncio.Task"]:
+        """The running task for key, if it belongs to this event loop."""
+        task = self._tasks.get(key)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    def start(self, key: str, fn: Callable[[], Awaitable[T]]) -> "asyncio.Task":
+        """Return the running task for key, or start fn() as the new one."""
+        task = self.get(key)
+        if task is not None:
+            self.stats.coalesced += 1
+            return task
+
+        task = asyncio.get_running_loop().create_task(fn(), name=f"{self.name}-{key[:12]}")
+        self._tasks[key] = task
+        self.stats.calls += 1
+
+        def _done(finished: "asyncio.Task") -> None:
+            if self._tasks.get(key) is finished:
+                del self._tasks[key]
+            if not finished.cancelled() and finished.exception() is not None:
+                self.stats.failures += 1
+
+        task.add_done_callback(_done)
+        return task
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await fn() for key, sharing the result (or exception) with every
+        concurrent caller using the same key. Callers must not mutate a
+        shared result.
+        """
+        return await asyncio.shield(self.start(key, fn))
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def clear(self) -> None:
+        self._tasks.clear()
+        self.stats = SingleFlightStats()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Get or create the named single-flight group."""
+    with _groups_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = _groups[name] = SingleFlight(name)
+        return group
+
+
+def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters of every group, by name."""
+    with _groups_lock:
+        return {name: group.stats.to_dict() for name, group in _groups.items()}
+
+
+def reset_single_flights() -> None:
+    """Forget running tasks and counters (used by tests)."""
+    with _groups_lock:
+        for group in _groups.values():
+            group.clear()
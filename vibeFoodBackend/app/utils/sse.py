@@ -0,0 +1,21 @@
+"""
+Server-Sent Events helpers.
+"""
+import json
+from typing import Any
+
+from pydantic import BaseModel
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # disable proxy buffering so events flush immediately
+}
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one SSE message. Pydantic models are serialized with model_dump_json."""
+    if isinstance(data, BaseModel):
+        payload = data.model_dump_json()
+    else:
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
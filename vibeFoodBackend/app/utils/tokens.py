@@ -0,0 +1,54 @@
+"""
+Local prompt token counting.
+
+Uses tiktoken when it is installed (exact counts for OpenAI models).
+Otherwise a regex approximation of byte-pair encoding is used: a Latin
+word is one token per ~7 letters, digits go in groups of three, each CJK
+character is one token and short punctuation runs merge into one. That is
+close enough to log prompt size and compare encodings.
+"""
+import logging
+import re
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+_APPROX_PATTERN = re.compile(
+    r"[A-Za-z]+|\d{1,3}|[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff]|[^\w\s]{1,3}|\S"
+)
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        try:
+            return tiktoken.get_encoding("o200k_base")
+        except Exception as e:  # encodings are downloaded on first use
+            logger.warning("tiktoken encoding unavailable, estimating tokens: %s", e)
+            return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count without a tokenizer."""
+    count = 0
+    for match in _APPROX_PATTERN.findall(text):
+        count += (len(match) + 6) // 7 if match[0].isascii() and match[0].isalpha() else 1
+    return count
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """Token count for text under model's tokenizer (estimated if tiktoken is missing)."""
+    encoding: Optional[object] = _encoding(model) if TIKTOKEN_AVAILABLE else None
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text))
@@ -0,0 +1,103 @@
+"""
+Memory and serialization benchmark: list of MenuItem + per-item dicts vs MenuTable.
+
+Run from vibeFoodBackend/:
+    python -m benchmarks.bench_menu_table [--items 5000] [--repeat 5]
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from uuid import uuid4
+
+from app.services.menu_table import MenuItem, MenuTable
+
+TAGS = ["popular", "spicy", "healthy", "sweet", "vegetarian", "chef special", "new", "mild"]
+ALLERGENS = ["gluten", "dairy", "eggs", "peanuts", "soy", "fish", "shellfish", "sesame"]
+CATEGORIES = ["Appetizers", "Soups", "Salads", "Mains", "Noodles", "Curries", "Desserts", "Drinks"]
+
+
+def synthetic_items(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"Dish {n} {rng.choice(['Special', 'Classic', 'House'])}",
+            "description": f"Synthetic description for dish number {n}",
+            "price": round(rng.uniform(3, 40), 2),
+            "currency": "USD",
+            "category": rng.choice(CATEGORIES),
+            "tags": rng.sample(TAGS, rng.randint(0, 3)),
+            "allergens": rng.sample(ALLERGENS, rng.randint(0, 3)),
+            "spice_level": rng.randint(0, 5),
+            "is_vegetarian": rng.random() < 0.3,
+            "is_vegan": rng.random() < 0.1,
+        }
+        for n in range(count)
+    ]
+
+
+def build_objects(raw: list) -> tuple:
+    """The previous layout: MenuItem list plus a second list of JSON dicts."""
+    items = [MenuItem(id=str(uuid4()), confidence=0.9, **d) for d in raw]
+    as_json = [
+        {
+            "id": i.id, "name": i.name, "description": i.description, "price": i.price,
+            "currency": i.currency, "category": i.category, "tags": i.tags,
+            "allergens": i.allergens, "spice_level": i.spice_level,
+            "is_vegetarian": i.is_vegetarian, "is_vegan": i.is_vegan,
+        }
+        for i in items
+    ]
+    return items, as_json
+
+
+def build_table(raw: list) -> MenuTable:
+    table = MenuTable()
+    for d in raw:
+        table.append(id=str(uuid4()), confidence=0.9, **d)
+    return table
+
+
+def measure_memory(build, raw: list) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build(raw)  # noqa: F841 - held so the allocation is still live
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    raw = synthetic_items(args.items)
+    objects_bytes = measure_memory(build_objects, raw)
+    table_bytes = measure_memory(build_table, raw)
+
+    _, as_json = build_objects(raw)
+    table = build_table(raw)
+    objects_time = best_of(lambda: json.dumps(as_json), args.repeat)
+    table_time = best_of(lambda: json.dumps(table.to_json()), args.repeat)
+
+    print(f"{args.items} items")
+    print(f"  memory   objects+dicts: {objects_bytes / 1024:9.1f} KiB")
+    print(f"  memory   MenuTable:     {table_bytes / 1024:9.1f} KiB  ({table_bytes / objects_bytes:.0%})")
+    print(f"  json     objects+dicts: {objects_time * 1000:9.2f} ms")
+    print(f"  json     MenuTable:     {table_time * 1000:9.2f} ms  (includes building the dicts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Prompt size benchmark: indented JSON menu (original) vs compact table encoding,
+and the table after local top-K pre-ranking.
+
+Run from vibeFoodBackend/:
+    python -m benchmarks.bench_prompt_encoding [--sizes 20 60 150] [--live]
+
+Token counts use tiktoken when installed, otherwise the local estimate.
+--live additionally measures time-to-first-token for both encodings with
+a real streaming GPT-4o call (needs OPENAI_API_KEY; costs a few cents).
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from app.services.candidate_ranker import select_candidates
+from app.services.llm_service import RECOMMENDATION_SYSTEM_PROMPT
+from app.services.menu_prompt import encode_menu_json, encode_menu_table
+from app.utils.tokens import TIKTOKEN_AVAILABLE, count_tokens
+from benchmarks.bench_menu_table import synthetic_items
+
+CJK_DISHES = ["宫保鸡丁", "麻婆豆腐", "鱼香肉丝", "水煮牛肉", "回锅肉", "酸辣汤", "担担面", "小笼包"]
+
+
+def stored_items(count: int, cjk: bool = False) -> list:
+    """Synthetic items in the exact shape stored on the profile."""
+    items = []
+    for n, raw in enumerate(synthetic_items(count)):
+        if cjk:
+            raw["name"] = f"{CJK_DISHES[n % len(CJK_DISHES)]}{n}"
+            raw["description"] = "经典川菜，香辣可口"
+            raw["currency"] = "CNY"
+        items.append({"id": str(uuid4()), **raw})
+    return items
+
+
+def encode_time(encode, items: list, repeat: int = 20) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        encode(items)
+    return (time.perf_counter() - started) / repeat
+
+
+async def compare_time_to_first_token(as_json: str, as_table: str) -> tuple:
+    return await time_to_first_token(as_json), await time_to_first_token(as_table)
+
+
+async def time_to_first_token(menu_text: str) -> float:
+    from app.services.openai_client import get_openai_client
+
+    client = get_openai_client()
+    started = time.perf_counter()
+    stream = await client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": RECOMMENDATION_SYSTEM_PROMPT},
+            {"role": "user", "content": f"User's vibe: comfort\nMenu items:\n{menu_text}"},
+        ],
+        response_format={"type": "json_object"},
+        stream=True,
+        max_tokens=16,
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            return time.perf_counter() - started
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 60, 150])
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    print(f"token counter: {'tiktoken' if TIKTOKEN_AVAILABLE else 'estimate'}")
+    for cjk in (False, True):
+        for size in args.sizes:
+            items = stored_items(size, cjk=cjk)
+            as_json, as_table = encode_menu_json(items), encode_menu_table(items)
+            json_tokens, table_tokens = count_tokens(as_json), count_tokens(as_table)
+            label = f"{size:4d} items {'zh' if cjk else 'en'}"
+            print(
+                f"{label}  json {json_tokens:6d} tok  table {table_tokens:6d} tok "
+                f"({table_tokens / json_tokens:.0%})  encode json {encode_time(encode_menu_json, items) * 1e3:.2f} ms"
+                f" / table {encode_time(encode_menu_table, items) * 1e3:.2f} ms"
+            )
+            started = time.perf_counter()
+            candidates = select_candidates(items, "comfort", "vegetarian")
+            rank_ms = (time.perf_counter() - started) * 1e3
+            ranked_tokens = count_tokens(encode_menu_table(candidates))
+            print(
+                f"{label}  pre-ranked {len(candidates):4d} items  table {ranked_tokens:6d} tok "
+                f"({ranked_tokens / json_tokens:.0%})  rank {rank_ms:.2f} ms (cold feature build)"
+            )
+            if args.live:
+                json_ttft, table_ttft = asyncio.run(compare_time_to_first_token(as_json, as_table))
+                print(f"{label}  time to first token: json {json_ttft:.2f}s  table {table_ttft:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 
 from app.core.database import Base, get_db
@@ -14,7 +15,12 @@ from app.main import app
 
 # In-memory SQLite for tests
 TEST_DATABASE_URL = "sqlite:///:memory:"
-test_engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+test_engine = create_engine(
+    TEST_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    # One shared connection, so every session sees the same in-memory database
+    poolclass=StaticPool,
+)
 TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
 
@@ -31,11 +37,44 @@ def setup_db():
     """Create tables before each test, drop after."""
     Base.metadata.create_all(bind=test_engine)
     app.dependency_overrides[get_db] = override_get_db
-    yield
+    # Sessions opened outside the request (streams, scan jobs, background saves)
+    with patch("app.api.v1.endpoints.scan.SessionLocal", TestSessionLocal), \
+            patch("app.api.v1.endpoints.recommendation.SessionLocal", TestSessionLocal):
+        yield
     Base.metadata.drop_all(bind=test_engine)
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def reset_caches():
+    """Start every test with empty in-process caches."""
+    from app.services.intro_cache import reset_intro_cache
+    from app.services.ocr_cache import reset_ocr_cache
+    from app.services.openai_client import reset_call_stats
+    from app.services.openai_scheduler import reset_openai_scheduler
+    from app.services.recommendation_cache import reset_recommendation_cache
+    from app.services.speculative import reset_speculation
+    from app.utils.metrics import REGISTRY
+    from app.utils.singleflight import reset_single_flights
+    reset_ocr_cache()
+    reset_intro_cache()
+    reset_recommendation_cache()
+    reset_speculation()
+    reset_single_flights()
+    reset_call_stats()
+    reset_openai_scheduler()
+    REGISTRY.clear()
+    yield
+    reset_ocr_cache()
+    reset_intro_cache()
+    reset_recommendation_cache()
+    reset_speculation()
+    reset_single_flights()
+    reset_call_stats()
+    reset_openai_scheduler()
+    REGISTRY.clear()
+
+
 @pytest.fixture
 def client():
     """FastAPI test client."""
@@ -48,7 +87,7 @@ def registered_device(client):
     device_id = "test-device-001"
     res = client.post("/api/v1/register", json={
         "device_id": device_id,
-        "preference": "no_restriction",
+        "preference": ["no_restriction"],
     })
     assert res.status_code == 200
     assert res.json()["is_success"] is True
@@ -105,6 +144,20 @@ def mock_openai_ocr():
         yield mock_extract
 
 
+@pytest.fixture
+def mock_openai_ocr_stream():
+    """Mock streaming OpenAI Vision API: yields the OCR JSON in small chunks."""
+    import json
+    content = json.dumps(MOCK_OCR_RESPONSE)
+
+    async def fake_stream(image_base64):
+        for i in range(0, len(content), 7):
+            yield content[i:i + 7]
+
+    with patch("app.services.ocr_service._stream_extract_with_openai", side_effect=fake_stream) as mock_stream:
+        yield mock_stream
+
+
 @pytest.fixture
 def mock_openai_rec():
     """Mock OpenAI API for recommendations."""
@@ -113,11 +166,25 @@ def mock_openai_rec():
         yield mock_call
 
 
+@pytest.fixture
+def mock_openai_rec_stream():
+    """Mock streaming OpenAI API for recommendations: yields the JSON in small chunks."""
+    import json
+    content = json.dumps(MOCK_REC_RESPONSE)
+
+    async def fake_stream(*args, **kwargs):
+        for i in range(0, len(content), 7):
+            yield content[i:i + 7]
+
+    with patch("app.services.llm_service._stream_openai", side_effect=fake_stream) as mock_stream:
+        yield mock_stream
+
+
 @pytest.fixture
 def mock_openai_key():
     """Ensure OPENAI_API_KEY is set so services don't use fallback."""
-    with patch("app.services.ocr_service.settings") as mock_ocr_settings, \
-         patch("app.services.llm_service.settings") as mock_llm_settings:
-        mock_ocr_settings.OPENAI_API_KEY = "sk-test-fake-key"
-        mock_llm_settings.OPENAI_API_KEY = "sk-test-fake-key"
+    from app.core.config import settings
+    test_settings = settings.model_copy(update={"OPENAI_API_KEY": "sk-test-fake-key"})
+    with patch("app.services.ocr_service.settings", test_settings), \
+         patch("app.services.llm_service.settings", test_settings):
         yield
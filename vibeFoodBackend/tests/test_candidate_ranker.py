@@ -0,0 +1,84 @@
+"""
+Unit tests for local candidate pre-ranking.
+"""
+from unittest.mock import patch
+
+import pytest
+
+from app.services import candidate_ranker
+from app.services.candidate_ranker import PREFERENCES, VIBES, build_features, score_menu, select_candidates
+from tests.conftest import MOCK_OCR_RESPONSE
+
+pytestmark = pytest.mark.skipif(not candidate_ranker.NUMPY_AVAILABLE, reason="numpy not installed")
+
+
+def _menu(filler: int = 60):
+    dishes = [
+        {"name": "Garden Salad", "description": "Fresh greens", "price": 8.0, "category": "Salads", "is_vegetarian": True, "is_vegan": True},
+        {"name": "Chocolate Lava Cake", "description": "Rich molten chocolate with cream", "price": 11.0, "category": "Desserts", "allergens": ["dairy", "eggs"], "is_vegetarian": True},
+        {"name": "Fried Chicken Bucket", "description": "Crispy fried chicken", "price": 24.0, "category": "Mains", "tags": ["popular"]},
+        {"name": "Mapo Tofu", "description": "Fermented bean sauce", "price": 14.0, "category": "Mains", "spice_level": 4, "is_vegetarian": True},
+        {"name": "Pork Belly Buns", "description": "Braised pork in a soft bun", "price": 9.0, "category": "Snacks", "allergens": ["gluten"]},
+    ]
+    dishes += [
+        {"name": f"Plain Dish {n}", "description": "House plate", "price": 15.0 + n % 7, "category": "Mains"}
+        for n in range(filler)
+    ]
+    return [dict(d, id=f"id-{n}", currency="USD") for n, d in enumerate(dishes)]
+
+
+class TestFeatures:
+    def test_keywords_match_whole_words(self):
+        features = build_features([{"name": "Hamburger with coconut", "description": "steak fries", "tags": []}])
+        index = candidate_ranker.FEATURE_INDEX
+        assert features[0, index["pork"]] == 0  # "ham" inside "hamburger"
+        assert features[0, index["allergen_nuts"]] == 0  # "nut" inside "coconut"
+        assert features[0, index["drink"]] == 0  # "tea" inside "steak"
+        assert features[0, index["fried"]] == 1
+
+    def test_scores_cover_every_vibe_and_preference(self):
+        vibe_scores, conflicts = score_menu(MOCK_OCR_RESPONSE["items"])
+        assert vibe_scores.shape == (4, len(VIBES))
+        assert conflicts.shape == (4, len(PREFERENCES))
+        assert (conflicts >= 0).all()
+
+
+class TestSelectCandidates:
+    def test_small_menus_pass_through(self):
+        items = MOCK_OCR_RESPONSE["items"]
+        assert select_candidates(items, "light", "vegetarian") is items
+
+    def test_voice_passes_through(self):
+        items = _menu()
+        assert select_candidates(items, "voice", "no_restriction") is items
+
+    def test_top_k_in_menu_order(self):
+        items = _menu()
+        chosen = select_candidates(items, "indulgent", "no_restriction", top_k=5)
+        assert len(chosen) == 5
+        assert "Chocolate Lava Cake" in [i["name"] for i in chosen]
+        positions = [items.index(i) for i in chosen]
+        assert positions == sorted(positions)
+
+    def test_preference_conflicts_are_demoted(self):
+        items = _menu()
+        chosen = [i["name"] for i in select_candidates(items, "comfort", "vegetarian", top_k=3)]
+        assert "Fried Chicken Bucket" not in chosen
+        assert "Pork Belly Buns" not in chosen
+        assert "Mapo Tofu" in chosen
+
+    def test_prompt_receives_candidates_only(self, mock_openai_key, mock_openai_rec):
+        import asyncio
+        from app.services import llm_service
+
+        items = _menu()
+        asyncio.run(llm_service.generate_recommendations(items, "light", "no_restriction"))
+        sent = mock_openai_rec.call_args[0][0]
+        assert len(sent) == candidate_ranker.settings.RECOMMENDATION_PRERANK_TOP_K
+        assert "Garden Salad" in [i["name"] for i in sent]
+
+    def test_disabled_setting(self):
+        items = _menu()
+        disabled = candidate_ranker.settings.model_copy(update={"RECOMMENDATION_PRERANK_ENABLED": False})
+        with patch("app.services.candidate_ranker.settings", disabled):
+            assert select_candidates(items, "light", "no_restriction") is items
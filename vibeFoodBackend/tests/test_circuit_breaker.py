@@ -0,0 +1,131 @@
+"""
+Unit tests for the circuit breaker and its use around OpenAI calls.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.services import llm_service, openai_client
+from app.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.utils.errors import UpstreamUnavailableError
+from tests.conftest import MOCK_OCR_RESPONSE
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker(clock):
+    return CircuitBreaker("test", window_size=10, failure_ratio=0.5, min_calls=4, open_seconds=30, clock=clock)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_failure_ratio(self):
+        breaker = _breaker(FakeClock())
+        for failed in (False, True, True):
+            breaker.before_call()
+            breaker.record_failure() if failed else breaker.record_success()
+        assert breaker.state == CLOSED  # below min_calls
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        with pytest.raises(UpstreamUnavailableError):
+            breaker.before_call()
+        assert breaker.rejected == 1
+
+    def test_half_open_allows_one_probe(self):
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        for _ in range(4):
+            breaker.record_failure()
+        clock.now = 31
+        assert breaker.state == HALF_OPEN
+        breaker.before_call()
+        with pytest.raises(UpstreamUnavailableError):
+            breaker.before_call()  # only one probe at a time
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        breaker.before_call()
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        for _ in range(4):
+            breaker.record_failure()
+        clock.now = 31
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.opened == 2
+
+
+class TestAdaptiveTimeout:
+    def test_timeout_follows_observed_latency(self):
+        window = openai_client.get_latency_window("recommendation")
+        assert openai_client.adaptive_timeout("recommendation", 20.0) == 20.0
+        for _ in range(settings.OPENAI_ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+            window.record(4.0)
+        assert openai_client.adaptive_timeout("recommendation", 20.0) == 8.0
+        assert openai_client.adaptive_timeout("recommendation", 6.0) == 6.0
+        for _ in range(settings.OPENAI_LATENCY_WINDOW_SIZE):
+            window.record(0.5)  # old samples age out of the window
+        assert openai_client.adaptive_timeout("recommendation", 20.0) == settings.OPENAI_ADAPTIVE_TIMEOUT_MIN_SECONDS
+
+    def test_ocr_keeps_its_deadline(self):
+        window = openai_client.get_latency_window("ocr")
+        for _ in range(settings.OPENAI_ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+            window.record(1.0)
+        assert openai_client.adaptive_timeout("ocr", 60.0) == 60.0
+
+    def test_timeouts_let_the_cap_grow_back(self, mock_openai_key):
+        async def create(**kwargs):
+            await asyncio.sleep(1.0)
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        window = openai_client.get_latency_window("recommendation")
+        for _ in range(settings.OPENAI_ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+            window.record(0.001)
+
+        async def call():
+            with pytest.raises(asyncio.TimeoutError):
+                await openai_client.create_chat_completion("recommendation", 0.5, model="gpt-4o", messages=[])
+
+        with patch.object(settings, "OPENAI_ADAPTIVE_TIMEOUT_MIN_SECONDS", 0.01), \
+                patch("app.services.openai_client.get_openai_client", return_value=client):
+            assert openai_client.adaptive_timeout("recommendation", 0.5) == 0.01
+            asyncio.run(call())
+            assert openai_client.adaptive_timeout("recommendation", 0.5) == 0.02
+
+
+class TestFailFast:
+    def test_open_breaker_skips_upstream_and_uses_local_engine(self, mock_openai_key):
+        calls = []
+
+        async def create(**kwargs):
+            calls.append(1)
+            raise ConnectionError("upstream down")
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        items = MOCK_OCR_RESPONSE["items"]
+
+        async def scenario():
+            results = []
+            for vibe in ("comfort", "adventure", "light", "quick", "sharing", "budget", "healthy"):
+                results.append(await llm_service.generate_recommendations(items, vibe, "no_restriction"))
+            return results
+
+        with patch("app.services.openai_client.get_openai_client", return_value=client):
+            results = asyncio.run(scenario())
+
+        assert len(calls) == settings.OPENAI_CIRCUIT_MIN_CALLS
+        assert all(r["recommendations"] for r in results)
+        states = openai_client.circuit_breaker_states()
+        assert states["recommendation"]["state"] == OPEN
+        assert states["recommendation"]["rejected"] == 7 - settings.OPENAI_CIRCUIT_MIN_CALLS
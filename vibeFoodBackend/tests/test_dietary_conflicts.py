@@ -0,0 +1,133 @@
+"""
+Unit tests for the dietary conflict engine.
+"""
+import asyncio
+
+from app.services import dietary_conflicts, llm_service
+from app.services.dietary_conflicts import (
+    DAIRY, EGGS, GLUTEN, MEAT, NUTS, PORK, VEGETARIAN,
+    ConflictTable, conflict_mask, get_conflict_table, item_bits, parse_preferences,
+)
+from tests.conftest import MOCK_OCR_RESPONSE
+
+ITEMS = MOCK_OCR_RESPONSE["items"] + [
+    {"id": "x1", "name": "Bacon Mac and Cheese", "allergens": ["dairy", "gluten"]},
+    {"id": "x2", "name": "Vegan Cheese Pizza", "allergens": ["gluten"], "is_vegetarian": True, "is_vegan": True},
+    {"id": "x3", "name": "红烧肉", "allergens": []},
+]
+
+
+def _position(name):
+    return next(i for i, item in enumerate(ITEMS) if item["name"] == name)
+
+
+class TestBitsets:
+    def test_item_bits(self):
+        bits = item_bits(ITEMS[_position("Bacon Mac and Cheese")])
+        assert bits & MEAT and bits & PORK and bits & DAIRY and bits & GLUTEN
+        assert not bits & VEGETARIAN
+        assert item_bits(ITEMS[_position("红烧肉")]) & MEAT
+
+    def test_masks_cover_every_preference(self):
+        mask = conflict_mask(item_bits(ITEMS[_position("Bacon Mac and Cheese")]))
+        expected = {"vegetarian", "vegan", "halal", "kosher", "gluten_free", "dairy_free"}
+        assert {p for p in dietary_conflicts.PREFERENCES if mask & dietary_conflicts.PREFERENCE_BIT[p]} == expected
+
+    def test_vegan_flag_exempts_dairy_keywords(self):
+        table = ConflictTable(ITEMS)
+        position = _position("Vegan Cheese Pizza")
+        assert table.conflicts(position, ["vegan", "dairy_free", "gluten_free"]) == ["gluten_free"]
+
+    def test_compound_words_are_not_meat(self):
+        assert item_bits({"name": "番茄炒鸡蛋"}) == EGGS
+        assert not item_bits({"name": "热牛奶"}) & MEAT
+        assert item_bits({"name": "鸡蛋炒鸡丁"}) & MEAT
+
+    def test_non_dairy_cream_and_butter(self):
+        assert not item_bits({"name": "Coconut cream curry"}) & DAIRY
+        assert item_bits({"name": "Peanut butter toast"}) & (DAIRY | NUTS) == NUTS
+        assert item_bits({"name": "Butter chicken"}) & DAIRY
+
+    def test_parse_preferences(self):
+        assert parse_preferences(" Vegetarian,nut_free,,unknown,vegetarian") == ["vegetarian", "nut_free"]
+        assert parse_preferences("no_restriction") == []
+        assert parse_preferences(None) == []
+
+
+class TestWarnings:
+    def test_comma_separated_preferences(self):
+        table = get_conflict_table(ITEMS)
+        warnings = table.warnings(_position("Bacon Mac and Cheese"), "vegetarian,halal", "en")
+        assert warnings == ["Not vegetarian: contains meat", "Not halal: contains pork", "Contains dairy, gluten"]
+
+    def test_declared_allergens_without_restriction(self):
+        table = get_conflict_table(ITEMS)
+        assert table.warnings(_position("Classic Burger"), "no_restriction") == ["Contains gluten"]
+        assert table.warnings(_position("红烧肉"), "no_restriction") is None
+
+    def test_chinese_warnings(self):
+        table = get_conflict_table(ITEMS)
+        assert table.warnings(_position("红烧肉"), "vegetarian", "zh") == ["不符合素食要求：含肉类"]
+
+    def test_chinese_declared_allergens_are_localized(self):
+        items = [{"id": "z1", "name": "蛋炒饭", "allergens": ["eggs", "soy", "peanuts", "lupin"]}]
+        table = ConflictTable(items)
+        assert table.warnings(0, "no_restriction", "zh") == ["含有鸡蛋、大豆、花生、lupin"]
+        assert table.warnings(0, "vegan", "zh") == ["不符合纯素要求：含鸡蛋", "含有大豆、花生、lupin"]
+
+    def test_other_template_languages(self):
+        table = get_conflict_table(ITEMS)
+        position = _position("红烧肉")
+        assert table.warnings(position, "vegetarian", "ja") == ["ベジタリアン対応ではありません：肉を含みます"]
+        assert table.warnings(position, "vegetarian", "es-MX") == ["No apto para dieta vegetariana: contiene carne"]
+        assert dietary_conflicts.template_language("zh-TW") == "zh"
+        assert dietary_conflicts.template_language("th") is None
+
+    def test_spicy_dishes_are_flagged(self):
+        table = ConflictTable([{"name": "Dan Dan Noodles", "spice_level": "4"}, {"name": "Rice", "spice_level": "mild"}])
+        assert table.warnings(0, "no_restriction", "en") == ["Spicy"]
+        assert table.warnings(0, "no_restriction", "ko") == ["매운맛"]
+        assert table.warnings(1, "no_restriction", "en") is None
+
+    def test_table_is_cached_per_menu(self):
+        assert get_conflict_table(ITEMS) is get_conflict_table([dict(i) for i in ITEMS])
+
+    def test_recommendation_warnings_are_attached_locally(self, mock_openai_key):
+        from unittest.mock import patch
+
+        llm_result = {
+            "brief_summary": "Try these",
+            "recommendations": [{"dish_name": "Bacon Mac and Cheese", "price": "15", "warnings": ["model text"]}],
+        }
+        with patch("app.services.llm_service._call_openai", return_value=llm_result):
+            result = asyncio.run(llm_service.generate_recommendations(ITEMS, "comfort", "gluten_free"))
+
+        assert result["recommendations"][0]["warnings"] == ["Not gluten-free: contains gluten", "Contains dairy"]
+
+    def test_model_warnings_kept_without_templates(self, mock_openai_key):
+        from unittest.mock import patch
+
+        llm_result = {
+            "brief_summary": "Try these",
+            "recommendations": [{"dish_name": "Bacon Mac and Cheese", "price": "15", "warnings": ["มีกลูเตน"]}],
+        }
+        with patch("app.services.llm_service._call_openai", return_value=llm_result):
+            result = asyncio.run(llm_service.generate_recommendations(ITEMS, "comfort", "gluten_free", menu_language="th"))
+
+        assert result["recommendations"][0]["warnings"] == ["มีกลูเตน"]
+        messages = llm_service._build_recommendation_messages(ITEMS, "comfort", "gluten_free", None, "th")
+        assert messages[-1]["content"].endswith("Write warnings: yes")
+        messages = llm_service._build_recommendation_messages(ITEMS, "comfort", "gluten_free", None, "ja")
+        assert "Write warnings" not in messages[-1]["content"]
+
+    def test_unmatched_recommendations_are_checked(self, mock_openai_key):
+        from unittest.mock import patch
+
+        llm_result = {
+            "brief_summary": "Try these",
+            "recommendations": [{"dish_name": "Pork Belly Special", "story": "Slow-braised with rice wine", "price": "20"}],
+        }
+        with patch("app.services.llm_service._call_openai", return_value=llm_result):
+            result = asyncio.run(llm_service.generate_recommendations(ITEMS, "comfort", "halal"))
+
+        assert result["recommendations"][0]["warnings"] == ["Not halal: contains pork, alcohol"]
@@ -0,0 +1,79 @@
+"""
+Tests for the image preprocessing stage that runs ahead of the Vision call.
+"""
+import asyncio
+import io
+import random
+
+from PIL import Image
+
+from app.services import image_service
+
+
+def _photo_bytes(width: int, height: int, fmt: str = "PNG") -> bytes:
+    """Noisy image so PNG stays large, like an uncompressed phone photo."""
+    rng = random.Random(width * height)
+    noise = rng.randbytes(width * height * 3)
+    img = Image.frombytes("RGB", (width, height), noise)
+    buf = io.BytesIO()
+    img.save(buf, format=fmt)
+    return buf.getvalue()
+
+
+class TestVisionTokenEstimate:
+    def test_square_image(self):
+        assert image_service.estimate_vision_tokens(1024, 1024) == 765
+
+    def test_tall_phone_photo(self):
+        assert image_service.estimate_vision_tokens(2048, 4096) == 1105
+
+    def test_small_image_single_tile(self):
+        assert image_service.estimate_vision_tokens(400, 300) == 255
+
+
+class TestPreprocessImage:
+    def test_downscales_long_edge_and_reencodes(self):
+        original = _photo_bytes(900, 1200)
+        result = image_service.preprocess_image(original, max_edge=600, quality=80)
+        assert max(result.processed_size) == 600
+        assert result.original_size == (900, 1200)
+        assert result.bytes_saved > 0
+        assert result.tokens_saved >= 0
+        with Image.open(io.BytesIO(result.image_bytes)) as img:
+            assert img.format == "JPEG"
+
+    def test_grayscale(self):
+        result = image_service.preprocess_image(_photo_bytes(400, 300), max_edge=2048, quality=80, grayscale=True)
+        with Image.open(io.BytesIO(result.image_bytes)) as img:
+            assert img.mode == "L"
+
+    def test_keeps_original_when_not_smaller(self):
+        tiny = _photo_bytes(4, 4)
+        result = image_service.preprocess_image(tiny, max_edge=2048, quality=100)
+        assert result.image_bytes == tiny
+        assert result.bytes_saved == 0
+
+    def test_undecodable_bytes(self):
+        assert image_service.preprocess_image(b"garbage", max_edge=2048, quality=85) is None
+
+    def test_runs_in_process_pool_and_records_savings(self):
+        before = image_service.preprocess_stats.images
+        result = asyncio.run(image_service.preprocess_for_vision(_photo_bytes(2400, 1200)))
+        assert result is not None
+        assert result.processed_size == (2048, 1024)
+        assert image_service.preprocess_stats.images == before + 1
+
+
+class TestSplitIntoTiles:
+    def test_grid_with_overlap(self):
+        tiles = image_service.split_into_tiles(
+            _photo_bytes(400, 600), rows=3, cols=2, overlap=0.1, max_edge=2048, quality=80
+        )
+        assert len(tiles) == 6
+        with Image.open(io.BytesIO(tiles[0])) as first, Image.open(io.BytesIO(tiles[3])) as middle:
+            # Corner tile overlaps on two sides, middle-row tile on three
+            assert first.size == (220, 220)
+            assert middle.size == (220, 240)
+
+    def test_undecodable_bytes(self):
+        assert image_service.split_into_tiles(b"garbage", 2, 2, 0.1, 2048, 80) == []
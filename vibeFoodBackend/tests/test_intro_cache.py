@@ -0,0 +1,73 @@
+"""
+Unit tests for the restaurant intro cache.
+"""
+import asyncio
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.services import llm_service
+from app.services.intro_cache import LOOKUPS, get_cached_intro, get_intro_cache, intro_cache_key, store_intro
+
+
+def _settings(**overrides):
+    return settings.model_copy(update=overrides)
+
+
+class TestIntroCacheKey:
+    def test_normalizes_restaurant_identity(self):
+        assert intro_cache_key("Joe's  Diner", "American", "EN") == intro_cache_key("joe s diner", "american", "en")
+        assert intro_cache_key("Joe's Diner", "American", "zh") != intro_cache_key("Joe's Diner", "American", "en")
+
+    def test_unnamed_restaurants_are_not_cached(self):
+        assert intro_cache_key(None, "American", "en") is None
+        store_intro(None, "Anything")
+        assert get_cached_intro(None) is None
+
+
+class TestIntroCache:
+    def test_hit_after_store(self):
+        key = intro_cache_key("Joe's Diner", "American", "en")
+        assert get_cached_intro(key) is None
+        store_intro(key, "A classic diner.")
+        assert get_cached_intro(key) == "A classic diner."
+        assert LOOKUPS.value(result="miss") == 1
+        assert LOOKUPS.value(result="hit") == 1
+
+    def test_storing_does_not_count_as_lookup(self):
+        key = intro_cache_key("Joe's Diner", "American", "en")
+        store_intro(key, "A classic diner.")
+        store_intro(key, "A classic diner.")
+        stats = get_intro_cache().stats
+        assert (stats.memory_hits, stats.disk_hits, stats.misses) == (0, 0, 0)
+
+    def test_variants_are_collected_then_rotated(self):
+        key = intro_cache_key("Joe's Diner", "American", "en")
+        with patch("app.services.intro_cache.settings", _settings(INTRO_CACHE_VARIANTS=2)):
+            store_intro(key, "First intro.")
+            assert get_cached_intro(key) is None  # still collecting
+            store_intro(key, "First intro.")  # duplicates are not a new variant
+            assert get_cached_intro(key) is None
+            store_intro(key, "Second intro.")
+            served = [get_cached_intro(key) for _ in range(4)]
+        assert served == ["First intro.", "Second intro.", "First intro.", "Second intro."]
+        assert LOOKUPS.value(result="collecting") == 2
+
+
+class TestCachedGeneration:
+    def test_second_scan_of_restaurant_skips_generation(self):
+        calls = []
+
+        async def generate(*args):
+            calls.append(args)
+            return "A classic diner."
+
+        async def scenario():
+            first = await llm_service.start_restaurant_intro("Joe's Diner", "American", ["Mains"], ["Burger"], "en")
+            # Different page, same restaurant
+            second = await llm_service.start_restaurant_intro("JOE'S DINER", "american", ["Desserts"], ["Pie"], "en")
+            return first, second
+
+        with patch("app.services.llm_service._generate_restaurant_intro", side_effect=generate), \
+             patch("app.services.llm_service.settings", _settings(OPENAI_API_KEY="sk-test")):
+            assert asyncio.run(scenario()) == ("A classic diner.", "A classic diner.")
+        assert len(calls) == 1
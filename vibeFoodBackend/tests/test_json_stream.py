@@ -0,0 +1,66 @@
+"""
+Tests for the incremental JSON stream parser.
+"""
+import json
+
+from app.utils.json_stream import JSONStreamParser
+
+
+DOC = {
+    "restaurant": {"name": "Test \"Bistro\"", "cuisine_type": None},
+    "items": [
+        {"name": "Burger {deluxe}", "price": 12.5, "tags": ["a", "b"]},
+        {"name": "宫保鸡丁", "price": None, "tags": []},
+    ],
+    "confidence": 0.9,
+    "warnings": [],
+    "menu_language": "en",
+}
+
+
+def _feed_all(parser, text, step):
+    events = []
+    for i in range(0, len(text), step):
+        events.extend(parser.feed(text[i:i + step]))
+    return events
+
+
+class TestJSONStreamParser:
+    def test_emits_items_and_fields_for_any_chunking(self):
+        text = json.dumps(DOC, ensure_ascii=False, indent=2)
+        for step in (1, 3, 17, len(text)):
+            parser = JSONStreamParser(array_keys=("items",))
+            events = _feed_all(parser, text, step)
+            assert [e for e in events if e[0] == "item"] == [
+                ("item", "items", DOC["items"][0]),
+                ("item", "items", DOC["items"][1]),
+            ]
+            fields = {k: v for kind, k, v in events if kind == "field"}
+            assert fields == {
+                "restaurant": DOC["restaurant"],
+                "confidence": 0.9,
+                "warnings": [],
+                "menu_language": "en",
+            }
+            assert parser.done
+            assert parser.result() == DOC
+
+    def test_item_emitted_before_document_ends(self):
+        text = json.dumps(DOC, ensure_ascii=False)
+        cut = text.index('{"name": "宫保鸡丁"')
+        parser = JSONStreamParser(array_keys=("items",))
+        events = parser.feed(text[:cut])
+        assert events[-1] == ("item", "items", DOC["items"][0])
+        assert not parser.done
+
+    def test_field_before_array(self):
+        parser = JSONStreamParser(array_keys=("recommendations",))
+        events = parser.feed('{"brief_summary": "Cozy picks, enjoy!", "recommendations": [{"dish_name": "Soup"}')
+        assert events == [
+            ("field", "brief_summary", "Cozy picks, enjoy!"),
+            ("item", "recommendations", {"dish_name": "Soup"}),
+        ]
+
+    def test_non_array_value_for_array_key(self):
+        parser = JSONStreamParser(array_keys=("items",))
+        assert parser.feed('{"items": null}') == [("field", "items", None)]
@@ -0,0 +1,72 @@
+"""
+Unit tests for the local deterministic recommendation engine.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.services import candidate_ranker, llm_service, local_recommender
+from tests.conftest import MOCK_OCR_RESPONSE
+
+pytestmark = pytest.mark.skipif(not candidate_ranker.NUMPY_AVAILABLE, reason="numpy not installed")
+
+ITEMS = [dict(item, id=f"id-{n}") for n, item in enumerate(MOCK_OCR_RESPONSE["items"])]
+MENU_NAMES = {item["name"] for item in ITEMS}
+
+
+class TestLocalRecommend:
+    def test_recommends_only_menu_dishes(self):
+        result = local_recommender.recommend(ITEMS, "comfort", "no_restriction", "en")
+        names = [r["dish_name"] for r in result["recommendations"]]
+        assert len(names) == 3
+        assert set(names) <= MENU_NAMES
+        assert result["brief_summary"]
+
+    def test_response_shape_and_price(self):
+        rec = local_recommender.recommend(ITEMS, "indulgent", "no_restriction", "en")["recommendations"][0]
+        assert set(rec) == {"dish_name", "reasoning", "story", "warnings", "price", "emoji", "dish_id", "price_value"}
+        item = next(i for i in ITEMS if i["name"] == rec["dish_name"])
+        assert rec["price"] == f"{item['price']:.2f}"
+
+    def test_vegetarian_preference_demotes_meat(self):
+        result = local_recommender.recommend(ITEMS, "light", "vegetarian", "en")
+        names = [r["dish_name"] for r in result["recommendations"]]
+        assert names[0] in ("Caesar Salad", "Chocolate Cake")
+        assert "Classic Burger" not in names
+
+    def test_conflicts_are_warned(self):
+        result = local_recommender.recommend(ITEMS, "sharing", "gluten_free", "en")
+        burger = next(r for r in result["recommendations"] if r["dish_name"] == "Classic Burger")
+        assert any("gluten-free" in w for w in burger["warnings"])
+
+    def test_chinese_templates(self):
+        result = local_recommender.recommend(ITEMS, "budget", "nut_free", "zh")
+        assert result["brief_summary"] == local_recommender.TEMPLATES["zh"]["summary"]["budget"]
+        assert any("含有" in w for r in result["recommendations"] for w in r["warnings"] or [])
+
+    def test_voice_prompt_maps_to_vibe(self):
+        assert local_recommender.vibe_from_voice("something spicy and new please") == "adventure"
+        assert local_recommender.vibe_from_voice("我们人很多，一起分享") == "sharing"
+        result = local_recommender.recommend(ITEMS, "voice", "no_restriction", "en", voice_prompt="hello")
+        assert result["recommendations"]
+
+    def test_fast_on_large_menus(self):
+        big = [dict(ITEMS[n % 4], name=f"Dish {n}", id=str(n)) for n in range(300)]
+        local_recommender.recommend(big, "comfort", "vegetarian", "en")
+        started = time.perf_counter()
+        local_recommender.recommend(big, "healthy", "vegetarian", "en")
+        assert time.perf_counter() - started < 0.01
+
+
+class TestLlmServiceModes:
+    def test_no_api_key_uses_local_engine(self):
+        result = asyncio.run(llm_service.generate_recommendations(ITEMS, "comfort", "no_restriction"))
+        assert {r["dish_name"] for r in result["recommendations"]} <= MENU_NAMES
+
+    def test_llm_failure_degrades_to_local(self, mock_openai_key):
+        from unittest.mock import patch
+
+        with patch("app.services.llm_service._call_openai", side_effect=RuntimeError("timeout")):
+            result = asyncio.run(llm_service.generate_recommendations(ITEMS, "comfort", "no_restriction"))
+        assert {r["dish_name"] for r in result["recommendations"]} <= MENU_NAMES
@@ -0,0 +1,63 @@
+"""
+Unit tests for the compact recommendation prompt encoding and token counter.
+"""
+from app.services.menu_prompt import encode_menu, encode_menu_json, encode_menu_table
+from app.utils.tokens import count_tokens, estimate_tokens
+from tests.conftest import MOCK_OCR_RESPONSE
+
+ITEMS = [dict(item, id=f"3f2b1c4e-0000-0000-0000-00000000000{n}") for n, item in enumerate(MOCK_OCR_RESPONSE["items"])]
+
+
+class TestMenuTableEncoding:
+    def test_rows_keep_names_and_prices_without_ids(self):
+        text = encode_menu_table(ITEMS)
+        assert "Classic Burger | 12.99 | Beef patty with lettuce and tomato | popular | gluten" in text
+        assert "Currency: USD" in text
+        assert "3f2b1c4e" not in text
+        assert text.count("USD") == 1
+
+    def test_grouped_by_category(self):
+        lines = encode_menu_table(ITEMS).splitlines()
+        assert lines.count("[Mains]") == 1
+        assert lines.index("[Mains]") < lines.index("Fish Tacos | 14.99 | Grilled fish with slaw and lime crema | spicy | fish,gluten | 2")
+
+    def test_mixed_currencies_and_separators(self):
+        items = [
+            {"name": "Tea | Pot", "price": 4.0, "currency": "GBP"},
+            {"name": "Coffee", "price": 3.5, "currency": "EUR", "is_vegan": True},
+        ]
+        lines = encode_menu_table(items).splitlines()
+        assert "Tea / Pot | 4 GBP" in lines
+        assert "Coffee | 3.5 EUR |  |  |  |  | vegan" in lines
+        assert not any(line.startswith("Currency:") for line in lines)
+
+    def test_json_format_is_the_original_encoding(self):
+        assert encode_menu(ITEMS, "json") == encode_menu_json(ITEMS)
+
+    def test_table_is_much_smaller(self):
+        assert count_tokens(encode_menu_table(ITEMS)) * 2 < count_tokens(encode_menu_json(ITEMS))
+
+
+class TestTokenEstimate:
+    def test_estimate_is_close_for_json(self):
+        assert 12 <= estimate_tokens('{"name": "Classic Burger", "price": 12.99}') <= 16
+
+    def test_cjk_characters_count_individually(self):
+        assert estimate_tokens("宫保鸡丁") == 4
+
+
+class TestPromptLayout:
+    def test_menu_prefix_is_identical_across_vibes(self):
+        from app.services.llm_service import _build_recommendation_messages
+        restaurant = {"name": "Test Diner", "cuisine_type": "American"}
+        comfort = _build_recommendation_messages(ITEMS, "comfort", "no_restriction", restaurant, "en")
+        adventure = _build_recommendation_messages(ITEMS, "adventure", "vegetarian,nut_free", restaurant, "en")
+        voice = _build_recommendation_messages(ITEMS, "voice", "no_restriction", restaurant, "en", "人很多")
+
+        assert comfort[0] == adventure[0] == voice[0]
+        prefix = comfort[1]["content"].split("User's vibe")[0]
+        assert prefix.startswith("Restaurant: Test Diner (American cuisine)")
+        assert "Classic Burger" in prefix
+        assert adventure[1]["content"].startswith(prefix)
+        assert voice[1]["content"].startswith(prefix)
+        assert adventure[1]["content"].endswith("User's dietary restrictions: vegetarian, nut_free")
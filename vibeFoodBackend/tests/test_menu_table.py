@@ -0,0 +1,77 @@
+"""
+Unit tests for the columnar menu table.
+"""
+import json
+
+from app.services.menu_table import MenuItem, MenuTable
+
+
+def _table():
+    table = MenuTable()
+    table.append(id="a", name="Pad Thai", price=12.99, category="Noodles",
+                 tags=["popular"], allergens=["peanuts", "eggs"], spice_level=1)
+    table.append(id="b", name="Spring Rolls", category="Appetizers", tags=["popular", "vegetarian"],
+                 allergens=["gluten"], is_vegetarian=True, is_vegan=True, confidence=0.8)
+    return table
+
+
+class TestMenuTable:
+    def test_rows_round_trip(self):
+        table = _table()
+        rows = list(table)
+        assert rows[0] == MenuItem(
+            id="a", name="Pad Thai", price=12.99, category="Noodles",
+            tags=["popular"], allergens=["peanuts", "eggs"], spice_level=1,
+        )
+        assert rows[1].price is None
+        assert rows[1].spice_level is None
+        assert rows[1].is_vegetarian and rows[1].is_vegan
+        assert rows[1].confidence == 0.8
+
+    def test_tags_are_interned(self):
+        table = _table()
+        assert table.tag_vocab.words == ["popular", "vegetarian"]
+        assert table.tags == [(0,), (0, 1)]
+        assert len(table.currency_vocab) == 1
+
+    def test_json_shape(self):
+        row = _table().to_json()[1]
+        assert row == {
+            "id": "b", "name": "Spring Rolls", "description": None, "price": None,
+            "currency": "USD", "category": "Appetizers", "tags": ["popular", "vegetarian"],
+            "allergens": ["gluten"], "spice_level": None, "is_vegetarian": True, "is_vegan": True,
+        }
+        json.dumps(_table().to_json())
+
+    def test_loosely_typed_values(self):
+        table = MenuTable()
+        table.append(id="x", name="Mystery", price=["12"], spice_level="smoky", tags=None)
+        item = table.row(0)
+        assert item.price is None
+        assert item.spice_level is None
+        assert item.tags == []
+
+    def test_malformed_item(self):
+        table = MenuTable()
+        table.append(
+            id="x", name=None, category=["Mains"], currency={"code": "EUR"},
+            tags=["spicy", {"a": 1}, ["nested"], 7, None], allergens="gluten, dairy", spice_level="hot",
+        )
+        item = table.row(0)
+        assert item.name == "Unknown"
+        assert item.category is None
+        assert item.currency == "USD"
+        assert item.tags == ["spicy", "7"]
+        assert item.allergens == ["gluten", "dairy"]
+        assert item.spice_level == 3
+        assert [table.spice_levels[table.append(id=str(n), name="x", spice_level=v)]
+                for n, v in enumerate(["3/5", "\U0001f336\U0001f336", "微辣", 2.7, float("inf")])] == [3, 2, 1, 2, -1]
+
+    def test_text_prices_are_kept(self):
+        table = MenuTable()
+        table.append(id="a", name="Lobster", price="Market price")
+        table.append(id="b", name="活鱼", price="时价")
+        table.append(id="c", name="Soup", price="8.50")
+        table.append(id="d", name="Rice", price="  ")
+        assert [table.row(i).price for i in range(4)] == ["Market price", "时价", 8.5, None]
+        assert table.to_json()[1]["price"] == "时价"
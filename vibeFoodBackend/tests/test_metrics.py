@@ -0,0 +1,103 @@
+"""
+Tests for Prometheus metrics: registry rendering, OpenAI call metrics and /metrics.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.services import openai_client
+from app.services.openai_metrics import CALL_ERRORS, CALL_SECONDS, COST, TOKENS, observe_call, token_cost
+from app.utils.metrics import Registry
+
+
+def _usage(prompt, completion, cached=0):
+    return SimpleNamespace(
+        prompt_tokens=prompt, completion_tokens=completion,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+    )
+
+
+class TestRegistry:
+    def test_counter_and_histogram_exposition(self):
+        registry = Registry()
+        counter = registry.counter("demo_total", "Demo counter.", ("op",))
+        histogram = registry.histogram("demo_seconds", "Demo latency.", ("op",), buckets=(1.0, 5.0))
+        counter.inc(op="scan")
+        counter.inc(2, op="scan")
+        for seconds in (0.5, 3.0, 9.0):
+            histogram.observe(seconds, op="scan")
+
+        text = "\n".join(registry.render())
+        assert "# TYPE demo_total counter" in text
+        assert 'demo_total{op="scan"} 3' in text
+        assert 'demo_seconds_bucket{op="scan",le="1"} 1' in text
+        assert 'demo_seconds_bucket{op="scan",le="5"} 2' in text
+        assert 'demo_seconds_bucket{op="scan",le="+Inf"} 3' in text
+        assert 'demo_seconds_sum{op="scan"} 12.5' in text
+        assert 'demo_seconds_count{op="scan"} 3' in text
+
+    def test_labels_must_match(self):
+        counter = Registry().counter("demo_total", "Demo counter.", ("op",))
+        with pytest.raises(ValueError):
+            counter.inc(model="gpt-4o")
+
+
+class TestCallMetrics:
+    def test_token_cost_discounts_cached_prompt(self):
+        full = token_cost("gpt-4o", 2000, 0, 500)
+        cached = token_cost("gpt-4o", 2000, 1024, 500)
+        assert full == pytest.approx((2000 * 2.50 + 500 * 10.00) / 1e6)
+        assert cached < full
+        assert token_cost("unknown-model", 10, 0, 10) is None
+
+    def test_observe_call_counts_success_and_errors(self):
+        with observe_call("intro", "gpt-4o") as call:
+            call.record_usage(_usage(300, 40, cached=0))
+        with pytest.raises(RuntimeError):
+            with observe_call("intro", "gpt-4o"):
+                raise RuntimeError("boom")
+
+        assert CALL_SECONDS.count(operation="intro", model="gpt-4o") == 1
+        assert CALL_ERRORS.value(operation="intro", model="gpt-4o", error_type="RuntimeError") == 1
+        assert TOKENS.value(operation="intro", model="gpt-4o", type="completion") == 40
+        assert COST.value(operation="intro", model="gpt-4o") > 0
+
+    def test_chat_completion_is_observed_per_model(self):
+        async def create(**kwargs):
+            return SimpleNamespace(usage=_usage(1200, 200, cached=1024))
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        with patch("app.services.openai_client.get_openai_client", return_value=client):
+            asyncio.run(openai_client.create_chat_completion("ocr", 5.0, model="gpt-4o-mini", messages=[]))
+
+        labels = {"operation": "ocr", "model": "gpt-4o-mini"}
+        assert CALL_SECONDS.count(**labels) == 1
+        assert TOKENS.value(type="prompt", **labels) == 1200
+        assert TOKENS.value(type="cached", **labels) == 1024
+
+
+class TestMetricsEndpoint:
+    def test_exposes_openai_and_runtime_metrics(self, client):
+        with observe_call("recommendation", "gpt-4o") as call:
+            call.record_usage(_usage(1800, 300))
+
+        res = client.get("/api/v1/metrics")
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'vibefood_openai_request_duration_seconds_count{operation="recommendation",model="gpt-4o"} 1' in res.text
+        assert 'vibefood_openai_tokens_total{operation="recommendation",model="gpt-4o",type="prompt"} 1800' in res.text
+        assert "# TYPE vibefood_openai_queue_depth gauge" in res.text
+
+    def test_scrape_does_not_create_caches(self, client):
+        from app.services import intro_cache, ocr_cache, recommendation_cache
+
+        res = client.get("/api/v1/metrics")
+        assert 'cache="ocr_results"' not in res.text
+        assert ocr_cache.get_ocr_cache(create=False) is None
+        assert recommendation_cache.get_recommendation_cache(create=False) is None
+        assert intro_cache.get_intro_cache(create=False) is None
+
+        ocr_cache.get_ocr_cache()
+        assert 'vibefood_cache_requests_total{cache="ocr_results",result="misses"} 0' in client.get("/api/v1/metrics").text
@@ -0,0 +1,98 @@
+"""
+Unit tests for the dish-name index.
+"""
+import asyncio
+
+from app.services import llm_service
+from app.services.name_index import DishNameIndex, get_name_index, name_tokens
+
+ITEMS = [
+    {"id": "1", "name": "Kung Pao Chicken (宫保鸡丁)", "price": 16.0},
+    {"id": "2", "name": "麻婆豆腐 Mapo Tofu", "price": 12.5},
+    {"id": "3", "name": "Caesar Salad", "price": 9.99},
+    {"id": "4", "name": "Steak Frites", "price": 28.0},
+    {"id": "5", "name": "Ｆｉｓｈ　Ｔａｃｏｓ", "price": 14.99},
+]
+
+
+class TestDishNameIndex:
+    def test_exact_and_normalized(self):
+        index = DishNameIndex(ITEMS)
+        assert index.match("Caesar Salad") == 2
+        assert index.match("  caesar salad! ") == 2
+        assert index.match("Fish Tacos") == 4  # full-width NFKC
+
+    def test_bilingual_halves(self):
+        index = DishNameIndex(ITEMS)
+        assert index.match_item("Kung Pao Chicken")["id"] == "1"
+        assert index.match_item("宫保鸡丁")["id"] == "1"
+        assert index.match_item("麻婆豆腐")["id"] == "2"
+        assert index.match_item("Mapo Tofu")["id"] == "2"
+
+    def test_typos_and_unknown_dishes(self):
+        index = DishNameIndex(ITEMS)
+        assert index.match("Ceasar Salad") == 2
+        assert index.match("Margherita Pizza") is None
+        assert index.match("") is None
+
+    def test_cjk_tokens(self):
+        assert name_tokens("宫保鸡丁") == {"宫保", "保鸡", "鸡丁"}
+        assert name_tokens("kung pao 鸡") == {"kung", "pao", "鸡"}
+
+    def test_index_is_cached_per_menu(self):
+        assert get_name_index(ITEMS) is get_name_index([dict(i) for i in ITEMS])
+
+
+class TestRecommendationResolution:
+    def test_llm_names_resolve_to_menu_items(self, mock_openai_key):
+        from unittest.mock import patch
+
+        llm_result = {
+            "brief_summary": "Try these",
+            "recommendations": [
+                {"dish_name": "Kung Pao Chicken", "price": "16"},
+                {"dish_name": "Unicorn Steak", "price": "99"},
+            ],
+        }
+        with patch("app.services.llm_service._call_openai", return_value=llm_result):
+            result = asyncio.run(llm_service.generate_recommendations(ITEMS, "comfort", "no_restriction"))
+
+        assert result["recommendations"] == [{
+            "dish_name": "Kung Pao Chicken (宫保鸡丁)", "price": "16", "dish_id": "1", "price_value": 16.0,
+            "warnings": None,
+        }]
+        assert llm_result["recommendations"][0]["dish_name"] == "Kung Pao Chicken"
+
+    def test_streamed_dishes_are_resolved_and_cached(self, mock_openai_key):
+        import json
+        from unittest.mock import patch
+        from app.services.recommendation_cache import (
+            get_cached_recommendations, menu_fingerprint, recommendation_cache_key,
+        )
+
+        content = json.dumps({
+            "brief_summary": "Try these",
+            "recommendations": [
+                {"dish_name": "Unicorn Steak", "price": "99"},
+                {"dish_name": "Mapo Tofu", "price": "12.5"},
+            ],
+        })
+
+        async def fake_stream(*args, **kwargs):
+            for i in range(0, len(content), 5):
+                yield content[i:i + 5]
+
+        async def collect():
+            return [event async for event in llm_service.stream_recommendations(ITEMS, "comfort", "no_restriction")]
+
+        with patch("app.services.llm_service._stream_openai", side_effect=fake_stream):
+            events = asyncio.run(collect())
+
+        assert [kind for kind, _ in events] == ["summary", "dish", "result"]
+        assert events[1][1]["dish_name"] == "麻婆豆腐 Mapo Tofu"
+        assert events[-1][1]["recommendations"] == [events[1][1]]
+        key = recommendation_cache_key(menu_fingerprint(ITEMS, None), "comfort", "no_restriction", None, None)
+        # The cache keeps the model's output; ids come from whichever menu reads it
+        cached = get_cached_recommendations(key)
+        assert cached == json.loads(content)
+        assert llm_service._validate_recommendations(cached, ITEMS, "no_restriction") == events[-1][1]
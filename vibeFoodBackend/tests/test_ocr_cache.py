@@ -0,0 +1,235 @@
+"""
+Tests for the OCR result cache and the generic tiered cache behind it.
+"""
+import asyncio
+import base64
+import threading
+import time
+from unittest.mock import AsyncMock, patch
+
+from app.services import ocr_service
+from app.utils.cache import CacheStats, LRUCache, SQLiteCache, TieredCache
+from tests.conftest import MOCK_OCR_RESPONSE
+
+
+# ─── Cache tiers ───
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.evictions == 1
+
+    def test_ttl_expiry(self):
+        cache = LRUCache(max_size=4, ttl_seconds=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+
+
+class TestSQLiteCache:
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        SQLiteCache(path, table="t").set("k", {"items": [1, 2]})
+        assert SQLiteCache(path, table="t").get("k") == {"items": [1, 2]}
+
+    def test_size_based_eviction(self, tmp_path):
+        cache = SQLiteCache(str(tmp_path / "cache.db"), table="t", max_bytes=250)
+        for i in range(5):
+            cache.set(f"k{i}", "x" * 100)
+        assert len(cache) == 2
+        assert cache.get("k4") is not None
+        assert cache.get("k0") is None
+
+    def test_entry_count_eviction(self, tmp_path):
+        cache = SQLiteCache(str(tmp_path / "cache.db"), table="t", max_entries=3)
+        for i in range(5):
+            cache.set(f"k{i}", i)
+            time.sleep(0.002)
+        assert len(cache) == 3
+        assert cache.get("k0") is None and cache.get("k4") == 4
+
+
+class TestTieredCache:
+    def test_disk_hit_promotes_to_memory(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        TieredCache("t", memory_size=4, disk_path=path).set("k", {"v": 1})
+
+        cache = TieredCache("t", memory_size=4, disk_path=path)
+        assert cache.get("k") == {"v": 1}
+        assert cache.get("k") == {"v": 1}
+        assert cache.get("missing") is None
+        assert cache.stats.disk_hits == 1
+        assert cache.stats.memory_hits == 1
+        assert cache.stats.misses == 1
+
+    def test_async_access_runs_disk_tier_off_the_loop(self, tmp_path):
+        cache = TieredCache("t", memory_size=4, disk_path=str(tmp_path / "cache.db"))
+        threads = []
+        disk_get, disk_set = cache.disk.get, cache.disk.set
+        cache.disk.get = lambda key: threads.append(threading.get_ident()) or disk_get(key)
+        cache.disk.set = lambda key, value: threads.append(threading.get_ident()) or disk_set(key, value)
+
+        async def scenario():
+            await cache.aset("k", {"v": 1})
+            cache.memory.clear()
+            return await cache.aget("k"), await cache.aget("k"), await cache.aget("missing")
+
+        assert asyncio.run(scenario()) == ({"v": 1}, {"v": 1}, None)
+        assert threads and threading.get_ident() not in threads
+        assert (cache.stats.disk_hits, cache.stats.memory_hits, cache.stats.misses) == (1, 1, 1)
+
+    def test_peek_leaves_stats_and_tiers_alone(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        TieredCache("t", memory_size=4, disk_path=path).set("k", {"v": 1})
+
+        cache = TieredCache("t", memory_size=4, disk_path=path)
+        assert cache.peek("k") == {"v": 1}
+        assert cache.peek("missing") is None
+        assert len(cache.memory) == 0  # not promoted
+        assert cache.stats.to_dict() == CacheStats().to_dict()
+
+
+# ─── OCR service integration ───
+
+def _image_b64(payload: bytes) -> str:
+    return base64.b64encode(payload).decode()
+
+
+class TestOCRCache:
+    def test_repeat_scan_skips_vision_call(self, mock_openai_key):
+        image = _image_b64(b"\xff\xd8menu-photo\xff\xd9")
+        with patch("app.services.ocr_service._extract_with_openai",
+                   new=AsyncMock(return_value=MOCK_OCR_RESPONSE)) as mock_extract:
+            first = asyncio.run(ocr_service.process_menu_image("device-a", image))
+            second = asyncio.run(ocr_service.process_menu_image("device-b", image))
+
+        mock_extract.assert_called_once()
+        assert [i.name for i in first.items] == [i.name for i in second.items]
+        assert second.session_id == "device-b"
+        assert first.id != second.id
+
+    def test_different_images_miss(self, mock_openai_key):
+        with patch("app.services.ocr_service._extract_with_openai",
+                   new=AsyncMock(return_value=MOCK_OCR_RESPONSE)) as mock_extract:
+            asyncio.run(ocr_service.process_menu_image("d", _image_b64(b"photo-1")))
+            asyncio.run(ocr_service.process_menu_image("d", _image_b64(b"photo-2")))
+        assert mock_extract.call_count == 2
+
+    def test_empty_extraction_not_cached(self, mock_openai_key):
+        empty = {"items": [], "confidence": 0.0, "warnings": ["Image does not appear to be a restaurant menu"]}
+        image = _image_b64(b"not-a-menu")
+        with patch("app.services.ocr_service._extract_with_openai",
+                   new=AsyncMock(return_value=empty)) as mock_extract:
+            asyncio.run(ocr_service.process_menu_image("d", image))
+            asyncio.run(ocr_service.process_menu_image("d", image))
+        assert mock_extract.call_count == 2
+
+
+# ─── Near-duplicate matching ───
+
+def _menu_photo(quality: int = 90, shift: int = 0, seed: int = 0) -> bytes:
+    """Render a synthetic 'menu' of text-like bars as JPEG bytes."""
+    import io
+    import random
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    img = Image.new("RGB", (400, 600), "white")
+    draw = ImageDraw.Draw(img)
+    for row in range(20):
+        y = 20 + row * 28
+        draw.rectangle([30 + shift, y, 30 + shift + rng.randint(120, 340), y + 12], fill="black")
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
+class TestNearDuplicate:
+    def test_dhash_tolerates_recompression(self):
+        from app.services.image_service import compute_dhash, hamming_distance
+        a = compute_dhash(_menu_photo(quality=90))
+        b = compute_dhash(_menu_photo(quality=50, shift=2))
+        c = compute_dhash(_menu_photo(seed=7))
+        assert hamming_distance(a, b) <= 3
+        assert hamming_distance(a, c) > 3
+
+    def test_undecodable_bytes_have_no_hash(self):
+        from app.services.image_service import compute_dhash, compute_image_signature
+        assert compute_dhash(b"not an image") is None
+        assert compute_image_signature(b"not an image") is None
+
+    def test_signature_includes_size(self):
+        from app.services.image_service import compute_dhash, compute_image_signature
+        photo = _menu_photo()
+        signature = compute_image_signature(photo)
+        assert (signature.width, signature.height) == (400, 600)
+        assert signature.dhash == compute_dhash(photo)
+
+    def test_signature_decodes_once(self):
+        from PIL import Image
+        from app.services.image_service import compute_image_signature
+        with patch("app.services.image_service.Image.open", wraps=Image.open) as image_open:
+            compute_image_signature(_menu_photo())
+        assert image_open.call_count == 1
+
+    def test_index_respects_threshold_and_size(self):
+        from app.services.image_service import ImageSignature
+        from app.services.ocr_cache import NearDuplicateIndex
+        index = NearDuplicateIndex(max_size=2, max_distance=2)
+        index.add(ImageSignature(0b1111, 400, 600), "a")
+        assert index.find(ImageSignature(0b1100, 400, 600)) == "a"
+        assert index.find(ImageSignature(0b0000, 400, 600)) is None
+        index.add(ImageSignature(1 << 40, 400, 600), "b")
+        index.add(ImageSignature(1 << 50, 400, 600), "c")
+        assert index.find(ImageSignature(0b1111, 400, 600)) is None
+        assert len(index) == 2
+
+    def test_index_requires_same_aspect_ratio(self):
+        from app.services.image_service import ImageSignature
+        from app.services.ocr_cache import NearDuplicateIndex
+        index = NearDuplicateIndex(max_size=4, max_distance=2)
+        index.add(ImageSignature(0b1111, 400, 600), "a")
+        assert index.find(ImageSignature(0b1111, 800, 1200)) == "a"  # same photo, other resolution
+        assert index.find(ImageSignature(0b1111, 600, 400)) is None
+
+    def test_index_persists_with_disk_tier(self, tmp_path):
+        from app.services.image_service import ImageSignature
+        from app.services.ocr_cache import NearDuplicateIndex
+        path = str(tmp_path / "ocr.db")
+        NearDuplicateIndex(4, 2, store=SQLiteCache(path, table="sig")).add(ImageSignature(0b1111, 400, 600), "a")
+
+        restarted = NearDuplicateIndex(4, 2, store=SQLiteCache(path, table="sig"))
+        assert restarted.find(ImageSignature(0b1110, 400, 600)) == "a"
+        restarted.discard("a")
+        assert len(NearDuplicateIndex(4, 2, store=SQLiteCache(path, table="sig"))) == 0
+
+    def test_signature_store_is_bounded(self, tmp_path):
+        from app.core.config import settings
+        from app.services.image_service import ImageSignature
+        from app.services import ocr_cache
+        limited = settings.model_copy(update={
+            "OCR_CACHE_DB_PATH": str(tmp_path / "ocr.db"), "OCR_NEAR_DUPLICATE_INDEX_SIZE": 2,
+        })
+        with patch("app.services.ocr_cache.settings", limited):
+            index = ocr_cache.get_near_duplicate_index()
+            for n in range(4):
+                index.add(ImageSignature(1 << (10 * n), 400, 600), f"k{n}")
+                time.sleep(0.002)
+        assert len(index.store) == 2
+        assert [key for key, _ in index.store.items()] == ["k3", "k2"]
+
+    def test_similar_photo_reuses_extraction(self, mock_openai_key):
+        first = _image_b64(_menu_photo(quality=90))
+        second = _image_b64(_menu_photo(quality=55, shift=2))
+        with patch("app.services.ocr_service._extract_with_openai",
+                   new=AsyncMock(return_value=MOCK_OCR_RESPONSE)) as mock_extract:
+            asyncio.run(ocr_service.process_menu_image("device-a", first))
+            menu = asyncio.run(ocr_service.process_menu_image("device-b", second))
+        mock_extract.assert_called_once()
+        assert len(menu.items) == len(MOCK_OCR_RESPONSE["items"])
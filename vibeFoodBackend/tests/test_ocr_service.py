@@ -0,0 +1,148 @@
+"""
+Unit tests for OCR service extraction pipelines.
+"""
+import asyncio
+import base64
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.services import ocr_service
+from app.utils.errors import OCRFailedError
+
+
+def _page(restaurant=None, items=(), confidence=0.9, language="en"):
+    return {
+        "restaurant": restaurant,
+        "items": [dict(i) for i in items],
+        "confidence": confidence,
+        "warnings": [],
+        "menu_language": language,
+    }
+
+
+BURGER = {"name": "Classic Burger", "price": 12.99, "category": "Mains", "tags": ["popular"], "allergens": ["gluten"]}
+BURGER_DUP = {"name": "classic  burger!", "price": None, "description": "Beef patty", "tags": ["grill"], "allergens": ["gluten", "dairy"]}
+CAKE = {"name": "Chocolate Cake", "price": 7.99, "category": "Desserts", "tags": [], "allergens": ["eggs"]}
+
+
+class TestMergeExtractions:
+    def test_dedupes_by_normalized_name(self):
+        merged = ocr_service._merge_extractions([
+            _page(items=[BURGER]),
+            _page(items=[BURGER_DUP, CAKE]),
+        ])
+        names = [i["name"] for i in merged["items"]]
+        assert names == ["Classic Burger", "Chocolate Cake"]
+        burger = merged["items"][0]
+        assert burger["price"] == 12.99
+        assert burger["description"] == "Beef patty"
+        assert burger["tags"] == ["popular", "grill"]
+        assert burger["allergens"] == ["gluten", "dairy"]
+
+    def test_merges_restaurant_and_language(self):
+        merged = ocr_service._merge_extractions([
+            _page(restaurant={"name": None, "cuisine_type": "American"}, items=[BURGER], language="en"),
+            _page(restaurant={"name": "Test Bistro", "cuisine_type": "Diner"}, items=[CAKE, BURGER_DUP], language="en"),
+            _page(items=[], language="fr"),
+        ])
+        assert merged["restaurant"] == {"name": "Test Bistro", "cuisine_type": "American"}
+        assert merged["menu_language"] == "en"
+
+    def test_confidence_is_item_weighted(self):
+        merged = ocr_service._merge_extractions([
+            _page(items=[BURGER, CAKE], confidence=0.9),
+            _page(items=[{"name": "Fries"}], confidence=0.3),
+        ])
+        assert merged["confidence"] == pytest.approx(0.7)
+
+    def test_does_not_mutate_pages(self):
+        first = _page(items=[BURGER])
+        ocr_service._merge_extractions([first, _page(items=[BURGER_DUP])])
+        assert first["items"][0]["tags"] == ["popular"]
+
+
+def _b64(payload: bytes) -> str:
+    return base64.b64encode(payload).decode()
+
+
+class TestProcessMenuImages:
+    def test_pages_run_concurrently(self, mock_openai_key):
+        from app.services.image_service import shutdown_image_pool, warm_image_pool
+        # Process start-up is not what is timed here: start a fresh pool's workers first
+        shutdown_image_pool()
+        asyncio.run(warm_image_pool())
+
+        async def slow_extract(image_base64):
+            await asyncio.sleep(0.2)
+            return _page(items=[{"name": image_base64}])
+
+        pages = [(_b64(f"page-{n}".encode()), None) for n in range(4)]
+        with patch("app.services.ocr_service._extract_with_openai", new=slow_extract):
+            started = time.perf_counter()
+            menu = asyncio.run(ocr_service.process_menu_images("device", pages))
+            elapsed = time.perf_counter() - started
+
+        assert len(menu.items) == 4
+        assert elapsed < 0.6
+
+    def test_partial_failure_adds_warning(self, mock_openai_key):
+        async def flaky_extract(image_base64):
+            if image_base64 == _b64(b"bad"):
+                raise RuntimeError("vision timeout")
+            return _page(items=[CAKE])
+
+        pages = [(_b64(b"good"), None), (_b64(b"bad"), None)]
+        with patch("app.services.ocr_service._extract_with_openai", new=flaky_extract):
+            menu = asyncio.run(ocr_service.process_menu_images("device", pages))
+
+        assert [i.name for i in menu.items] == ["Chocolate Cake"]
+        assert any("page(s) 2" in w for w in menu.warnings)
+
+    def test_all_pages_failing_raises(self, mock_openai_key):
+        async def broken_extract(image_base64):
+            raise RuntimeError("vision down")
+
+        with patch("app.services.ocr_service._extract_with_openai", new=broken_extract):
+            with pytest.raises(OCRFailedError):
+                asyncio.run(ocr_service.process_menu_images("device", [(_b64(b"x"), None)]))
+
+
+class TestTiledExtraction:
+    def test_tiles_are_merged_and_deduplicated(self, mock_openai_key):
+        import io
+        from PIL import Image
+
+        buf = io.BytesIO()
+        Image.new("RGB", (800, 1200), "white").save(buf, format="PNG")
+        image_bytes = buf.getvalue()
+
+        calls = []
+
+        async def tile_extract(image_base64, instruction=None):
+            calls.append(instruction)
+            n = len(calls)
+            # Neighbouring tiles both see the dish on their shared edge
+            return _page(
+                restaurant={"name": "Test Bistro", "cuisine_type": None} if n == 1 else None,
+                items=[{"name": "Shared Dish"}, {"name": f"Dish {n}"}],
+                confidence=0.5 + 0.1 * n,
+            )
+
+        with patch("app.services.ocr_service._extract_with_openai", new=tile_extract):
+            menu = asyncio.run(ocr_service.process_menu_image(
+                "device", base64.b64encode(image_bytes).decode(), image_bytes, tiled=True
+            ))
+
+        assert len(calls) == 4
+        assert calls[0] == ocr_service.TILE_EXTRACTION_INSTRUCTION
+        assert sorted(i.name for i in menu.items) == ["Dish 1", "Dish 2", "Dish 3", "Dish 4", "Shared Dish"]
+        assert menu.restaurant.name == "Test Bistro"
+        assert menu.confidence == pytest.approx(0.75)
+        assert {i.name: i.confidence for i in menu.items}["Dish 4"] == pytest.approx(0.9)
+
+    def test_untileable_image_falls_back_to_whole_image(self, mock_openai_key, mock_openai_ocr):
+        menu = asyncio.run(ocr_service.process_menu_image("device", _b64(b"not-an-image"), tiled=True))
+        mock_openai_ocr.assert_called_once()
+        assert len(menu.items) > 0
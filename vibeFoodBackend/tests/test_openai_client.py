@@ -0,0 +1,167 @@
+"""
+Unit tests for OpenAI token usage accounting, latency tracking and hedging.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.services import openai_client
+from app.services.openai_client import LatencyWindow, get_usage_stats, record_usage
+
+
+def _usage(prompt, completion, cached=None):
+    details = SimpleNamespace(cached_tokens=cached) if cached is not None else None
+    return SimpleNamespace(prompt_tokens=prompt, completion_tokens=completion, prompt_tokens_details=details)
+
+
+class TestUsageAccounting:
+    def setup_method(self):
+        get_usage_stats().reset()
+
+    def test_cached_tokens_are_recorded_per_purpose(self):
+        record_usage("recommendation", _usage(1800, 300))
+        record_usage("recommendation", _usage(1800, 280, cached=1536))
+        record_usage("ocr", _usage(900, 400, cached=0))
+
+        stats = get_usage_stats().snapshot()
+        assert stats["recommendation"] == {
+            "calls": 2, "prompt_tokens": 3600, "cached_tokens": 1536, "completion_tokens": 580,
+        }
+        assert stats["ocr"]["cached_tokens"] == 0
+
+    def test_missing_usage_is_ignored(self):
+        record_usage("ocr", None)
+        assert get_usage_stats().snapshot() == {}
+
+
+def _fake_client(latencies, calls):
+    """Client whose completion latency depends on the requested model."""
+    async def create(**kwargs):
+        calls.append(kwargs["model"])
+        latency = latencies[kwargs["model"]]
+        if isinstance(latency, Exception):
+            raise latency
+        await asyncio.sleep(latency)
+        return SimpleNamespace(model=kwargs["model"])
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def _hedge_settings(**overrides):
+    values = dict(
+        OPENAI_HEDGE_ENABLED=True,
+        OPENAI_HEDGE_DEFAULT_DELAY_SECONDS=0.02,
+        OPENAI_HEDGE_MIN_DELAY_SECONDS=0.01,
+        OPENAI_HEDGE_MODEL="gpt-4o-mini",
+    )
+    values.update(overrides)
+    return settings.model_copy(update=values)
+
+
+class TestLatencyWindow:
+    def test_percentile(self):
+        window = LatencyWindow(size=100)
+        assert window.percentile(0.9) is None
+        for seconds in range(1, 11):
+            window.record(float(seconds))
+        assert window.percentile(0.9) == 9.0
+        assert window.percentile(0.5) == 5.0
+
+    def test_hedge_delay_uses_percentile_after_enough_samples(self):
+        with patch("app.services.openai_client.settings", _hedge_settings(OPENAI_HEDGE_MIN_SAMPLES=5)):
+            assert openai_client.hedge_delay("recommendation") == 0.02
+            for seconds in (3.0, 4.0, 4.0, 5.0, 12.0):
+                openai_client.get_latency_window("recommendation").record(seconds)
+            assert openai_client.hedge_delay("recommendation") == 12.0
+            assert openai_client.hedge_delay("ocr") is None
+
+
+class TestHedgedCalls:
+    def _run(self, latencies, deadline=1.0, **overrides):
+        calls = []
+        with patch("app.services.openai_client.settings", _hedge_settings(**overrides)), \
+             patch("app.services.openai_client.get_openai_client", return_value=_fake_client(latencies, calls)):
+            response = asyncio.run(openai_client.create_chat_completion(
+                "recommendation", deadline, model="gpt-4o", messages=[],
+            ))
+        return response, calls
+
+    def test_fast_call_is_not_hedged(self):
+        response, calls = self._run({"gpt-4o": 0.0, "gpt-4o-mini": 0.0})
+        assert response.model == "gpt-4o"
+        assert calls == ["gpt-4o"]
+
+    def test_slow_call_is_hedged_to_faster_model(self):
+        response, calls = self._run({"gpt-4o": 0.5, "gpt-4o-mini": 0.01})
+        assert response.model == "gpt-4o-mini"
+        assert calls == ["gpt-4o", "gpt-4o-mini"]
+        assert openai_client.get_hedge_stats().to_dict() == {"recommendation": {"fired": 1, "won": 1}}
+
+    def test_failed_hedge_waits_for_primary(self):
+        response, _ = self._run({"gpt-4o": 0.05, "gpt-4o-mini": RuntimeError("overloaded")})
+        assert response.model == "gpt-4o"
+
+    def test_deadline_bounds_the_whole_operation(self):
+        with pytest.raises(asyncio.TimeoutError):
+            self._run({"gpt-4o": 0.5, "gpt-4o-mini": 0.5}, deadline=0.05)
+
+
+class TestReservations:
+    def _scheduler(self, **limits):
+        from app.services.openai_scheduler import OpenAIScheduler
+        now = [0.0]
+        scheduler = OpenAIScheduler(clock=lambda: now[0], **dict(dict(rpm_limit=10, tpm_limit=0), **limits))
+        return scheduler, now
+
+    def test_hedge_reuses_the_primary_reservation(self):
+        scheduler, _ = self._scheduler()
+        calls = []
+        with patch("app.services.openai_client.settings", _hedge_settings()), \
+             patch("app.services.openai_client.get_openai_scheduler", return_value=scheduler), \
+             patch("app.services.openai_client.get_openai_client",
+                   return_value=_fake_client({"gpt-4o": 0.5, "gpt-4o-mini": 0.01}, calls)):
+            asyncio.run(openai_client.create_chat_completion("recommendation", 1.0, model="gpt-4o", messages=[]))
+        assert calls == ["gpt-4o", "gpt-4o-mini"]
+        assert scheduler.stats()["window_requests"] == 1
+
+    def test_scheduler_wait_is_outside_deadline_and_breaker(self):
+        scheduler, now = self._scheduler(rpm_limit=1)
+        calls = []
+
+        async def scenario():
+            await scheduler.acquire("ocr", 10)  # the window is full
+            task = asyncio.ensure_future(openai_client.create_chat_completion(
+                "recommendation", 0.05, model="gpt-4o", messages=[],
+            ))
+            await asyncio.sleep(0.1)  # queued for longer than the deadline
+            assert not task.done()
+            now[0] += 60
+            scheduler._dispatch()
+            return await task
+
+        with patch("app.services.openai_client.get_openai_scheduler", return_value=scheduler), \
+             patch("app.services.openai_client.get_openai_client",
+                   return_value=_fake_client({"gpt-4o": 0.0}, calls)):
+            response = asyncio.run(scenario())
+        assert response.model == "gpt-4o"
+        assert openai_client.circuit_breaker_states()["recommendation"]["state"] == "closed"
+
+    def test_open_breaker_gives_the_reservation_back(self):
+        from app.utils.errors import UpstreamUnavailableError
+        scheduler, _ = self._scheduler()
+        breaker = openai_client.get_circuit_breaker("recommendation")
+        for _ in range(settings.OPENAI_CIRCUIT_MIN_CALLS):
+            breaker.before_call()
+            breaker.record_failure()
+
+        async def call():
+            with pytest.raises(UpstreamUnavailableError):
+                await openai_client.create_chat_completion("recommendation", 1.0, model="gpt-4o", messages=[])
+
+        with patch("app.services.openai_client.get_openai_scheduler", return_value=scheduler), \
+             patch("app.services.openai_client.get_openai_client", return_value=_fake_client({}, [])):
+            asyncio.run(call())
+        assert scheduler.stats()["window_requests"] == 0
@@ -0,0 +1,134 @@
+"""
+Unit tests for the OpenAI rate-limit scheduler.
+"""
+import asyncio
+
+from app.services.openai_scheduler import (
+    IMAGE_TOKEN_ESTIMATE,
+    OUTPUT_TOKEN_ESTIMATES,
+    OpenAIScheduler,
+    estimate_call_tokens,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEstimate:
+    def test_text_and_image_parts(self):
+        messages = [
+            {"role": "system", "content": "Extract the menu"},
+            {"role": "user", "content": [
+                {"type": "text", "text": "Read this photo"},
+                {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,AAAA"}},
+            ]},
+        ]
+        tokens = estimate_call_tokens("ocr", messages)
+        assert tokens > OUTPUT_TOKEN_ESTIMATES["ocr"] + IMAGE_TOKEN_ESTIMATE
+        assert estimate_call_tokens("transcription") == 0
+
+
+class TestScheduler:
+    def test_admits_within_budget(self):
+        scheduler = OpenAIScheduler(rpm_limit=10, tpm_limit=1000, clock=FakeClock())
+
+        async def scenario():
+            return [await scheduler.acquire("ocr", 300) for _ in range(3)]
+
+        reservations = asyncio.run(scenario())
+        assert len(reservations) == 3
+        stats = scheduler.stats()
+        assert stats["window_requests"] == 3 and stats["window_tokens"] == 900
+        assert stats["wait"]["ocr"]["max_seconds"] == 0.0
+
+    def test_queued_calls_run_by_priority(self):
+        clock = FakeClock()
+        scheduler = OpenAIScheduler(rpm_limit=1, tpm_limit=0, clock=clock)
+        order = []
+
+        async def call(operation):
+            await scheduler.acquire(operation, 10)
+            order.append(operation)
+
+        async def scenario():
+            await scheduler.acquire("ocr", 10)  # uses the whole budget
+            tasks = [asyncio.ensure_future(call(op)) for op in ("intro", "ocr", "recommendation")]
+            await asyncio.sleep(0)
+            assert scheduler.queue_depth() == {"intro": 1, "ocr": 1, "recommendation": 1}
+            for _ in range(3):
+                clock.now += 60
+                scheduler._dispatch()
+                await asyncio.sleep(0)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(scenario())
+        assert order == ["recommendation", "ocr", "intro"]
+        assert scheduler.stats()["wait"]["intro"]["max_seconds"] == 180
+
+    def test_cancel_after_admission_releases_reservation(self):
+        clock = FakeClock()
+        scheduler = OpenAIScheduler(rpm_limit=1, tpm_limit=0, clock=clock)
+
+        async def scenario():
+            await scheduler.acquire("ocr", 10)  # fills the window
+            waiting = asyncio.ensure_future(scheduler.acquire("ocr", 10))
+            await asyncio.sleep(0)
+            clock.now += 60
+            scheduler._dispatch()  # admits the waiter, which has not resumed yet
+            waiting.cancel()
+            try:
+                await waiting
+            except asyncio.CancelledError:
+                pass
+
+        asyncio.run(scenario())
+        assert scheduler.stats()["window_requests"] == 0
+        assert scheduler.has_headroom("ocr", 10)
+
+    def test_reserved_share_keeps_room_for_recommendations(self):
+        scheduler = OpenAIScheduler(rpm_limit=5, tpm_limit=0, reserved_share=0.2, clock=FakeClock())
+
+        async def scenario():
+            for _ in range(4):
+                await scheduler.acquire("ocr", 10)
+            blocked = asyncio.ensure_future(scheduler.acquire("ocr", 10))
+            await asyncio.sleep(0)
+            admitted = await asyncio.wait_for(scheduler.acquire("recommendation", 10), 0.1)
+            assert not blocked.done()
+            blocked.cancel()
+            return admitted
+
+        assert asyncio.run(scenario()) is not None
+        assert scheduler.queue_depth() == {}
+
+    def test_headroom_excludes_reserved_share(self):
+        scheduler = OpenAIScheduler(rpm_limit=5, tpm_limit=0, reserved_share=0.2, clock=FakeClock())
+
+        async def scenario():
+            for _ in range(4):
+                await scheduler.acquire("ocr", 10)
+
+        assert scheduler.has_headroom("speculative", 10)
+        asyncio.run(scenario())
+        assert not scheduler.has_headroom("speculative", 10)
+        assert scheduler.has_headroom("recommendation", 10)
+
+    def test_token_budget_and_settled_usage(self):
+        clock = FakeClock()
+        scheduler = OpenAIScheduler(rpm_limit=0, tpm_limit=1000, clock=clock)
+
+        async def scenario():
+            first = await scheduler.acquire("recommendation", 900)
+            waiting = asyncio.ensure_future(scheduler.acquire("recommendation", 500))
+            await asyncio.sleep(0)
+            assert not waiting.done()
+            first.settle(400)  # the response used less than estimated
+            scheduler._dispatch()
+            return await asyncio.wait_for(waiting, 0.1)
+
+        assert asyncio.run(scenario()).tokens == 500
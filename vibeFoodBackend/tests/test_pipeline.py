@@ -3,7 +3,9 @@ Integration tests for the full Aura MVP data pipeline.
 Tests each API endpoint and the end-to-end flow:
   check-in → register → scan → recommendation → feedback
 """
+import asyncio
 import base64
+from unittest.mock import patch
 
 from tests.conftest import MOCK_OCR_RESPONSE, MOCK_REC_RESPONSE
 
@@ -57,7 +59,7 @@ class TestRegister:
         """New device should register successfully."""
         res = client.post("/api/v1/register", json={
             "device_id": "new-device-123",
-            "preference": "vegetarian",
+            "preference": ["vegetarian"],
         })
         assert res.status_code == 200
         data = res.json()
@@ -68,7 +70,7 @@ class TestRegister:
         """Registering same device twice should fail."""
         res = client.post("/api/v1/register", json={
             "device_id": registered_device,
-            "preference": "vegan",
+            "preference": ["vegan"],
         })
         assert res.status_code == 200
         data = res.json()
@@ -80,7 +82,7 @@ class TestRegister:
         device_id = "persist-test-device"
         client.post("/api/v1/register", json={
             "device_id": device_id,
-            "preference": "halal",
+            "preference": ["halal"],
         })
         res = client.post("/api/v1/check-in", json={"device_id": device_id})
         assert res.json()["is_registered"] is True
@@ -141,6 +143,267 @@ class TestScan:
         res = client.post("/api/v1/check-in", json={"device_id": registered_device})
         assert res.json()["is_registered"] is True
 
+    def test_multi_page_scan(self, client, registered_device, mock_openai_key, mock_openai_ocr):
+        """Multi-page scan should OCR each page and merge duplicate dishes."""
+        res = client.post("/api/v1/scan/multi", json={
+            "device_id": registered_device,
+            "images_base64": [make_test_image_base64(), base64.b64encode(b"page-2").decode()],
+        })
+        assert res.status_code == 200
+        data = res.json()
+        assert data["is_success"] is True
+        assert data["page_count"] == 2
+        assert data["menu_item_count"] == len(MOCK_OCR_RESPONSE["items"])
+        assert mock_openai_ocr.call_count == 2
+
+    def test_scan_stream(self, client, registered_device, mock_openai_key, mock_openai_ocr_stream):
+        """Streaming scan should emit each item, then the final result."""
+        import json
+        res = client.post("/api/v1/scan/stream", json={
+            "device_id": registered_device,
+            "image_base64": make_test_image_base64(),
+        })
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/event-stream")
+        events = [
+            (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+            for block in res.text.strip().split("\n\n")
+        ]
+        kinds = [kind for kind, _ in events]
+        assert kinds == ["item"] * len(MOCK_OCR_RESPONSE["items"]) + ["result"]
+        assert events[0][1]["name"] == MOCK_OCR_RESPONSE["items"][0]["name"]
+        result = events[-1][1]
+        assert result["is_success"] is True
+        assert result["menu_item_count"] == len(MOCK_OCR_RESPONSE["items"])
+
+    def test_scan_stream_unregistered(self, client):
+        """Streaming scan for unknown device should send a failed result."""
+        res = client.post("/api/v1/scan/stream", json={
+            "device_id": "unregistered-device",
+            "image_base64": make_test_image_base64(),
+        })
+        assert "event: result" in res.text
+        assert "not registered" in res.text.lower()
+
+    def test_scan_stream_tiled(self, client, registered_device, mock_openai_key, mock_openai_ocr):
+        """Tiled streaming scans should go through tiled extraction, not the streaming call."""
+        res = client.post("/api/v1/scan/stream", json={
+            "device_id": registered_device,
+            "image_base64": make_test_image_base64(),
+            "tiled": True,
+        })
+        assert res.text.count("event: item") == len(MOCK_OCR_RESPONSE["items"])
+        assert "event: result" in res.text
+        mock_openai_ocr.assert_called_once()
+
+    def test_scan_stream_too_large(self, client, registered_device, mock_openai_key, mock_openai_ocr_stream):
+        """Streaming scans over the size limit should fail before OCR."""
+        from app.core.config import settings
+        with patch.object(settings, "SCAN_MAX_IMAGE_BYTES", 16):
+            res = client.post("/api/v1/scan/stream", json={
+                "device_id": registered_device,
+                "image_base64": make_test_image_base64(),
+            })
+        assert "event: item" not in res.text
+        assert "too large" in res.text.lower()
+        mock_openai_ocr_stream.assert_not_called()
+
+    def test_multi_page_scan_too_large(self, client, registered_device, mock_openai_key, mock_openai_ocr):
+        """Any page over the size limit should reject the whole scan before OCR."""
+        from app.core.config import settings
+        with patch.object(settings, "SCAN_MAX_IMAGE_BYTES", 16):
+            res = client.post("/api/v1/scan/multi", json={
+                "device_id": registered_device,
+                "images_base64": [base64.b64encode(b"page-1").decode(), make_test_image_base64()],
+            })
+        data = res.json()
+        assert data["is_success"] is False
+        assert "too large" in data["err_msg"].lower()
+        mock_openai_ocr.assert_not_called()
+
+    def test_scan_multipart_upload(self, client, registered_device, mock_openai_key, mock_openai_ocr):
+        """Multipart upload should scan like /scan and send one base64 image to OCR."""
+        image_bytes = base64.b64decode(make_test_image_base64())
+        res = client.post(
+            "/api/v1/scan/upload",
+            data={"device_id": registered_device},
+            files={"image": ("menu.jpg", image_bytes, "image/jpeg")},
+        )
+        data = res.json()
+        assert data["is_success"] is True
+        assert data["menu_item_count"] == len(MOCK_OCR_RESPONSE["items"])
+        assert mock_openai_ocr.call_args[0][0] == make_test_image_base64()
+
+    def test_scan_raw_upload(self, client, registered_device, mock_openai_key, mock_openai_ocr):
+        """Raw image body with device_id query param should scan."""
+        res = client.post(
+            f"/api/v1/scan/upload?device_id={registered_device}",
+            content=base64.b64decode(make_test_image_base64()),
+            headers={"Content-Type": "image/jpeg"},
+        )
+        assert res.json()["is_success"] is True
+        mock_openai_ocr.assert_called_once()
+
+    def test_scan_upload_too_large(self, client, registered_device):
+        """Uploads over the size limit should be rejected before OCR."""
+        from app.core.config import settings
+        res = client.post(
+            f"/api/v1/scan/upload?device_id={registered_device}",
+            content=b"\xff" * (settings.SCAN_MAX_IMAGE_BYTES + 1),
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        data = res.json()
+        assert data["is_success"] is False
+        assert "too large" in data["err_msg"].lower()
+
+    def test_scan_multipart_upload_too_large_while_streaming(self, client, registered_device, mock_openai_ocr):
+        """Chunked multipart uploads without Content-Length should be cut off at the size limit."""
+        from app.core.config import settings
+        boundary = "vibefood-test-boundary"
+        body = (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"device_id\"\r\n\r\n{registered_device}\r\n"
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"image\"; filename=\"menu.jpg\"\r\n"
+            "Content-Type: image/jpeg\r\n\r\n"
+        ).encode() + b"\xff" * (settings.SCAN_MAX_IMAGE_BYTES + 1) + f"\r\n--{boundary}--\r\n".encode()
+
+        def chunks():
+            for i in range(0, len(body), 1024 * 1024):
+                yield body[i:i + 1024 * 1024]
+
+        res = client.post(
+            "/api/v1/scan/upload",
+            content=chunks(),
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        )
+        data = res.json()
+        assert data["is_success"] is False
+        assert "too large" in data["err_msg"].lower()
+        mock_openai_ocr.assert_not_called()
+
+    def test_multi_page_scan_invalid_page(self, client, registered_device):
+        """A bad page should fail the scan and name the page."""
+        res = client.post("/api/v1/scan/multi", json={
+            "device_id": registered_device,
+            "images_base64": [make_test_image_base64(), "!!!not-valid-base64!!!"],
+        })
+        data = res.json()
+        assert data["is_success"] is False
+        assert "page 2" in data["err_msg"].lower()
+
+    def test_scan_job_completes(self, client, registered_device, mock_openai_key, mock_openai_ocr):
+        """Queued scans return 202 and the menu is available via polling."""
+        import time
+        from unittest.mock import patch
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from app.models.user_profile import UserProfile
+        from tests.conftest import TestSessionLocal
+
+        with patch("app.api.v1.endpoints.scan.SessionLocal", TestSessionLocal), TestClient(app) as live:
+            res = live.post("/api/v1/scan/jobs", json={
+                "device_id": registered_device,
+                "image_base64": make_test_image_base64(),
+            })
+            assert res.status_code == 202
+            job_id = res.json()["job_id"]
+
+            deadline = time.time() + 5
+            while True:
+                status = live.get(f"/api/v1/scan/jobs/{job_id}").json()
+                if status["status"] in ("completed", "failed") or time.time() > deadline:
+                    break
+                time.sleep(0.05)
+
+        assert status["status"] == "completed"
+        assert status["result"]["menu_item_count"] == 4
+        db = TestSessionLocal()
+        try:
+            profile = db.query(UserProfile).filter(UserProfile.device_id == registered_device).first()
+            assert len(profile.current_menu["items"]) == 4
+        finally:
+            db.close()
+
+    def test_scan_intro_is_stored_with_menu(self, client, registered_device, mock_openai_ocr):
+        """An intro ready within the budget is returned and kept on the menu for /scan/intro."""
+        scan = client.post("/api/v1/scan", json={
+            "device_id": registered_device,
+            "image_base64": make_test_image_base64(),
+        }).json()
+        assert scan["restaurant_intro"]
+        assert scan["intro_pending"] is False
+
+        with patch("app.services.llm_service._generate_restaurant_intro") as generate:
+            res = client.post("/api/v1/scan/intro", json={"device_id": registered_device})
+        assert res.json()["restaurant_intro"] == scan["restaurant_intro"]
+        generate.assert_not_called()
+
+    def test_slow_scan_intro_is_deferred(self, client, registered_device, mock_openai_key, mock_openai_ocr):
+        """A slow intro does not hold up /scan; it is generated once and fetched from /scan/intro."""
+        from fastapi.testclient import TestClient
+        from app.core.config import settings
+        from app.main import app
+        from app.models.user_profile import UserProfile
+        from tests.conftest import TestSessionLocal
+
+        calls = []
+
+        async def slow_intro(*args):
+            calls.append(args)
+            await asyncio.sleep(0.2)
+            return "A cozy diner with classic comfort food."
+
+        short_budget = settings.model_copy(update={"SCAN_INTRO_BUDGET_SECONDS": 0.01})
+        with patch("app.services.llm_service._generate_restaurant_intro", side_effect=slow_intro), \
+             patch("app.api.v1.endpoints.scan.settings", short_budget), \
+             patch("app.api.v1.endpoints.scan.SessionLocal", TestSessionLocal), TestClient(app) as live:
+            scan = live.post("/api/v1/scan", json={
+                "device_id": registered_device,
+                "image_base64": make_test_image_base64(),
+            }).json()
+            assert scan["is_success"] is True
+            assert scan["restaurant_intro"] is None
+            assert scan["intro_pending"] is True
+
+            fetched = live.post("/api/v1/scan/intro", json={"device_id": registered_device}).json()
+            again = live.post("/api/v1/scan/intro", json={"device_id": registered_device}).json()
+
+        assert fetched == {
+            "is_success": True,
+            "err_msg": None,
+            "restaurant_intro": "A cozy diner with classic comfort food.",
+            "intro_pending": False,
+        }
+        assert again["restaurant_intro"] == fetched["restaurant_intro"]
+        assert len(calls) == 1
+        db = TestSessionLocal()
+        try:
+            profile = db.query(UserProfile).filter(UserProfile.device_id == registered_device).first()
+            assert profile.current_menu["restaurant_intro"] == fetched["restaurant_intro"]
+        finally:
+            db.close()
+
+    def test_failed_scan_intro_is_not_retried(self, client, registered_device, mock_openai_ocr):
+        """A menu whose intro could not be generated is not regenerated on every poll."""
+        with patch("app.services.llm_service._generate_restaurant_intro", return_value=None) as generate:
+            scan = client.post("/api/v1/scan", json={
+                "device_id": registered_device,
+                "image_base64": make_test_image_base64(),
+            }).json()
+            polls = [client.post("/api/v1/scan/intro", json={"device_id": registered_device}).json() for _ in range(2)]
+        assert scan["restaurant_intro"] is None
+        assert all(poll["restaurant_intro"] is None and poll["intro_pending"] is False for poll in polls)
+        assert generate.call_count == 1
+
+    def test_scan_intro_no_menu(self, client, registered_device):
+        """Fetching an intro before scanning returns is_success=False."""
+        res = client.post("/api/v1/scan/intro", json={"device_id": registered_device})
+        assert res.json()["is_success"] is False
+
+    def test_scan_job_unknown_id(self, client):
+        """Polling an unknown job id returns 404."""
+        res = client.get("/api/v1/scan/jobs/does-not-exist")
+        assert res.status_code == 404
+
 
 # ═══════════════════════════════════════════════════════
 #  4. RECOMMENDATION ENDPOINT
@@ -212,6 +475,72 @@ class TestRecommendation:
         assert "story" in dish
         assert "price" in dish
 
+    def test_recommendation_stream(self, client, registered_device, mock_openai_key, mock_openai_ocr, mock_openai_rec_stream):
+        """Streaming recommendation should emit the summary, each dish, then the stored result."""
+        import json
+        client.post("/api/v1/scan", json={
+            "device_id": registered_device,
+            "image_base64": make_test_image_base64(),
+        })
+        res = client.post("/api/v1/recommendation/stream", json={
+            "device_id": registered_device,
+            "vibe_selection": "comfort",
+        })
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/event-stream")
+        events = [
+            (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+            for block in res.text.strip().split("\n\n")
+        ]
+        kinds = [kind for kind, _ in events]
+        assert kinds == ["summary"] + ["dish"] * len(MOCK_REC_RESPONSE["recommendations"]) + ["result"]
+        assert events[0][1]["brief_summary"] == MOCK_REC_RESPONSE["brief_summary"]
+        assert events[1][1]["dish_name"] == "Classic Burger"
+        assert events[1][1]["dish_id"] is not None
+
+        result = events[-1][1]
+        assert result["is_success"] is True
+        streamed = [payload for kind, payload in events if kind == "dish"]
+        assert result["recommendation"]["recommendations"] == streamed
+
+        from app.models.user_profile import UserProfile
+        from tests.conftest import TestSessionLocal
+        db = TestSessionLocal()
+        try:
+            profile = db.query(UserProfile).filter(UserProfile.device_id == registered_device).first()
+            assert profile.current_recommendations["recommendations"] == streamed
+        finally:
+            db.close()
+
+    def test_same_menu_on_two_devices_gets_own_dish_ids(self, client, mock_openai_key, mock_openai_ocr, mock_openai_rec):
+        """A cached recommendation must point at the dishes of the caller's own scan."""
+        from app.models.user_profile import UserProfile
+        from tests.conftest import TestSessionLocal
+
+        for device_id in ("diner-a", "diner-b"):
+            client.post("/api/v1/register", json={"device_id": device_id, "preference": ["no_restriction"]})
+            client.post("/api/v1/scan", json={"device_id": device_id, "image_base64": make_test_image_base64()})
+            res = client.post("/api/v1/recommendation", json={"device_id": device_id, "vibe_selection": "comfort"})
+            dish_ids = {d["dish_id"] for d in res.json()["recommendation"]["recommendations"]}
+
+            db = TestSessionLocal()
+            try:
+                profile = db.query(UserProfile).filter(UserProfile.device_id == device_id).first()
+                menu_ids = {item["id"] for item in profile.current_menu["items"]}
+            finally:
+                db.close()
+            assert dish_ids and dish_ids <= menu_ids
+        assert mock_openai_rec.call_count == 1
+
+    def test_recommendation_stream_no_menu(self, client, registered_device):
+        """Streaming recommendation without a scanned menu should send a failed result."""
+        res = client.post("/api/v1/recommendation/stream", json={
+            "device_id": registered_device,
+            "vibe_selection": "comfort",
+        })
+        assert "event: result" in res.text
+        assert "no menu" in res.text.lower()
+
     def test_all_vibes_work(self, client, registered_device, mock_openai_key, mock_openai_ocr, mock_openai_rec):
         """All 8 vibes should return valid recommendations."""
         client.post("/api/v1/scan", json={
@@ -332,7 +661,7 @@ class TestFullPipeline:
         # Step 2: Register
         res = client.post("/api/v1/register", json={
             "device_id": device_id,
-            "preference": "vegetarian",
+            "preference": ["vegetarian"],
         })
         assert res.json()["is_success"] is True
 
@@ -380,7 +709,7 @@ class TestFullPipeline:
         # Register
         client.post("/api/v1/register", json={
             "device_id": device_id,
-            "preference": "no_restriction",
+            "preference": ["no_restriction"],
         })
 
         # First scan + recommendation
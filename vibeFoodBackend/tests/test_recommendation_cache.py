@@ -0,0 +1,86 @@
+"""
+Unit tests for the recommendation result cache.
+"""
+import asyncio
+
+from app.services import llm_service
+from app.services.recommendation_cache import (
+    menu_fingerprint,
+    normalize_preferences,
+    recommendation_cache_key,
+)
+from tests.conftest import MOCK_OCR_RESPONSE
+
+ITEMS = [dict(item, id=f"id-{n}") for n, item in enumerate(MOCK_OCR_RESPONSE["items"])]
+RESTAURANT = MOCK_OCR_RESPONSE["restaurant"]
+
+
+class TestCacheKey:
+    def test_fingerprint_ignores_item_ids(self):
+        rescanned = [dict(item, id=f"other-{n}") for n, item in enumerate(ITEMS)]
+        assert menu_fingerprint(ITEMS, RESTAURANT) == menu_fingerprint(rescanned, RESTAURANT)
+
+    def test_fingerprint_changes_with_content(self):
+        repriced = [dict(ITEMS[0], price=99.0)] + ITEMS[1:]
+        assert menu_fingerprint(ITEMS, RESTAURANT) != menu_fingerprint(repriced, RESTAURANT)
+
+    def test_preferences_are_normalized(self):
+        assert normalize_preferences("nut_free, Vegetarian") == "nut_free,vegetarian"
+        assert normalize_preferences("vegetarian,no_restriction") == "vegetarian"
+        assert normalize_preferences("") == "no_restriction"
+
+    def test_voice_prompt_only_counts_for_voice(self):
+        fp = menu_fingerprint(ITEMS)
+        assert recommendation_cache_key(fp, "comfort", "", "en", "ignored") == \
+            recommendation_cache_key(fp, "comfort", "", "en")
+        assert recommendation_cache_key(fp, "voice", "", "en", "spicy please") != \
+            recommendation_cache_key(fp, "voice", "", "en", "something sweet")
+
+
+class TestGenerateRecommendationsCache:
+    def _generate(self, items=ITEMS, vibe="comfort", preference="vegetarian,nut_free"):
+        return asyncio.run(llm_service.generate_recommendations(
+            menu_items=items, vibe=vibe, preference=preference,
+            restaurant_info=RESTAURANT, menu_language="en",
+        ))
+
+    def test_repeat_request_skips_llm(self, mock_openai_key, mock_openai_rec):
+        first = self._generate()
+        rescanned = [dict(item, id=f"other-{n}") for n, item in enumerate(ITEMS)]
+        second = self._generate(items=rescanned, preference="nut_free,vegetarian")
+        assert mock_openai_rec.call_count == 1
+        assert [r["dish_name"] for r in first["recommendations"]] == [r["dish_name"] for r in second["recommendations"]]
+
+    def test_cache_hit_resolves_against_own_menu(self, mock_openai_key, mock_openai_rec):
+        first = self._generate()
+        rescanned = [dict(item, id=f"other-{n}") for n, item in enumerate(ITEMS)]
+        second = self._generate(items=rescanned)
+        assert {r["dish_id"] for r in first["recommendations"]} <= {item["id"] for item in ITEMS}
+        assert {r["dish_id"] for r in second["recommendations"]} <= {item["id"] for item in rescanned}
+
+    def test_joined_flight_resolves_against_own_menu(self, mock_openai_key, mock_openai_rec):
+        rescanned = [dict(item, id=f"other-{n}") for n, item in enumerate(ITEMS)]
+
+        async def scenario():
+            return await asyncio.gather(*(
+                llm_service.generate_recommendations(
+                    menu_items=items, vibe="comfort", preference="",
+                    restaurant_info=RESTAURANT, menu_language="en",
+                )
+                for items in (ITEMS, rescanned)
+            ))
+
+        first, second = asyncio.run(scenario())
+        assert mock_openai_rec.call_count == 1
+        assert {r["dish_id"] for r in first["recommendations"]} <= {item["id"] for item in ITEMS}
+        assert {r["dish_id"] for r in second["recommendations"]} <= {item["id"] for item in rescanned}
+
+    def test_different_vibe_misses(self, mock_openai_key, mock_openai_rec):
+        self._generate(vibe="comfort")
+        self._generate(vibe="adventure")
+        assert mock_openai_rec.call_count == 2
+
+    def test_cached_result_is_a_copy(self, mock_openai_key, mock_openai_rec):
+        self._generate()
+        self._generate()["recommendations"].clear()
+        assert self._generate()["recommendations"]
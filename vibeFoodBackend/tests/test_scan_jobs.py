@@ -0,0 +1,142 @@
+"""
+Unit tests for the asynchronous scan job queue.
+"""
+import asyncio
+
+import pytest
+
+from app.models.enums import ScanJobStatus
+from app.schemas.scan import ScanResponse
+from app.services.scan_jobs import ScanJobQueue
+from app.utils.errors import ScanQueueFullError
+
+
+def _run(coro_fn):
+    return asyncio.run(coro_fn())
+
+
+class TestScanJobQueue:
+    def test_job_completes_with_result(self):
+        async def scenario():
+            queue = ScanJobQueue(workers=1, max_queue=4, result_ttl=60)
+
+            async def run():
+                return ScanResponse(is_success=True, restaurant_name="Test Bistro")
+
+            job = queue.submit("device", run)
+            assert job.status == ScanJobStatus.QUEUED
+            while not job.is_finished:
+                await job.wait_for_change(timeout=1.0)
+            await queue.stop()
+            return job
+
+        job = _run(scenario)
+        assert job.status == ScanJobStatus.COMPLETED
+        assert job.result.restaurant_name == "Test Bistro"
+        assert job.run is None
+
+    def test_unsuccessful_result_marks_job_failed(self):
+        async def scenario():
+            queue = ScanJobQueue(workers=1, max_queue=4, result_ttl=60)
+
+            async def run():
+                return ScanResponse(is_success=False, err_msg="no menu")
+
+            job = queue.submit("device", run)
+            while not job.is_finished:
+                await job.wait_for_change(timeout=1.0)
+            await queue.stop()
+            return job
+
+        job = _run(scenario)
+        assert job.status == ScanJobStatus.FAILED
+        assert job.error == "no menu"
+
+    def test_exception_marks_job_failed(self):
+        async def scenario():
+            queue = ScanJobQueue(workers=1, max_queue=4, result_ttl=60)
+
+            async def run():
+                raise RuntimeError("vision down")
+
+            job = queue.submit("device", run)
+            while not job.is_finished:
+                await job.wait_for_change(timeout=1.0)
+            await queue.stop()
+            return job
+
+        job = _run(scenario)
+        assert job.status == ScanJobStatus.FAILED
+        assert "vision down" in job.error
+
+    def test_full_queue_rejects_and_reports_position(self):
+        async def scenario():
+            queue = ScanJobQueue(workers=1, max_queue=2, result_ttl=60)
+            release = asyncio.Event()
+
+            async def run():
+                await release.wait()
+                return ScanResponse(is_success=True)
+
+            first = queue.submit("a", run)
+            await first.wait_for_change(timeout=1.0)  # worker picks up the first job
+            second = queue.submit("b", run)
+            third = queue.submit("c", run)
+            with pytest.raises(ScanQueueFullError) as full:
+                queue.submit("d", run)
+            assert (full.value.error_code, full.value.status_code) == ("scan_queue_full", 503)
+            positions = (queue.position(first), queue.position(second), queue.position(third))
+            release.set()
+            while not third.is_finished:
+                await third.wait_for_change(timeout=1.0)
+            await queue.stop()
+            return positions
+
+        assert _run(scenario) == (None, 1, 2)
+
+    def test_finished_jobs_expire(self):
+        async def scenario():
+            queue = ScanJobQueue(workers=1, max_queue=4, result_ttl=0)
+
+            async def run():
+                return ScanResponse(is_success=True)
+
+            job = queue.submit("device", run)
+            while not job.is_finished:
+                await job.wait_for_change(timeout=1.0)
+            queue.submit("device", run)
+            await queue.stop()
+            return queue.get(job.id)
+
+        assert _run(scenario) is None
+
+    def test_loop_change_requeues_pending_and_fails_interrupted(self):
+        queue = ScanJobQueue(workers=1, max_queue=4, result_ttl=60)
+
+        async def done():
+            return ScanResponse(is_success=True)
+
+        async def first_loop():
+            async def hang():
+                await asyncio.Event().wait()
+
+            running = queue.submit("a", hang)
+            await running.wait_for_change(timeout=1.0)  # worker picks it up, then the loop ends
+            waiting = queue.submit("b", done)
+            return running, waiting
+
+        running, waiting = _run(first_loop)
+        assert queue.position(waiting) == 1
+
+        async def second_loop():
+            latest = queue.submit("c", done)
+            while not latest.is_finished:
+                await latest.wait_for_change(timeout=1.0)
+            await queue.stop()
+            return latest
+
+        latest = _run(second_loop)
+        assert running.status == ScanJobStatus.FAILED
+        assert "interrupted" in running.error
+        assert waiting.status == ScanJobStatus.COMPLETED
+        assert latest.status == ScanJobStatus.COMPLETED
@@ -0,0 +1,110 @@
+"""
+Unit tests for single-flight coalescing.
+"""
+import asyncio
+
+from app.services import llm_service, ocr_service
+from app.utils.singleflight import SingleFlight, get_single_flight, single_flight_stats
+from tests.conftest import MOCK_OCR_RESPONSE
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self):
+        group = SingleFlight("test")
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return {"value": 42}
+
+        async def scenario():
+            return await asyncio.gather(*(group.do("k", work) for _ in range(5)))
+
+        results = asyncio.run(scenario())
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert group.stats.to_dict() == {"calls": 1, "coalesced": 4, "failures": 0}
+        assert len(group) == 0
+
+    def test_failures_are_shared_and_not_remembered(self):
+        group = SingleFlight("test")
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream down")
+
+        async def ok():
+            return "fine"
+
+        async def scenario():
+            results = await asyncio.gather(group.do("k", boom), group.do("k", boom), return_exceptions=True)
+            return results, await group.do("k", ok)
+
+        results, retry = asyncio.run(scenario())
+        assert all(isinstance(r, ValueError) for r in results)
+        assert retry == "fine"
+        assert group.stats.failures == 1
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        group = SingleFlight("test")
+
+        async def work():
+            await asyncio.sleep(0.03)
+            return "done"
+
+        async def scenario():
+            first = asyncio.ensure_future(group.do("k", work))
+            second = asyncio.ensure_future(group.do("k", work))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(scenario()) == "done"
+
+
+class TestServiceCoalescing:
+    def test_double_tap_scan_runs_one_extraction(self, mock_openai_key):
+        from unittest.mock import patch
+        calls = []
+
+        async def slow_extract(*args, **kwargs):
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return MOCK_OCR_RESPONSE
+
+        async def scenario():
+            return await asyncio.gather(
+                ocr_service.process_menu_image("dev-1", image_bytes=b"same photo"),
+                ocr_service.process_menu_image("dev-1", image_bytes=b"same photo"),
+                ocr_service.process_menu_image("dev-2", image_bytes=b"same photo"),
+            )
+
+        with patch("app.services.ocr_service._get_extraction", side_effect=slow_extract):
+            first, second, other_device = asyncio.run(scenario())
+
+        assert len(calls) == 2
+        assert first is second
+        assert other_device.session_id == "dev-2"
+        assert single_flight_stats()["ocr"]["coalesced"] == 1
+
+    def test_concurrent_recommendations_share_one_generation(self, mock_openai_key):
+        from unittest.mock import patch
+        from tests.conftest import MOCK_REC_RESPONSE
+        items = MOCK_OCR_RESPONSE["items"]
+
+        async def slow_call(*args, **kwargs):
+            await asyncio.sleep(0.02)
+            return MOCK_REC_RESPONSE
+
+        async def scenario():
+            return await asyncio.gather(*(
+                llm_service.generate_recommendations(items, "comfort", "no_restriction") for _ in range(3)
+            ))
+
+        with patch("app.services.llm_service._call_openai", side_effect=slow_call) as mock_call:
+            results = asyncio.run(scenario())
+
+        assert mock_call.call_count == 1
+        assert results[0] == results[1] and results[0] is not results[1]
+        assert get_single_flight("recommendations").stats.coalesced == 2
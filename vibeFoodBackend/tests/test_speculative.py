@@ -0,0 +1,139 @@
+"""
+Unit tests for speculative recommendation precomputation.
+"""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.services import llm_service, speculative
+from app.services.speculative import SpeculationBudget, VibeHistory
+from tests.conftest import MOCK_OCR_RESPONSE, MOCK_REC_RESPONSE
+
+MENU = {
+    "items": [dict(item, id=f"id-{n}") for n, item in enumerate(MOCK_OCR_RESPONSE["items"])],
+    "restaurant": MOCK_OCR_RESPONSE["restaurant"],
+    "menu_language": "en",
+}
+
+
+@pytest.fixture
+def speculation_enabled(mock_openai_key):
+    from app.core.config import settings
+    enabled = settings.model_copy(update={
+        "OPENAI_API_KEY": "sk-test-fake-key",
+        "SPECULATIVE_RECOMMENDATIONS_ENABLED": True,
+        "SPECULATIVE_VIBES_PER_SCAN": 2,
+    })
+    with patch("app.services.speculative.settings", enabled):
+        yield
+
+
+class TestVibeHistory:
+    def test_device_favorites_then_global_then_default(self):
+        history = VibeHistory(max_devices=10)
+        history.record("me", "budget")
+        history.record("other", "healthy")
+        history.record("other", "healthy")
+        assert history.likely_vibes("me", 3) == ["budget", "healthy", "comfort"]
+        assert history.likely_vibes("new-device", 2) == ["healthy", "budget"]
+
+    def test_bounded_device_count(self):
+        history = VibeHistory(max_devices=1)
+        history.record("a", "light")
+        history.record("b", "quick")
+        history.record("b", "quick")
+        assert history.likely_vibes("a", 1) == ["quick"]
+
+
+class TestSpeculationBudget:
+    def test_budget_refills_after_window(self):
+        now = [0.0]
+        budget = SpeculationBudget(limit=2, window_seconds=60, max_devices=10, clock=lambda: now[0])
+        assert [budget.take("me") for _ in range(3)] == [True, True, False]
+        assert budget.take("other") is True
+        now[0] = 61.0
+        assert budget.take("me") is True
+
+
+class TestScheduleRecommendations:
+    def test_disabled_by_default(self, mock_openai_key, mock_openai_rec):
+        async def scenario():
+            return speculative.schedule_recommendations("me", MENU, "no_restriction")
+
+        assert asyncio.run(scenario()) == []
+
+    def test_request_joins_inflight_generation(self, speculation_enabled):
+        calls = []
+
+        async def slow_call(*args, **kwargs):
+            calls.append(args[1])
+            await asyncio.sleep(0.05)
+            return MOCK_REC_RESPONSE
+
+        async def scenario():
+            speculative.record_vibe("me", "adventure")
+            started = speculative.schedule_recommendations("me", MENU, "no_restriction")
+            result = await llm_service.generate_recommendations(
+                menu_items=MENU["items"], vibe="adventure", preference="no_restriction",
+                restaurant_info=MENU["restaurant"], menu_language="en",
+            )
+            await asyncio.sleep(0.1)  # let the other speculative task finish
+            cached = await llm_service.generate_recommendations(
+                menu_items=MENU["items"], vibe="comfort", preference="no_restriction",
+                restaurant_info=MENU["restaurant"], menu_language="en",
+            )
+            return started, result, cached
+
+        with patch("app.services.llm_service._call_openai", new=slow_call):
+            started, result, cached = asyncio.run(scenario())
+
+        assert started == ["adventure", "comfort"]
+        assert sorted(calls) == ["adventure", "comfort"]
+        expected = [r["dish_name"] for r in MOCK_REC_RESPONSE["recommendations"]]
+        assert [r["dish_name"] for r in result["recommendations"]] == expected
+        assert cached["recommendations"][0]["dish_id"] == "id-0"
+
+    def test_cached_vibes_are_not_restarted(self, speculation_enabled, mock_openai_rec):
+        async def scenario():
+            first = speculative.schedule_recommendations("me", MENU, "no_restriction")
+            await asyncio.sleep(0.01)
+            second = speculative.schedule_recommendations("me", MENU, "no_restriction")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert len(first) == 2
+        assert second == []
+        assert mock_openai_rec.call_count == 2
+
+    def test_device_budget_limits_speculation(self, speculation_enabled, mock_openai_rec):
+        from app.services.speculative import settings as speculative_settings
+
+        async def scenario():
+            with patch.object(speculative_settings, "SPECULATIVE_DEVICE_BUDGET", 1):
+                return speculative.schedule_recommendations("me", MENU, "no_restriction")
+
+        assert len(asyncio.run(scenario())) == 1
+        assert mock_openai_rec.call_count == 1
+
+    def test_skips_when_all_slots_are_busy(self, speculation_enabled):
+        from app.services.speculative import settings as speculative_settings
+        calls = []
+
+        async def slow_call(*args, **kwargs):
+            calls.append(kwargs.get("schedule_as"))
+            await asyncio.sleep(0.05)
+            return MOCK_REC_RESPONSE
+
+        async def scenario():
+            with patch.object(speculative_settings, "SPECULATIVE_MAX_CONCURRENT", 1):
+                first = speculative.schedule_recommendations("me", MENU, "no_restriction")
+                busy = speculative.schedule_recommendations("other", dict(MENU, menu_language="zh"), "no_restriction")
+                await asyncio.sleep(0.1)
+            return first, busy
+
+        with patch("app.services.llm_service._call_openai", new=slow_call):
+            first, busy = asyncio.run(scenario())
+        assert len(first) == 1
+        assert busy == []
+        assert calls == ["speculative"]